@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the visualization functions.
+
+Times every case in scaling_cases on synthetic grids of 50² to 2000² cells
+and series of 10 to 1000 frames. Each point records the best wall time and
+the peak Python-heap allocation (tracemalloc, which includes NumPy arrays),
+and each curve gets a fitted scaling exponent (log-log slope against cells
+or frames). Results can be saved as a baseline; later runs compared against
+it exit non-zero on any regression.
+
+Figures are saved as PNG only, into a temporary working directory.
+"""
+import argparse
+import fnmatch
+import gc
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BENCHMARK_DIR.parent / 'python'))
+sys.path.append(str(BENCHMARK_DIR.parent / 'video'))
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from utils.plot_config import configure_figure_saving
+from scaling_cases import BenchmarkCase, all_cases, uncovered_functions, NOT_BENCHMARKED
+
+SIZES = [50, 200, 500, 2000]
+FRAME_COUNTS = [10, 100, 1000]
+QUICK_SIZES = [50, 200]
+QUICK_FRAME_COUNTS = [10, 100]
+FRAME_GRID = 50
+
+DEFAULT_BASELINE = BENCHMARK_DIR / 'scaling_baseline.json'
+
+# Calls slower than this are timed once instead of repeats times
+SLOW_CALL = 2.0  # s
+
+# A point regresses when it is this much slower (larger) than the baseline...
+TIME_TOLERANCE = 0.25
+MEMORY_TOLERANCE = 0.25
+# ...and by more than these margins, which absorb timer and allocator noise
+MIN_TIME_DELTA = 0.005  # s
+MIN_MEMORY_DELTA = 1.0  # MB
+# A curve regresses when its scaling exponent grows by more than this; only
+# curves whose largest point exceeds these are fitted reliably enough to check
+EXPONENT_TOLERANCE = 0.25
+MIN_EXPONENT_TIME = 0.05  # s
+MIN_EXPONENT_MEMORY = 10.0  # MB
+
+
+def time_call(call, repeats: int) -> float:
+    """
+    Best wall time of a call.
+
+    Args:
+        call: Zero-argument callable
+        repeats: Timed calls (slow calls are timed once)
+
+    Returns:
+        Minimum time in seconds
+    """
+    times = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - start)
+        plt.close('all')
+        if times[-1] > SLOW_CALL:
+            break
+    return min(times)
+
+
+def memory_peak(call) -> float:
+    """Peak Python-heap allocation of a call in MB."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        call()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        plt.close('all')
+    return peak / 2 ** 20
+
+
+def scaling_exponent(points: Dict[str, Dict], axis: str, metric: str) -> Optional[float]:
+    """
+    Log-log slope of a metric against the work of each point.
+
+    Work is the number of cells for 'cells' cases and of frames otherwise,
+    so 1.0 means linear scaling.
+    """
+    work, values = [], []
+    for point in points.values():
+        if point.get(metric, 0) > 0:
+            work.append(point['size'] ** 2 if axis == 'cells' else point['frames'])
+            values.append(point[metric])
+
+    if len(set(work)) < 2:
+        return None
+    return round(float(np.polyfit(np.log(work), np.log(values), 1)[0]), 3)
+
+
+def run_case(case: BenchmarkCase,
+             sizes: List[int],
+             frame_counts: List[int],
+             frame_grid: int,
+             repeats: int,
+             measure_memory: bool,
+             work_root: Path) -> Dict:
+    """
+    Time a case at each of its points.
+
+    Returns:
+        Dict with the axis, 'points' keyed '<size>x<frames>' (time_s,
+        peak_mb or error) and the time/memory exponents, or 'skipped' with
+        the reason when the case's module cannot be imported
+    """
+    result = {'axis': case.axis, 'points': {}}
+
+    for size, frames in case.points(sizes, frame_counts, frame_grid):
+        point = {'size': size, 'frames': frames}
+        work_dir = Path(tempfile.mkdtemp(dir=work_root))
+
+        try:
+            with redirect_stdout(io.StringIO()), warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                call = case.setup(size, frames, work_dir)
+                point['time_s'] = time_call(call, repeats)
+                if measure_memory:
+                    point['peak_mb'] = memory_peak(call)
+        except ImportError as e:
+            return {'axis': case.axis, 'skipped': str(e)}
+        except Exception as e:
+            point['error'] = f"{type(e).__name__}: {e}"
+        finally:
+            call = None
+            plt.close('all')
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        result['points'][f"{size}x{frames}"] = point
+
+    result['time_exponent'] = scaling_exponent(result['points'], case.axis, 'time_s')
+    result['memory_exponent'] = scaling_exponent(result['points'], case.axis, 'peak_mb')
+    return result
+
+
+def compare_to_baseline(results: Dict, baseline: Dict,
+                        time_tolerance: float = TIME_TOLERANCE,
+                        memory_tolerance: float = MEMORY_TOLERANCE,
+                        patterns: Optional[List[str]] = None) -> List[str]:
+    """
+    Find regressions against a baseline run.
+
+    Args:
+        results: Results of this run
+        baseline: Results of the baseline run
+        time_tolerance: Allowed relative slowdown per point
+        memory_tolerance: Allowed relative memory growth per point
+        patterns: Case patterns this run was limited to; baseline cases
+            outside them are not expected in the results
+
+    Returns:
+        One message per regressed point or scaling exponent, and per
+        baseline case with timings that is skipped or missing in this run
+    """
+    regressions = []
+
+    for name, base in baseline.get('cases', {}).items():
+        timed = any('time_s' in point for point in base.get('points', {}).values())
+        if not timed or not case_selected(name, patterns):
+            continue
+        result = results['cases'].get(name)
+        if result is None:
+            regressions.append(f"{name}: missing from this run")
+        elif 'skipped' in result:
+            regressions.append(f"{name}: now skipped ({result['skipped']})")
+
+    for name, result in results['cases'].items():
+        base = baseline.get('cases', {}).get(name)
+        if not base or 'skipped' in result or 'skipped' in base:
+            continue
+
+        for key, point in result['points'].items():
+            base_point = base['points'].get(key)
+            if not base_point or 'error' in base_point:
+                continue
+            if 'error' in point:
+                regressions.append(f"{name} @ {key}: now fails ({point['error']})")
+                continue
+
+            for metric, unit, tolerance, margin in (
+                    ('time_s', 's', time_tolerance, MIN_TIME_DELTA),
+                    ('peak_mb', 'MB', memory_tolerance, MIN_MEMORY_DELTA)):
+                if metric not in point or metric not in base_point:
+                    continue
+                new, old = point[metric], base_point[metric]
+                if new > old * (1 + tolerance) and new - old > margin:
+                    regressions.append(f"{name} @ {key}: {metric} {old:.3f}{unit} -> "
+                                       f"{new:.3f}{unit} (+{(new / old - 1) * 100:.0f}%)")
+
+        for metric, point_metric, floor in (('time_exponent', 'time_s', MIN_EXPONENT_TIME),
+                                            ('memory_exponent', 'peak_mb', MIN_EXPONENT_MEMORY)):
+            new, old = result.get(metric), base.get(metric)
+            largest = max((p.get(point_metric, 0) for p in base['points'].values()), default=0)
+            if (new is not None and old is not None and largest > floor
+                    and new > old + EXPONENT_TOLERANCE):
+                regressions.append(f"{name}: {metric} {old:.2f} -> {new:.2f}")
+
+    return regressions
+
+
+def format_time(seconds: float) -> str:
+    if seconds < 1:
+        return f"{seconds * 1000:8.1f} ms"
+    return f"{seconds:8.2f} s "
+
+
+def print_case(name: str, result: Dict):
+    """Print the scaling curve of one case."""
+    if 'skipped' in result:
+        print(f"{name}: skipped ({result['skipped']})")
+        return
+
+    print(f"{name} ({result['axis']})")
+    for point in result['points'].values():
+        label = (f"{point['size']}²" if result['axis'] == 'cells'
+                 else f"{point['frames']} frames")
+        if 'error' in point:
+            print(f"  {label:>12}  error: {point['error']}")
+            continue
+        memory = f"{point['peak_mb']:9.1f} MB" if 'peak_mb' in point else ''
+        print(f"  {label:>12}  {format_time(point['time_s'])}  {memory}")
+
+    exponents = [f"{metric} {result[f'{metric}_exponent']:.2f}"
+                 for metric in ('time', 'memory')
+                 if result.get(f'{metric}_exponent') is not None]
+    if exponents:
+        print(f"  {'exponent':>12}  {', '.join(exponents)}")
+
+
+def case_selected(name: str, patterns: Optional[List[str]]) -> bool:
+    """Whether a case name matches any glob pattern or contains it (always if None)."""
+    return not patterns or any(fnmatch.fnmatch(name, p) or p in name for p in patterns)
+
+
+def select_cases(patterns: Optional[List[str]]) -> List[BenchmarkCase]:
+    """Cases selected by the patterns (all if None)."""
+    return [case for case in all_cases() if case_selected(case.name, patterns)]
+
+
+def run_benchmark(cases: List[BenchmarkCase],
+                  sizes: List[int],
+                  frame_counts: List[int],
+                  frame_grid: int = FRAME_GRID,
+                  repeats: int = 3,
+                  measure_memory: bool = True) -> Dict:
+    """
+    Run cases and collect their scaling curves.
+
+    Returns:
+        Results dict with run 'meta' and per-case results under 'cases'
+    """
+    configure_figure_saving(formats=['png'], background=False)
+    cwd = os.getcwd()
+    work_root = Path(tempfile.mkdtemp(prefix='scaling_benchmark_'))
+
+    results = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'matplotlib': matplotlib.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'sizes': sizes,
+            'frame_counts': frame_counts,
+            'frame_grid': frame_grid,
+            'repeats': repeats
+        },
+        'cases': {}
+    }
+
+    # Summary functions save into visualization/figures under the cwd
+    os.chdir(work_root)
+    try:
+        for case in cases:
+            result = run_case(case, sizes, frame_counts, frame_grid,
+                              repeats, measure_memory, work_root)
+            results['cases'][case.name] = result
+            print_case(case.name, result)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_root, ignore_errors=True)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scaling benchmark for visualization functions')
+    parser.add_argument('--quick', action='store_true',
+                       help=f'Only {QUICK_SIZES} grids and {QUICK_FRAME_COUNTS} frames')
+    parser.add_argument('--sizes', type=int, nargs='+', help=f'Grid sides (default: {SIZES})')
+    parser.add_argument('--frames', type=int, nargs='+',
+                       help=f'Frame counts (default: {FRAME_COUNTS})')
+    parser.add_argument('--frame-grid', type=int, default=FRAME_GRID,
+                       help='Grid side of the frame-scaling cases')
+    parser.add_argument('--cases', nargs='+', help='Only cases matching these patterns')
+    parser.add_argument('--repeats', '-n', type=int, default=3, help='Timed calls per point')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the memory pass')
+    parser.add_argument('--output', '-o', help='Write results JSON here')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE),
+                       help='Baseline JSON to compare against (default: %(default)s)')
+    parser.add_argument('--save-baseline', action='store_true',
+                       help='Store this run as the baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=TIME_TOLERANCE,
+                       help='Allowed relative slowdown per point')
+    parser.add_argument('--memory-tolerance', type=float, default=MEMORY_TOLERANCE,
+                       help='Allowed relative memory growth per point')
+    parser.add_argument('--list', action='store_true', help='List cases and coverage, then exit')
+
+    args = parser.parse_args()
+
+    cases = select_cases(args.cases)
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+    frame_counts = args.frames or (QUICK_FRAME_COUNTS if args.quick else FRAME_COUNTS)
+
+    if args.list:
+        for case in cases:
+            print(f"{case.name} ({case.axis})")
+        for name, reason in uncovered_functions(all_cases()).items():
+            print(f"Not benchmarked: {name} {reason}".rstrip())
+        for name, reason in NOT_BENCHMARKED.items():
+            print(f"Not benchmarked: {name} ({reason})")
+        return
+
+    print(f"Scaling benchmark: {len(cases)} case(s), grids {sizes}, "
+          f"frames {frame_counts} on {args.frame_grid}² grids\n")
+
+    results = run_benchmark(cases, sizes, frame_counts, args.frame_grid,
+                            args.repeats, not args.no_memory)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to: {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to: {args.baseline}")
+        return
+
+    if not Path(args.baseline).exists():
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance,
+                                      args.memory_tolerance, args.cases)
+    if regressions:
+        print("\n" + "!" * 72)
+        print(f"PERFORMANCE REGRESSION: {len(regressions)} against {args.baseline}")
+        print("!" * 72)
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+
+    print(f"\nNo regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
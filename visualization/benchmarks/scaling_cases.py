@@ -0,0 +1,471 @@
+"""
+Benchmark cases for the scaling benchmark.
+
+Every case names the public function it times and builds its inputs from
+synthetic_data outside the timed call. Cases scale along one axis:
+'cells' cases take a single size x size grid, 'frames' cases a series of
+frames (or time steps) on a small grid.
+"""
+import importlib
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+import synthetic_data as synth
+
+# Modules whose every public function must have a case (see uncovered_functions)
+FIGURE_MODULES = ('spatial_patterns', 'phase_diagrams',
+                  'time_series_analysis', 'terrain_3d_visualization')
+
+# Video script modules deliberately left out, with the reason
+NOT_BENCHMARKED = {
+    'scripts.transitions': 'timed per effect by transitions_benchmark.py',
+    'scripts.video_assembler': 'FFmpeg-bound encoding and muxing',
+    'scripts.parallel_renderer': 'process-pool orchestration of composer frames',
+    'scripts.render_journal': 'checkpoint bookkeeping of chunked renders',
+    'scripts.shared_frames': 'inter-process frame transport'
+}
+
+FPS = 30
+
+
+class BenchmarkCase:
+    """One timed function with its input builder."""
+
+    def __init__(self,
+                 name: str,
+                 axis: str,
+                 setup: Callable,
+                 max_size: Optional[int] = None,
+                 max_frames: Optional[int] = None):
+        """
+        Args:
+            name: '<module>.<function>' or '<module>.<Class>.<method>'
+            axis: 'cells' or 'frames'
+            setup: setup(size, frames, work_dir) building the inputs and
+                returning the zero-argument call to time
+            max_size: Largest grid side timed (None: all)
+            max_frames: Largest frame count timed (None: all)
+        """
+        self.name = name
+        self.axis = axis
+        self.setup = setup
+        self.max_size = max_size
+        self.max_frames = max_frames
+
+    def points(self, sizes: List[int], frame_counts: List[int],
+               frame_grid: int) -> List[Tuple[int, int]]:
+        """(grid side, frames) points timed for this case."""
+        if self.axis == 'cells':
+            return [(size, 1) for size in sizes
+                    if self.max_size is None or size <= self.max_size]
+        return [(frame_grid, frames) for frames in frame_counts
+                if self.max_frames is None or frames <= self.max_frames]
+
+
+def _module(name: str):
+    return importlib.import_module(name)
+
+
+def _grid_arrays(size: int) -> Dict[str, np.ndarray]:
+    grid_arrays = _module('scripts.grid_arrays')
+    return grid_arrays.snapshot_to_arrays(synth.make_snapshot(size))
+
+
+def _figure_cases() -> List[BenchmarkCase]:
+    def spatial(function, **kwargs):
+        def setup(size, frames, work_dir):
+            plot = getattr(_module('spatial_patterns'), function)
+            grid = synth.make_snapshot(size)
+            return lambda: plot(grid, **kwargs)
+        return setup
+
+    def phase(function, *args):
+        def setup(size, frames, work_dir):
+            plot = getattr(_module('phase_diagrams'), function)
+            data = synth.make_phase_data(size)
+            return lambda: plot(data, *args)
+        return setup
+
+    def timeseries(function, **kwargs):
+        def setup(size, frames, work_dir):
+            plot = getattr(_module('time_series_analysis'), function)
+            data = synth.make_timeseries(frames)
+            return lambda: plot(data, **kwargs)
+        return setup
+
+    def terrain(function):
+        def setup(size, frames, work_dir):
+            plot = getattr(_module('terrain_3d_visualization'), function)
+            grid = synth.make_snapshot(size)
+            return lambda: plot(grid)
+        return setup
+
+    def animation_frames(size, frames, work_dir):
+        create = _module('spatial_patterns').create_animation_frames
+        snapshots = synth.make_fire_series(size, frames)
+        return lambda: create(snapshots, str(work_dir), fps=10)
+
+    def spatial_summary(size, frames, work_dir):
+        create = _module('spatial_patterns').create_spatial_summary
+        snapshots = {'bench': synth.make_snapshot(size)}
+        return lambda: create(snapshots, str(work_dir))
+
+    def multi_phase(size, frames, work_dir):
+        plot = _module('phase_diagrams').plot_multi_phase_diagrams
+        datasets = {'a': synth.make_phase_data(size, seed=0),
+                    'b': synth.make_phase_data(size, seed=1)}
+        return lambda: plot(datasets, 'temperature', 'tree_density')
+
+    def phase_summary(size, frames, work_dir):
+        create = _module('phase_diagrams').create_phase_diagram_summary
+        path = Path(work_dir) / 'phase_data_bench.csv'
+        synth.make_phase_data(size).to_csv(path, index=False)
+        return lambda: create({'bench': str(path)}, str(work_dir))
+
+    def scenario_comparison(size, frames, work_dir):
+        plot = _module('time_series_analysis').plot_multi_scenario_comparison
+        scenarios = {name: synth.make_timeseries(frames, seed=i)
+                     for i, name in enumerate(['baseline', 'RCP2.6', 'RCP4.5', 'RCP8.5'])}
+        return lambda: plot(scenarios, metric='burnt_area')
+
+    def timeseries_summary(size, frames, work_dir):
+        create = _module('time_series_analysis').create_time_series_summary
+        output = synth.write_simulation_output(Path(work_dir) / 'sim', size,
+                                               n_steps=frames)
+        return lambda: create({'bench': output}, str(work_dir))
+
+    def terrain_animation(size, frames, work_dir):
+        create = _module('terrain_3d_visualization').create_3d_animation
+        snapshots = synth.make_fire_series(size, frames)
+        return lambda: create(snapshots)
+
+    def terrain_summary(size, frames, work_dir):
+        create = _module('terrain_3d_visualization').create_3d_summary
+        snapshots = {'bench': synth.make_snapshot(size)}
+        return lambda: create(snapshots, str(work_dir))
+
+    return [
+        BenchmarkCase('spatial_patterns.plot_grid_state', 'cells',
+                      spatial('plot_grid_state', highlight_clusters=True)),
+        BenchmarkCase('spatial_patterns.plot_cluster_analysis', 'cells',
+                      spatial('plot_cluster_analysis')),
+        BenchmarkCase('spatial_patterns.plot_spatial_correlation', 'cells',
+                      spatial('plot_spatial_correlation'), max_size=500),
+        BenchmarkCase('spatial_patterns.plot_vegetation_distribution', 'cells',
+                      spatial('plot_vegetation_distribution')),
+        BenchmarkCase('spatial_patterns.create_animation_frames', 'frames',
+                      animation_frames, max_frames=100),
+        BenchmarkCase('spatial_patterns.create_spatial_summary', 'cells',
+                      spatial_summary, max_size=500),
+
+        # Phase sweeps of size x size runs
+        BenchmarkCase('phase_diagrams.plot_phase_diagram', 'cells',
+                      phase('plot_phase_diagram', 'temperature', 'tree_density'),
+                      max_size=200),
+        BenchmarkCase('phase_diagrams.plot_phase_boundary', 'cells',
+                      phase('plot_phase_boundary', 'tree_density'), max_size=200),
+        BenchmarkCase('phase_diagrams.plot_multi_phase_diagrams', 'cells',
+                      multi_phase, max_size=200),
+        BenchmarkCase('phase_diagrams.plot_susceptibility_peak', 'cells',
+                      phase('plot_susceptibility_peak', 'tree_density'), max_size=200),
+        BenchmarkCase('phase_diagrams.create_phase_diagram_summary', 'cells',
+                      phase_summary, max_size=200),
+
+        # Time series of 'frames' time steps
+        BenchmarkCase('time_series_analysis.plot_time_series', 'frames',
+                      timeseries('plot_time_series')),
+        BenchmarkCase('time_series_analysis.plot_multi_scenario_comparison', 'frames',
+                      scenario_comparison),
+        BenchmarkCase('time_series_analysis.plot_phase_evolution', 'frames',
+                      timeseries('plot_phase_evolution')),
+        BenchmarkCase('time_series_analysis.plot_seasonal_analysis', 'frames',
+                      timeseries('plot_seasonal_analysis', season_length=10)),
+        BenchmarkCase('time_series_analysis.plot_correlation_analysis', 'frames',
+                      timeseries('plot_correlation_analysis')),
+        BenchmarkCase('time_series_analysis.create_time_series_summary', 'frames',
+                      timeseries_summary),
+
+        BenchmarkCase('terrain_3d_visualization.create_3d_terrain_surface', 'cells',
+                      terrain('create_3d_terrain_surface'), max_size=500),
+        BenchmarkCase('terrain_3d_visualization.create_3d_animation', 'frames',
+                      terrain_animation, max_frames=100),
+        BenchmarkCase('terrain_3d_visualization.create_cross_section_view', 'cells',
+                      terrain('create_cross_section_view'), max_size=500),
+        BenchmarkCase('terrain_3d_visualization.create_multi_view_3d', 'cells',
+                      terrain('create_multi_view_3d'), max_size=500),
+        BenchmarkCase('terrain_3d_visualization.create_3d_summary', 'cells',
+                      terrain_summary, max_size=500),
+    ]
+
+
+def _video_cases() -> List[BenchmarkCase]:
+    def grid_arrays(function):
+        def setup(size, frames, work_dir):
+            convert = getattr(_module('scripts.grid_arrays'), function)
+            grid = synth.make_snapshot(size)
+            if function == 'encode_states':
+                return lambda: convert(grid['state'])
+            if function == 'arrays_to_dataframe':
+                arrays = _grid_arrays(size)
+                return lambda: convert(arrays)
+            return lambda: convert(grid)
+        return setup
+
+    def snapshot_digest(size, frames, work_dir):
+        digest = _module('scripts.frame_cache').snapshot_digest
+        grid = synth.make_snapshot(size)
+        return lambda: digest(grid)
+
+    def frame_metrics(function):
+        def setup(size, frames, work_dir):
+            metrics = _module('scripts.frame_metrics')
+            states = _grid_arrays(size)['state']
+            if function == 'percolation_indicator':
+                labels, n_clusters = metrics.fire_clusters(states)
+                largest = int(np.bincount(labels.ravel())[1:].max()) if n_clusters else 0
+                return lambda: metrics.percolation_indicator(labels, largest)
+            return lambda: getattr(metrics, function)(states)
+        return setup
+
+    def fire_interpolator(method):
+        def setup(size, frames, work_dir):
+            interpolator = _module('scripts.interpolator').FireStateInterpolator()
+            before, after = (_module('scripts.grid_arrays').snapshot_to_arrays(snapshot)['state']
+                             for snapshot in synth.make_fire_series(size, 2).values())
+            if method == 'schedule':
+                return lambda: interpolator.schedule(before, after)
+            schedule = interpolator.schedule(before, after)
+            return lambda: interpolator.states_at(schedule, 0.5)
+        return setup
+
+    def iter_frames(size, frames, work_dir):
+        interpolator = _module('scripts.interpolator').FrameInterpolator()
+        series = synth.make_fire_series(size, 10)
+        timestamps = [float(t) for t in series]
+        snapshots = list(series.values())
+
+        def run():
+            for _ in interpolator.iter_frames(snapshots, timestamps, FPS, frames / FPS):
+                pass
+        return run
+
+    def interpolate_frames(size, frames, work_dir):
+        interpolator = _module('scripts.interpolator').FrameInterpolator()
+        series = synth.make_fire_series(size, 10)
+        timestamps = [float(t) for t in series]
+        snapshots = list(series.values())
+        return lambda: interpolator.interpolate_frames(snapshots, timestamps, FPS, frames / FPS)
+
+    def smooth_trajectory(size, frames, work_dir):
+        interpolator = _module('scripts.interpolator').FrameInterpolator()
+        timestamps = np.linspace(0, 10, 10)
+        positions = np.column_stack([np.sin(timestamps), np.cos(timestamps)])
+        target_times = np.linspace(0, 10, frames)
+        return lambda: interpolator.smooth_trajectory(positions, timestamps, target_times)
+
+    def exporter(method):
+        def setup(size, frames, work_dir):
+            export = _module('scripts.data_exporter').SimulationDataExporter(
+                str(Path(work_dir) / 'export'))
+            series = synth.make_fire_series(size, 10)
+            if method == 'prepare_timeline':
+                return lambda: export.prepare_timeline(series, frames / FPS, FPS)
+            if method == 'iter_timeline':
+                timeline = export.prepare_timeline(series, frames / FPS, FPS)
+
+                def run():
+                    for _ in export.iter_timeline(timeline):
+                        pass
+                return run
+            return lambda: export.export_for_video(series, frames / FPS, FPS, 'bench')
+        return setup
+
+    def frame_store(method):
+        def setup(size, frames, work_dir):
+            store_module = _module('scripts.frame_store')
+            export = _module('scripts.data_exporter').SimulationDataExporter(
+                str(Path(work_dir) / 'export'))
+            timeline = export.prepare_timeline(synth.make_fire_series(size, 10),
+                                               frames / FPS, FPS)
+            path = Path(work_dir) / 'bench.ffstore'
+
+            if method == 'add_frame':
+                def run():
+                    writer = store_module.FrameStoreWriter(
+                        path, static_layers=timeline['static_layers'])
+                    for frame in export.iter_timeline(timeline):
+                        writer.add_frame(frame['state'], frame['layers'])
+                    writer.close()
+                return run
+
+            writer = store_module.FrameStoreWriter(path, static_layers=timeline['static_layers'])
+            for frame in export.iter_timeline(timeline):
+                writer.add_frame(frame['state'], frame['layers'])
+            writer.close()
+
+            def run():
+                store = store_module.FrameStore(path)
+                try:
+                    for n in range(len(store)):
+                        store.read_frame(n)
+                finally:
+                    store.close()
+            return run
+        return setup
+
+    def camera_paths(size, frames, work_dir):
+        controller = _module('scripts.camera_paths').CameraPathController()
+        return lambda: controller.get_cinematic_paths(frames / FPS, FPS)
+
+    def as_grid_arrays(size, frames, work_dir):
+        convert = _module('scripts.frame_generator').as_grid_arrays
+        grid = synth.make_snapshot(size)
+        return lambda: convert(grid)
+
+    def renderer(kind):
+        def setup(size, frames, work_dir):
+            generator = _module('scripts.frame_generator')
+            arrays = _grid_arrays(size)
+            if kind == 'grid':
+                render = generator.GridFrameRenderer()
+                return lambda: render.render_frame(arrays, 0)
+            if kind == 'zoom':
+                render = generator.ZoomFrameRenderer()
+                return lambda: render.render_frame(arrays, (size / 2, size / 2), 2.0)
+            if kind == 'split':
+                render = generator.SplitScreenRenderer()
+                return lambda: render.render_frame(arrays, arrays)
+            if kind == 'terrain':
+                render = generator.TerrainFrameRenderer()
+                camera = {'azimuth': -45, 'elevation': 30, 'distance': 10}
+                return lambda: render.render_3d_frame(arrays, camera)
+
+            render = generator.OverlayRenderer()
+            frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+            metrics = _module('scripts.frame_metrics').compute_frame_metrics(arrays['state'])
+            time_info = {'video_time': 1.0, 'simulation_time': 10.0}
+            return lambda: render.add_overlays(frame.copy(), metrics, time_info)
+        return setup
+
+    def cached_terrain(method):
+        def setup(size, frames, work_dir):
+            terrain_renderer = _module('scripts.terrain_renderer')
+            elevation = synth.make_terrain(size)['elevation']
+            if method == '__init__':
+                return lambda: terrain_renderer.CachedTerrainRenderer(elevation)
+            render = terrain_renderer.CachedTerrainRenderer(elevation)
+            colors = np.full(elevation.shape + (3,), 0.4)
+            camera = {'azimuth': -45, 'elevation': 30, 'distance': 10}
+            return lambda: render.render(colors, camera)
+        return setup
+
+    def composer(segment):
+        def setup(size, frames, work_dir):
+            composer_module = _module('scripts.segment_composer')
+            # The composer samples snapshots at 60 fps
+            duration = frames / 60
+            series = synth.make_fire_series(size, 10, time_step=duration / 10)
+
+            def run():
+                compose = composer_module.VideoSegmentComposer(str(Path(work_dir) / 'segments'))
+                if segment == 'finale':
+                    return compose.compose_finale_segment(series, series, duration, 0.0, 60)
+                if segment == 'middle':
+                    return compose.compose_middle_segment(series, duration, 0.0, 60)
+                return compose.compose_opening_segment(series, duration, 60)
+            return run
+        return setup
+
+    return [
+        BenchmarkCase('scripts.grid_arrays.grid_shape', 'cells', grid_arrays('grid_shape')),
+        BenchmarkCase('scripts.grid_arrays.encode_states', 'cells', grid_arrays('encode_states')),
+        BenchmarkCase('scripts.grid_arrays.snapshot_to_arrays', 'cells',
+                      grid_arrays('snapshot_to_arrays')),
+        BenchmarkCase('scripts.grid_arrays.arrays_to_dataframe', 'cells',
+                      grid_arrays('arrays_to_dataframe')),
+        BenchmarkCase('scripts.frame_cache.snapshot_digest', 'cells', snapshot_digest),
+        BenchmarkCase('scripts.frame_metrics.fire_clusters', 'cells',
+                      frame_metrics('fire_clusters')),
+        BenchmarkCase('scripts.frame_metrics.percolation_indicator', 'cells',
+                      frame_metrics('percolation_indicator')),
+        BenchmarkCase('scripts.frame_metrics.compute_frame_metrics', 'cells',
+                      frame_metrics('compute_frame_metrics')),
+        BenchmarkCase('scripts.interpolator.FireStateInterpolator.schedule', 'cells',
+                      fire_interpolator('schedule')),
+        BenchmarkCase('scripts.interpolator.FireStateInterpolator.states_at', 'cells',
+                      fire_interpolator('states_at')),
+        BenchmarkCase('scripts.interpolator.FrameInterpolator.iter_frames', 'frames',
+                      iter_frames),
+        BenchmarkCase('scripts.interpolator.FrameInterpolator.interpolate_frames', 'frames',
+                      interpolate_frames, max_frames=100),
+        BenchmarkCase('scripts.interpolator.FrameInterpolator.smooth_trajectory', 'frames',
+                      smooth_trajectory),
+        BenchmarkCase('scripts.data_exporter.SimulationDataExporter.prepare_timeline', 'frames',
+                      exporter('prepare_timeline')),
+        BenchmarkCase('scripts.data_exporter.SimulationDataExporter.iter_timeline', 'frames',
+                      exporter('iter_timeline')),
+        BenchmarkCase('scripts.data_exporter.SimulationDataExporter.export_for_video', 'frames',
+                      exporter('export_for_video')),
+        BenchmarkCase('scripts.frame_store.FrameStoreWriter.add_frame', 'frames',
+                      frame_store('add_frame')),
+        BenchmarkCase('scripts.frame_store.FrameStore.read_frame', 'frames',
+                      frame_store('read_frame')),
+        BenchmarkCase('scripts.camera_paths.CameraPathController.get_cinematic_paths', 'frames',
+                      camera_paths),
+        BenchmarkCase('scripts.frame_generator.as_grid_arrays', 'cells', as_grid_arrays),
+        BenchmarkCase('scripts.frame_generator.GridFrameRenderer.render_frame', 'cells',
+                      renderer('grid')),
+        BenchmarkCase('scripts.frame_generator.ZoomFrameRenderer.render_frame', 'cells',
+                      renderer('zoom')),
+        BenchmarkCase('scripts.frame_generator.SplitScreenRenderer.render_frame', 'cells',
+                      renderer('split')),
+        BenchmarkCase('scripts.frame_generator.TerrainFrameRenderer.render_3d_frame', 'cells',
+                      renderer('terrain'), max_size=500),
+        BenchmarkCase('scripts.frame_generator.OverlayRenderer.add_overlays', 'cells',
+                      renderer('overlay'), max_size=50),
+        BenchmarkCase('scripts.terrain_renderer.CachedTerrainRenderer.__init__', 'cells',
+                      cached_terrain('__init__'), max_size=500),
+        BenchmarkCase('scripts.terrain_renderer.CachedTerrainRenderer.render', 'cells',
+                      cached_terrain('render'), max_size=500),
+        BenchmarkCase('scripts.segment_composer.VideoSegmentComposer.compose_opening_segment',
+                      'frames', composer('opening'), max_frames=100),
+        BenchmarkCase('scripts.segment_composer.VideoSegmentComposer.compose_middle_segment',
+                      'frames', composer('middle'), max_frames=100),
+        BenchmarkCase('scripts.segment_composer.VideoSegmentComposer.compose_finale_segment',
+                      'frames', composer('finale'), max_frames=100),
+    ]
+
+
+def all_cases() -> List[BenchmarkCase]:
+    """Every benchmark case, figure modules first."""
+    return _figure_cases() + _video_cases()
+
+
+def uncovered_functions(cases: List[BenchmarkCase]) -> Dict[str, str]:
+    """
+    Public functions of the figure modules without a case.
+
+    Returns:
+        Dict of function name -> reason it was not checked ('' when the
+        module imports but the function has no case)
+    """
+    import inspect
+
+    covered = {case.name for case in cases}
+    uncovered = {}
+
+    for module_name in FIGURE_MODULES:
+        try:
+            module = _module(module_name)
+        except ImportError as e:
+            uncovered[module_name] = f"not importable ({e})"
+            continue
+
+        for name, function in inspect.getmembers(module, inspect.isfunction):
+            qualified = f"{module_name}.{name}"
+            if (function.__module__ == module_name and not name.startswith('_')
+                    and qualified not in covered):
+                uncovered[qualified] = ''
+
+    return uncovered
@@ -0,0 +1,178 @@
+"""
+Synthetic simulation data for the benchmarks.
+
+Snapshots are (x, y)-indexed DataFrames in the format returned by
+utils.data_loader.load_grid_snapshot. A fire spreads as a noisy ring from
+the grid centre over hilly terrain, so cluster sizes, burnt area and
+terrain detail grow with the grid the way a real run's do.
+"""
+from pathlib import Path
+from typing import Dict
+import numpy as np
+import pandas as pd
+
+STATE_NAMES = np.array(['Empty', 'Tree', 'Burning', 'Burnt'], dtype=object)
+VEGETATION_TYPES = np.array(['Grassland', 'SparseForest', 'DenseForest'], dtype=object)
+
+# Width of the burning front as a share of the grid radius
+FRONT_WIDTH = 0.06
+
+
+def make_terrain(size: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Static layers of a size x size grid.
+
+    Returns:
+        Dict of (size, size) arrays indexed [y, x]: elevation, moisture,
+        temperature, 'empty' mask, vegetation names and the 'distance' of
+        every cell from the ignition point (in grid radii, with noise)
+    """
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:size, 0:size] / max(size - 1, 1)
+
+    elevation = (500 + 60 * np.sin(6 * x) + 40 * np.cos(5 * y)
+                 + 25 * np.sin(11 * (x + y)) + rng.normal(0, 3, (size, size)))
+    moisture = np.clip(0.4 - (elevation - 500) / 400 + rng.normal(0, 0.05, (size, size)), 0, 1)
+    temperature = 25 + 5 * rng.random((size, size))
+
+    # Grassland in the valleys, dense forest on the slopes, sparse on the tops
+    vegetation = VEGETATION_TYPES[[0, 2, 1]][np.digitize(elevation, [520, 550])]
+
+    distance = np.hypot(x - 0.5, y - 0.5) / 0.5 + rng.normal(0, 0.03, (size, size))
+
+    return {
+        'elevation': elevation,
+        'moisture': moisture,
+        'temperature': temperature,
+        'vegetation': vegetation,
+        'empty': rng.random((size, size)) < 0.1,
+        'distance': distance
+    }
+
+
+def fire_states(terrain: Dict[str, np.ndarray], progress: float) -> np.ndarray:
+    """
+    State codes of the grid once the fire front has reached progress.
+
+    Args:
+        terrain: Result of make_terrain
+        progress: Front radius in grid radii (0: ignition, ~1.4: all burnt)
+
+    Returns:
+        (size, size) uint8 codes indexing STATE_NAMES
+    """
+    distance = terrain['distance']
+    states = np.ones(distance.shape, dtype=np.uint8)
+    states[distance < progress] = 2
+    states[distance < progress - FRONT_WIDTH] = 3
+    states[terrain['empty']] = 0
+    return states
+
+
+def snapshot_frame(terrain: Dict[str, np.ndarray], states: np.ndarray) -> pd.DataFrame:
+    """Snapshot DataFrame with an (x, y) MultiIndex from grids indexed [y, x]."""
+    size = states.shape[0]
+    y, x = np.mgrid[0:size, 0:size]
+    index = pd.MultiIndex.from_arrays([x.ravel(), y.ravel()], names=['x', 'y'])
+
+    return pd.DataFrame({
+        'state': STATE_NAMES[states.ravel()],
+        'elevation': terrain['elevation'].ravel(),
+        'vegetation': terrain['vegetation'].ravel(),
+        'moisture': terrain['moisture'].ravel(),
+        'temperature': terrain['temperature'].ravel()
+    }, index=index)
+
+
+def make_snapshot(size: int, progress: float = 0.5, seed: int = 0) -> pd.DataFrame:
+    """One size x size snapshot with the fire front at progress."""
+    terrain = make_terrain(size, seed)
+    return snapshot_frame(terrain, fire_states(terrain, progress))
+
+
+def make_fire_series(size: int, n_snapshots: int, seed: int = 0,
+                     time_step: float = 1.0) -> Dict[str, pd.DataFrame]:
+    """
+    Snapshots of one fire spreading over a size x size grid.
+
+    Returns:
+        Dict of str(float time) -> snapshot, as the video scripts expect
+    """
+    terrain = make_terrain(size, seed)
+    progress = np.linspace(0.05, 1.2, n_snapshots)
+    return {str(float(i * time_step)): snapshot_frame(terrain, fire_states(terrain, p))
+            for i, p in enumerate(progress)}
+
+
+def make_timeseries(n_steps: int, seed: int = 0) -> pd.DataFrame:
+    """Metrics time series with time as index, as from load_timeseries."""
+    rng = np.random.default_rng(seed)
+    time = np.linspace(0, 100, n_steps)
+
+    return pd.DataFrame({
+        'active_fires': np.maximum(0, 50 * np.sin(time / 10) + rng.normal(0, 5, n_steps)),
+        'burnt_area': np.cumsum(np.maximum(0, rng.normal(2, 1, n_steps))),
+        'percolation_indicator': 1 / (1 + np.exp(-0.1 * (time - 50))) + rng.normal(0, 0.05, n_steps),
+        'tree_density': 0.7 - 0.002 * time + rng.normal(0, 0.01, n_steps),
+        'largest_cluster': np.maximum(1, 20 * np.sin(time / 15) ** 2 + rng.normal(0, 3, n_steps))
+    }, index=pd.Index(time, name='time'))
+
+
+def make_phase_data(points_per_axis: int, seed: int = 0) -> pd.DataFrame:
+    """Temperature x tree density sweep of points_per_axis**2 runs."""
+    rng = np.random.default_rng(seed)
+    temperature, density = np.meshgrid(np.linspace(10, 40, points_per_axis),
+                                       np.linspace(0, 1, points_per_axis))
+    temperature = temperature.ravel()
+    density = density.ravel()
+
+    burnt = 1 / (1 + np.exp(-12 * (density - 0.55))) * (1 + 0.02 * (temperature - 25))
+    burnt = np.clip(burnt + rng.normal(0, 0.05, burnt.size), 0, 1)
+
+    return pd.DataFrame({
+        'temperature': temperature,
+        'tree_density': density,
+        'burnt_fraction': burnt,
+        'percolation': (burnt > 0.5).astype(int)
+    })
+
+
+def make_comparison_summary() -> pd.DataFrame:
+    """Scenario summary table, as in comparison_summary.csv."""
+    return pd.DataFrame([
+        {'scenario': 'baseline', 'total_burnt_area': 245, 'burn_duration': 48.5,
+         'max_cluster_size': 120, 'percolated': 'false'},
+        {'scenario': 'RCP2.6', 'total_burnt_area': 280, 'burn_duration': 45.2,
+         'max_cluster_size': 150, 'percolated': 'false'},
+        {'scenario': 'RCP4.5', 'total_burnt_area': 350, 'burn_duration': 41.8,
+         'max_cluster_size': 220, 'percolated': 'true'},
+        {'scenario': 'RCP8.5', 'total_burnt_area': 450, 'burn_duration': 35.7,
+         'max_cluster_size': 350, 'percolated': 'true'}
+    ])
+
+
+def write_simulation_output(output_dir: str,
+                            size: int,
+                            n_snapshots: int = 2,
+                            n_steps: int = 200,
+                            phase_points: int = 10,
+                            seed: int = 0) -> str:
+    """
+    Write a simulation output directory readable by load_simulation_output.
+
+    Returns:
+        The directory path
+    """
+    path = Path(output_dir)
+    path.mkdir(parents=True, exist_ok=True)
+
+    for i, snapshot in enumerate(make_fire_series(size, n_snapshots, seed).values()):
+        snapshot.reset_index().to_csv(path / f"step{i:04d}_grid.csv", index=False)
+
+    make_timeseries(n_steps, seed).reset_index().to_csv(
+        path / "baseline_timeseries.csv", index=False)
+    make_phase_data(phase_points, seed).to_csv(
+        path / "phase_data_density_temperature.csv", index=False)
+    make_comparison_summary().to_csv(path / "comparison_summary.csv", index=False)
+
+    return str(path)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the video transition effects.
+
+Times every effect in TransitionEffects on random frames, both allocating
+a new frame and writing in place into a reused buffer.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent / 'video'))
+
+from scripts.transitions import TransitionEffects
+
+
+def time_effect(effect: Callable, repeats: int) -> float:
+    """
+    Time an effect.
+
+    Args:
+        effect: Zero-argument callable applying the effect once
+        repeats: Number of timed calls
+
+    Returns:
+        Mean time per call in milliseconds
+    """
+    # Warm-up call builds any cached masks
+    effect()
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        effect()
+
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def build_cases(transitions: TransitionEffects,
+                frame1: np.ndarray,
+                frame2: np.ndarray,
+                out: np.ndarray) -> List[Tuple[str, Callable, Callable]]:
+    """List (name, allocating call, in-place call) for every effect."""
+    return [
+        ('cross_fade',
+         lambda: transitions.cross_fade(frame1, frame2, 0.4),
+         lambda: transitions.cross_fade(frame1, frame2, 0.4, out=out)),
+        ('wipe_horizontal',
+         lambda: transitions.split_screen_wipe(frame1, frame2, 0.4, 'horizontal'),
+         lambda: transitions.split_screen_wipe(frame1, frame2, 0.4, 'horizontal', out=out)),
+        ('wipe_vertical',
+         lambda: transitions.split_screen_wipe(frame1, frame2, 0.4, 'vertical'),
+         lambda: transitions.split_screen_wipe(frame1, frame2, 0.4, 'vertical', out=out)),
+        ('wipe_diagonal',
+         lambda: transitions.split_screen_wipe(frame1, frame2, 0.4, 'diagonal'),
+         lambda: transitions.split_screen_wipe(frame1, frame2, 0.4, 'diagonal', out=out)),
+        ('fade_to_black',
+         lambda: transitions.fade_to_black(frame1, 0.4),
+         lambda: transitions.fade_to_black(frame1, 0.4, out=out)),
+        ('fade_from_black',
+         lambda: transitions.fade_from_black(frame1, 0.4),
+         lambda: transitions.fade_from_black(frame1, 0.4, out=out)),
+        ('vignette',
+         lambda: transitions.apply_vignette(frame1, 0.3),
+         lambda: transitions.apply_vignette(frame1, 0.3, out=out)),
+        ('split_screen',
+         lambda: transitions.create_split_screen(frame1, frame2),
+         lambda: transitions.create_split_screen(frame1, frame2, out=out)),
+        ('motion_blur_0',
+         lambda: transitions.apply_motion_blur(frame1, 0, 10),
+         lambda: transitions.apply_motion_blur(frame1, 0, 10, out=out)),
+        ('motion_blur_30',
+         lambda: transitions.apply_motion_blur(frame1, 30, 10),
+         lambda: transitions.apply_motion_blur(frame1, 30, 10, out=out)),
+    ]
+
+
+def run_benchmark(resolution: Tuple[int, int] = (1920, 1080),
+                  repeats: int = 10) -> Dict[str, Dict[str, float]]:
+    """
+    Benchmark all transition effects at one resolution.
+
+    Args:
+        resolution: Frame (width, height)
+        repeats: Timed calls per effect
+
+    Returns:
+        Milliseconds per call keyed by effect, then by 'alloc'/'in_place'
+    """
+    width, height = resolution
+    rng = np.random.default_rng(0)
+    frame1 = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    frame2 = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    out = np.empty_like(frame1)
+
+    results = {}
+    for name, alloc, in_place in build_cases(TransitionEffects(), frame1, frame2, out):
+        results[name] = {
+            'alloc': time_effect(alloc, repeats),
+            'in_place': time_effect(in_place, repeats)
+        }
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark video transition effects')
+    parser.add_argument('--width', type=int, default=1920, help='Frame width')
+    parser.add_argument('--height', type=int, default=1080, help='Frame height')
+    parser.add_argument('--repeats', '-n', type=int, default=10,
+                       help='Timed calls per effect')
+
+    args = parser.parse_args()
+
+    print(f"Transition effects at {args.width}x{args.height} "
+          f"({args.repeats} calls each)")
+    print(f"{'effect':<18}{'alloc (ms)':>12}{'in place (ms)':>15}")
+
+    results = run_benchmark((args.width, args.height), args.repeats)
+    for name, timings in results.items():
+        print(f"{name:<18}{timings['alloc']:>12.2f}{timings['in_place']:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
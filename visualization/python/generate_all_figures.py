@@ -5,16 +5,30 @@ Processes simulation output files and creates comprehensive figure sets.
 """
 import os
 import sys
+import time
 import argparse
+import cProfile
+import traceback
+import multiprocessing as mp
+from functools import partial
 from pathlib import Path
 from typing import Dict, List, Optional
 import warnings
 
+import matplotlib
+import matplotlib.pyplot as plt
+import pandas as pd
+
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Import visualization modules
 from utils.data_loader import load_simulation_output, load_all_snapshots
+from utils.plot_config import (set_publication_style, figure_saving,
+                               wait_for_saves, record_figure_outputs, FIGURE_FORMATS)
+from utils.build_manifest import BuildManifest, MANIFEST_NAME
+from utils.profiling import (Profiler, use_profiler, profile_stage, summarize_events,
+                             format_summary, write_trace)
 from phase_diagrams import create_phase_diagram_summary
 from time_series_analysis import create_time_series_summary
 from spatial_patterns import create_spatial_summary, create_animation_frames
@@ -49,113 +63,395 @@ def find_simulation_outputs(base_dir: str = "output") -> Dict[str, str]:
     return outputs
 
 
+AVAILABLE_ANALYSES = {
+    'phase': 'Phase Diagrams',
+    'timeseries': 'Time Series Analysis',
+    'spatial': 'Spatial Patterns',
+    'climate': 'Climate Comparisons',
+    '3d': '3D Terrain Visualization',
+    'animation': 'Animation Frames'
+}
+
+# Analyses comparing all simulations at once; the others run per simulation
+CROSS_SIMULATION_ANALYSES = ('timeseries', 'climate')
+
+# Simulation output files each analysis reads
+ANALYSIS_INPUTS = {
+    'phase': ('phase_data*.csv',),
+    'timeseries': ('*_timeseries.csv',),
+    'spatial': ('*_grid.csv',),
+    'climate': ('*_timeseries.csv', 'comparison_summary.csv'),
+    '3d': ('*_grid.csv',),
+    'animation': ('*_grid.csv',)
+}
+
+# Plotting module of each analysis; the shared utils are added to all
+ANALYSIS_MODULES = {
+    'phase': 'phase_diagrams.py',
+    'timeseries': 'time_series_analysis.py',
+    'spatial': 'spatial_patterns.py',
+    'climate': 'climate_comparison.py',
+    '3d': 'terrain_3d_visualization.py',
+    'animation': 'spatial_patterns.py'
+}
+
+ANIMATION_PARAMS = {'fps': 10, 'show_metrics': True}
+
+
+def build_visualization_jobs(output_dirs: Dict[str, str],
+                             figure_dir: str,
+                             analyses: List[str],
+                             formats: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Split the requested analyses into independent (simulation, analysis) jobs.
+    
+    Jobs are ordered by analysis, then simulation name. Per-simulation
+    outputs are always qualified by the simulation name, so that no two jobs
+    write the same file and names do not change as simulations are added.
+    
+    Args:
+        output_dirs: Dict mapping names to output directories
+        figure_dir: Directory to save figures
+        analyses: Analyses to run, in order
+        formats: Figure formats to save (default: png, pdf and svg)
+        
+    Returns:
+        List of job dicts for run_visualization_job
+    """
+    formats = list(formats or FIGURE_FORMATS)
+    simulations = sorted(output_dirs)
+    jobs = []
+    
+    for analysis in analyses:
+        if analysis in CROSS_SIMULATION_ANALYSES:
+            jobs.append({
+                'analysis': analysis,
+                'simulation': None,
+                'output_dirs': {name: output_dirs[name] for name in simulations},
+                'figure_dir': figure_dir,
+                'formats': formats
+            })
+            continue
+        
+        for name in simulations:
+            job = {
+                'analysis': analysis,
+                'simulation': name,
+                'output_dir': output_dirs[name],
+                'figure_dir': figure_dir,
+                'formats': formats
+            }
+            if analysis == 'animation':
+                job['params'] = ANIMATION_PARAMS
+            jobs.append(job)
+    
+    return jobs
+
+
+def job_label(job: Dict) -> str:
+    """Short description of a job for progress and error reports."""
+    label = AVAILABLE_ANALYSES[job['analysis']]
+    if job['simulation'] is not None:
+        label += f" [{job['simulation']}]"
+    return label
+
+
+def job_key(job: Dict) -> str:
+    """Stable manifest key of a job."""
+    if job['simulation'] is None:
+        return job['analysis']
+    return f"{job['analysis']}/{job['simulation']}"
+
+
+def job_fingerprint(manifest: BuildManifest, job: Dict) -> str:
+    """
+    Fingerprint of everything a job's figures depend on.
+    
+    Covers the simulation files the analysis reads, the source of its
+    plotting module and the shared utils, and the job parameters (simulation
+    names and plotting options). Files are identified by their content and
+    their path within their simulation or script directory, so moving the
+    output or figure directories does not invalidate figures.
+    """
+    if job['simulation'] is None:
+        output_dirs = job['output_dirs']
+    else:
+        output_dirs = {job['simulation']: job['output_dir']}
+    
+    inputs = {f"{name}/{path.relative_to(output_dir).as_posix()}": path
+              for name, output_dir in output_dirs.items()
+              for pattern in ANALYSIS_INPUTS[job['analysis']]
+              for path in Path(output_dir).glob(pattern)}
+    
+    script_dir = Path(__file__).resolve().parent
+    sources = [script_dir / ANALYSIS_MODULES[job['analysis']]]
+    sources += sorted((script_dir / 'utils').glob('*.py'))
+    sources = {path.relative_to(script_dir).as_posix(): path for path in sources}
+    
+    params = {key: value for key, value in job.items()
+              if key not in ('output_dir', 'output_dirs', 'figure_dir')}
+    params['simulations'] = sorted(output_dirs)
+    
+    return manifest.fingerprint(inputs, sources, params)
+
+
+def _job_snapshots(job: Dict, snapshots: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """Snapshots of a job, keyed by the names its figures are saved under."""
+    return {f"{job['simulation']}_{name}": grid_data
+            for name, grid_data in snapshots.items()}
+
+
+def _run_phase(job: Dict):
+    phase_files = {f"{job['simulation']}_{phase_file.stem}": str(phase_file)
+                   for phase_file in sorted(Path(job['output_dir']).glob("phase_data*.csv"))}
+    
+    if phase_files:
+        create_phase_diagram_summary(phase_files, job['figure_dir'])
+    else:
+        print(f"No phase data files found for {job['simulation']}")
+
+
+def _run_timeseries(job: Dict):
+    create_time_series_summary(job['output_dirs'], job['figure_dir'])
+
+
+def _run_spatial(job: Dict):
+    if not list(Path(job['output_dir']).glob("*_grid.csv")):
+        print(f"No grid snapshots found for {job['simulation']}")
+        return
+    
+    sim_data = load_simulation_output(job['output_dir'])
+    if 'grid_snapshots' in sim_data:
+        create_spatial_summary(_job_snapshots(job, sim_data['grid_snapshots']),
+                               job['figure_dir'])
+
+
+def _run_climate(job: Dict):
+    create_climate_comparison_summary(job['output_dirs'], job['figure_dir'])
+
+
+def _run_3d(job: Dict):
+    sim_data = load_simulation_output(job['output_dir'])
+    snapshots = sim_data.get('grid_snapshots')
+    
+    if not snapshots:
+        print(f"No grid snapshots found for {job['simulation']}")
+        return
+    
+    # Check if elevation data exists
+    first_snapshot = next(iter(snapshots.values()))
+    if 'elevation' not in first_snapshot.columns:
+        print(f"No elevation data found for {job['simulation']}, skipping 3D visualization")
+        return
+    
+    create_3d_summary(_job_snapshots(job, snapshots), job['figure_dir'],
+                      animation_name=f"terrain_3d_animation_{job['simulation']}")
+
+
+def _run_animation(job: Dict):
+    name = job['simulation']
+    
+    # Load all grid snapshots for animation
+    snapshots = load_all_snapshots(job['output_dir'], pattern="*_grid.csv")
+    
+    if len(snapshots) <= 1:
+        print(f"Not enough snapshots for animation in {name}")
+        return
+    
+    # Every simulation gets its own frames directory and GIF
+    animation_dir = Path(job['figure_dir']) / name
+    
+    print(f"Creating animation for {name} with {len(snapshots)} frames...")
+    animation_path = create_animation_frames(snapshots, str(animation_dir),
+                                             **job['params'])
+    print(f"Animation saved to: {animation_path}")
+
+
+JOB_RUNNERS = {
+    'phase': _run_phase,
+    'timeseries': _run_timeseries,
+    'spatial': _run_spatial,
+    'climate': _run_climate,
+    '3d': _run_3d,
+    'animation': _run_animation
+}
+
+
+def init_visualization_worker():
+    """Give a worker process its own non-interactive Matplotlib state."""
+    matplotlib.use('Agg')
+    set_publication_style()
+
+
+def run_visualization_job(job: Dict,
+                          profile: bool = False,
+                          cprofile_dir: Optional[str] = None) -> Dict:
+    """
+    Run one job, capturing its error instead of raising it.
+    
+    Args:
+        job: Job dict from build_visualization_jobs
+        profile: Record load, analysis and save stages of the job
+        cprofile_dir: Directory for a cProfile dump of the job, named after
+            its manifest key (no dump if None)
+        
+    Returns:
+        Dict with the job 'label', 'elapsed' seconds, 'error' (formatted
+        traceback, or None on success), the 'outputs' it wrote and
+        profiling 'events'
+    """
+    start = time.perf_counter()
+    error = None
+    profiler = Profiler() if profile else None
+    code_profile = cProfile.Profile() if cprofile_dir else None
+    
+    with use_profiler(profiler), record_figure_outputs() as outputs:
+        try:
+            # The job's save defaults must not outlive it (serial runs share
+            # the caller's process)
+            with figure_saving(formats=job['formats'], background=True), \
+                    profile_stage(f"analysis.{job['analysis']}", job=job_label(job)):
+                if code_profile:
+                    code_profile.enable()
+                try:
+                    JOB_RUNNERS[job['analysis']](job)
+                finally:
+                    # Figures are written in the background while the job
+                    # plots on; all of them belong to this job
+                    wait_for_saves()
+                    if code_profile:
+                        code_profile.disable()
+        except Exception:
+            error = traceback.format_exc()
+        finally:
+            # Figures a job left open must not leak into the next one
+            plt.close('all')
+    
+    if code_profile:
+        dump_path = Path(cprofile_dir) / f"{job_key(job)}.prof"
+        dump_path.parent.mkdir(parents=True, exist_ok=True)
+        code_profile.dump_stats(str(dump_path))
+    
+    return {
+        'label': job_label(job),
+        'elapsed': time.perf_counter() - start,
+        'error': error,
+        'outputs': outputs,
+        'events': profiler.events if profiler else []
+    }
+
+
 def generate_all_visualizations(output_dirs: Dict[str, str],
                               figure_dir: str = "visualization/figures",
-                              selected_analyses: Optional[List[str]] = None):
+                              selected_analyses: Optional[List[str]] = None,
+                              workers: Optional[int] = None,
+                              force: bool = False,
+                              formats: Optional[List[str]] = None,
+                              profile: bool = False,
+                              cprofile: bool = False) -> List[Dict]:
     """
     Generate all visualization types from simulation outputs.
     
+    Every (simulation, analysis) pair runs as an independent job on a
+    process pool; a failing job is reported without stopping the others.
+    Jobs whose inputs, plotting code and parameters match the build
+    manifest in figure_dir are skipped.
+    
     Args:
         output_dirs: Dict mapping names to output directories
         figure_dir: Directory to save figures
         selected_analyses: List of analyses to run (if None, run all)
+        workers: Number of worker processes (default: CPU count; 1 runs the
+            jobs in this process)
+        force: Regenerate every figure, ignoring the build manifest
+        formats: Figure formats to save (default: png, pdf and svg)
+        profile: Write a stage trace (profile/trace.json) and summary table
+            (profile/summary.txt) to figure_dir
+        cprofile: Dump a cProfile of every job to figure_dir/profile
+        
+    Returns:
+        Results of the failed jobs, as from run_visualization_job
     """
     # Create figure directory
     Path(figure_dir).mkdir(parents=True, exist_ok=True)
     
-    available_analyses = {
-        'phase': 'Phase Diagrams',
-        'timeseries': 'Time Series Analysis',
-        'spatial': 'Spatial Patterns',
-        'climate': 'Climate Comparisons',
-        '3d': '3D Terrain Visualization',
-        'animation': 'Animation Frames'
-    }
-    
     # Determine which analyses to run
     if selected_analyses:
-        analyses_to_run = [a for a in selected_analyses if a in available_analyses]
+        analyses_to_run = [a for a in selected_analyses if a in AVAILABLE_ANALYSES]
     else:
-        analyses_to_run = list(available_analyses.keys())
+        analyses_to_run = list(AVAILABLE_ANALYSES.keys())
+    
+    profile_dir = Path(figure_dir) / 'profile'
+    profiler = Profiler() if profile else None
+    run_job = partial(run_visualization_job, profile=profile,
+                      cprofile_dir=str(profile_dir) if cprofile else None)
+    
+    manifest = BuildManifest(Path(figure_dir) / MANIFEST_NAME)
+    jobs = []
+    fingerprints = []
+    skipped = 0
+    
+    with use_profiler(profiler), profile_stage('build.fingerprint'):
+        for job in build_visualization_jobs(output_dirs, figure_dir,
+                                            analyses_to_run, formats):
+            fingerprint = job_fingerprint(manifest, job)
+            if not force and manifest.is_current(job_key(job), fingerprint):
+                skipped += 1
+                continue
+            jobs.append(job)
+            fingerprints.append(fingerprint)
+    
+    workers = min(workers or mp.cpu_count(), max(len(jobs), 1))
     
     print(f"\nGenerating visualizations for {len(output_dirs)} simulation(s)...")
-    print(f"Analyses to run: {', '.join(analyses_to_run)}\n")
+    print(f"Analyses to run: {', '.join(analyses_to_run)}")
+    print(f"Skipping {skipped} up-to-date job(s)")
+    print(f"Running {len(jobs)} job(s) on {workers} worker(s)\n")
     
-    # Phase diagram analysis
-    if 'phase' in analyses_to_run:
-        print("\n=== Generating Phase Diagrams ===")
-        phase_files = {}
-        
-        for name, output_dir in output_dirs.items():
-            phase_data_files = list(Path(output_dir).glob("phase_data*.csv"))
-            for phase_file in phase_data_files:
-                phase_files[f"{name}_{phase_file.stem}"] = str(phase_file)
-        
-        if phase_files:
-            create_phase_diagram_summary(phase_files, figure_dir)
+    failures = []
+    events = profiler.events if profiler else []
+    
+    def report(job: Dict, fingerprint: str, result: Dict):
+        status = '✗' if result['error'] else '✓'
+        print(f"{status} {result['label']} ({result['elapsed']:.1f}s)")
+        events.extend(result['events'])
+        if result['error']:
+            failures.append(result)
         else:
-            print("No phase data files found")
+            manifest.record(job_key(job), fingerprint, result['outputs'])
     
-    # Time series analysis
-    if 'timeseries' in analyses_to_run:
-        print("\n=== Generating Time Series Plots ===")
-        create_time_series_summary(output_dirs, figure_dir)
+    try:
+        if workers == 1:
+            for job, fingerprint in zip(jobs, fingerprints):
+                report(job, fingerprint, run_job(job))
+        else:
+            with mp.Pool(processes=workers, initializer=init_visualization_worker) as pool:
+                # Results arrive in job order, so reports are deterministic
+                results = pool.imap(run_job, jobs, chunksize=1)
+                for job, fingerprint, result in zip(jobs, fingerprints, results):
+                    report(job, fingerprint, result)
+    finally:
+        # Keep the jobs finished so far even if the batch is interrupted
+        manifest.save()
     
-    # Spatial pattern analysis
-    if 'spatial' in analyses_to_run:
-        print("\n=== Generating Spatial Pattern Analysis ===")
-        
-        for name, output_dir in output_dirs.items():
-            # Load final grid snapshots
-            grid_files = list(Path(output_dir).glob("*_grid.csv"))
-            
-            if grid_files:
-                # Use the most recent snapshot
-                grid_file = sorted(grid_files)[-1]
-                sim_data = load_simulation_output(output_dir)
-                
-                if 'grid_snapshots' in sim_data:
-                    create_spatial_summary(sim_data['grid_snapshots'], figure_dir)
-            else:
-                print(f"No grid snapshots found for {name}")
+    for result in failures:
+        print(f"\n✗ {result['label']} failed:\n{result['error']}")
     
-    # Climate comparison
-    if 'climate' in analyses_to_run:
-        print("\n=== Generating Climate Comparisons ===")
-        create_climate_comparison_summary(output_dirs, figure_dir)
+    print(f"\n✓ {len(jobs) - len(failures)} of {len(jobs)} job(s) completed; "
+          f"visualizations generated in: {figure_dir}")
     
-    # 3D terrain visualization
-    if '3d' in analyses_to_run:
-        print("\n=== Generating 3D Terrain Visualizations ===")
-        
-        for name, output_dir in output_dirs.items():
-            sim_data = load_simulation_output(output_dir)
-            
-            if 'grid_snapshots' in sim_data:
-                # Check if elevation data exists
-                first_snapshot = next(iter(sim_data['grid_snapshots'].values()))
-                if 'elevation' in first_snapshot.columns:
-                    create_3d_summary(sim_data['grid_snapshots'], figure_dir)
-                else:
-                    print(f"No elevation data found for {name}, skipping 3D visualization")
-    
-    # Animation frames
-    if 'animation' in analyses_to_run:
-        print("\n=== Generating Animation Frames ===")
-        
-        for name, output_dir in output_dirs.items():
-            # Load all grid snapshots for animation
-            snapshots = load_all_snapshots(output_dir, pattern="*_grid.csv")
-            
-            if len(snapshots) > 1:
-                print(f"Creating animation for {name} with {len(snapshots)} frames...")
-                animation_path = create_animation_frames(snapshots, figure_dir, 
-                                                       fps=10, show_metrics=True)
-                print(f"Animation saved to: {animation_path}")
-            else:
-                print(f"Not enough snapshots for animation in {name}")
+    if profile:
+        summary = format_summary(summarize_events(events))
+        write_trace(events, profile_dir / 'trace.json')
+        with open(profile_dir / 'summary.txt', 'w') as f:
+            f.write(summary + '\n')
+        print(f"\n=== Profile ===\n{summary}")
+        print(f"Trace written to: {profile_dir / 'trace.json'}")
+    
+    if cprofile:
+        print(f"cProfile dumps written to: {profile_dir}")
     
-    print(f"\n✓ All visualizations generated in: {figure_dir}")
+    return failures
 
 
 def generate_sample_data(output_dir: str = "output/sample"):
@@ -291,6 +587,34 @@ def main():
         '--simulation', '-sim',
         help='Process only a specific simulation by name'
     )
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        help='Number of worker processes (default: CPU count, 1 to run in-process)'
+    )
+    parser.add_argument(
+        '--formats',
+        nargs='+',
+        choices=FIGURE_FORMATS,
+        help='Figure formats to save (default: png pdf svg)'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Time loading, analysis and saving stages; writes a JSON trace and '
+             'summary table to <figure-dir>/profile (use with --force to profile '
+             'up-to-date jobs too)'
+    )
+    parser.add_argument(
+        '--cprofile',
+        action='store_true',
+        help='Dump a cProfile of every job to <figure-dir>/profile'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Regenerate all figures, even those up to date in the build manifest'
+    )
     
     args = parser.parse_args()
     
@@ -322,13 +646,16 @@ def main():
         print(f"  - {name}: {path}")
     
     # Generate visualizations
-    try:
-        generate_all_visualizations(output_dirs, args.figure_dir, args.analyses)
-        print("\n✓ Visualization generation complete!")
-    except Exception as e:
-        print(f"\n✗ Error during visualization: {e}")
-        import traceback
-        traceback.print_exc()
+    failures = generate_all_visualizations(output_dirs, args.figure_dir,
+                                           args.analyses, workers=args.workers,
+                                           force=args.force, formats=args.formats,
+                                           profile=args.profile, cprofile=args.cprofile)
+    
+    if failures:
+        print(f"\n✗ {len(failures)} visualization job(s) failed")
+        sys.exit(1)
+    
+    print("\n✓ Visualization generation complete!")
 
 
 if __name__ == "__main__":
@@ -20,7 +20,7 @@ from utils.data_loader import (load_grid_snapshot, infer_grid_dimensions,
                               load_all_snapshots)
 from utils.plot_config import (create_figure_with_subplots, save_figure,
                               format_axis_labels, add_colorbar, set_log_scale,
-                              add_annotation)
+                              add_annotation, record_figure_output)
 from utils.color_schemes import (create_state_colormap, CELL_STATE_COLORS,
                                 VEGETATION_COLORS, create_vegetation_colormap,
                                 get_colorbar_label)
@@ -668,6 +668,7 @@ def create_animation_frames(snapshots: Dict[str, pd.DataFrame],
     # Save as GIF
     animation_path = Path(output_dir) / 'fire_spread_animation.gif'
     imageio.mimsave(animation_path, images, fps=fps, loop=0)
+    record_figure_output(animation_path)
     
     print(f'Animation saved to: {animation_path}')
     
@@ -16,7 +16,7 @@ from utils.data_loader import (load_grid_snapshot, grid_to_matrix,
                               extract_state_matrix, infer_grid_dimensions,
                               load_all_snapshots)
 from utils.color_schemes import CELL_STATE_COLORS, VEGETATION_COLORS
-from utils.plot_config import save_figure
+from utils.plot_config import save_figure, record_figure_output
 
 
 def create_3d_terrain_surface(grid_data: pd.DataFrame,
@@ -165,11 +165,13 @@ def create_3d_terrain_surface(grid_data: pd.DataFrame,
         # Save as HTML for interactivity
         html_path = output_name.replace('.png', '.html').replace('.pdf', '.html')
         fig.write_html(html_path)
+        record_figure_output(html_path)
         print(f"Saved interactive plot to: {html_path}")
         
         # Also save static image
         try:
             fig.write_image(f"{output_name}.png", width=1200, height=900, scale=2)
+            record_figure_output(f"{output_name}.png")
             print(f"Saved static image to: {output_name}.png")
         except:
             print("Note: Install kaleido package for static image export")
@@ -320,6 +322,7 @@ def create_3d_animation(snapshots: Dict[str, pd.DataFrame],
     if output_name:
         html_path = output_name.replace('.png', '_animation.html')
         fig.write_html(html_path)
+        record_figure_output(html_path)
         print(f"Saved animation to: {html_path}")
     
     return fig
@@ -504,19 +507,22 @@ def create_multi_view_3d(grid_data: pd.DataFrame,
     if output_name:
         html_path = output_name.replace('.png', '_multiview.html')
         fig.write_html(html_path)
+        record_figure_output(html_path)
         print(f"Saved multi-view to: {html_path}")
     
     return fig
 
 
 def create_3d_summary(grid_snapshots: Dict[str, pd.DataFrame],
-                     output_dir: str = "visualization/figures"):
+                     output_dir: str = "visualization/figures",
+                     animation_name: str = 'terrain_3d_animation'):
     """
     Create comprehensive 3D visualizations from grid snapshots.
     
     Args:
         grid_snapshots: Dict mapping names to grid DataFrames
         output_dir: Output directory for figures
+        animation_name: Output name of the animation over all snapshots
     """
     for name, grid_data in grid_snapshots.items():
         print(f"Processing 3D visualization for {name}...")
@@ -549,4 +555,4 @@ def create_3d_summary(grid_snapshots: Dict[str, pd.DataFrame],
     if len(grid_snapshots) > 1:
         print("Creating 3D animation...")
         fig_anim = create_3d_animation(grid_snapshots,
-                                     output_name='terrain_3d_animation')
\ No newline at end of file
+                                     output_name=animation_name)
\ No newline at end of file
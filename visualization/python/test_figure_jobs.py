@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests that figure jobs are only rebuilt when what they plot changes.
+"""
+import shutil
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from generate_all_figures import build_visualization_jobs, job_fingerprint, job_key
+from utils.build_manifest import BuildManifest
+
+ANALYSES = ['spatial', 'animation', 'climate']
+
+
+def write_simulation(output_dir: Path, value: int = 1) -> str:
+    output_dir.mkdir(parents=True)
+    (output_dir / 'step_000_grid.csv').write_text(f"x,y,state\n0,0,{value}\n")
+    (output_dir / 'baseline_timeseries.csv').write_text(f"time,burnt\n0,{value}\n")
+    return str(output_dir)
+
+
+def fingerprints(output_dirs, figure_dir: Path):
+    manifest = BuildManifest(figure_dir / 'manifest.json')
+    return {job_key(job): job_fingerprint(manifest, job)
+            for job in build_visualization_jobs(output_dirs, str(figure_dir), ANALYSES)}
+
+
+def test_adding_a_simulation_keeps_existing_jobs(tmp_path):
+    baseline = write_simulation(tmp_path / 'baseline')
+    alone = fingerprints({'baseline': baseline}, tmp_path / 'figures')
+
+    rcp85 = write_simulation(tmp_path / 'rcp85', value=2)
+    both = fingerprints({'baseline': baseline, 'rcp85': rcp85}, tmp_path / 'figures')
+
+    for key in ('spatial/baseline', 'animation/baseline'):
+        assert alone[key] == both[key], key
+    assert alone['climate'] != both['climate']
+
+
+def test_moved_outputs_keep_fingerprints(tmp_path):
+    baseline = write_simulation(tmp_path / 'run' / 'baseline')
+    before = fingerprints({'baseline': baseline}, tmp_path / 'figures')
+
+    moved = tmp_path / 'archive' / 'baseline'
+    shutil.copytree(baseline, moved)
+    after = fingerprints({'baseline': str(moved)}, tmp_path / 'other_figures')
+    assert before == after
+
+    (moved / 'step_000_grid.csv').write_text("x,y,state\n0,0,3\n")
+    changed = fingerprints({'baseline': str(moved)}, tmp_path / 'other_figures')
+    assert changed['spatial/baseline'] != before['spatial/baseline']
+    assert changed['climate'] == before['climate']
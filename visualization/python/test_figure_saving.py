@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for the save_figure defaults and foreground/background saving.
+"""
+import sys
+from pathlib import Path
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from utils import plot_config
+from utils.plot_config import save_figure, figure_saving, wait_for_saves
+
+FORMATS = ['png', 'pdf', 'svg']
+
+
+@pytest.fixture(autouse=True)
+def reproducible_output(monkeypatch):
+    # Fixed timestamps and SVG ids make repeated saves byte-identical
+    monkeypatch.setenv('SOURCE_DATE_EPOCH', '0')
+    monkeypatch.setitem(matplotlib.rcParams, 'svg.hashsalt', 'test')
+
+
+def sample_figure() -> plt.Figure:
+    fig, ax = plt.subplots()
+    ax.pcolormesh(np.arange(100 * 100).reshape(100, 100))
+    ax.plot([0, 50, 100], [100, 0, 50], color='red')
+    ax.set_title('sample')
+    return fig
+
+
+def test_foreground_save_keeps_figure_open_and_matches_background(tmp_path):
+    fig = sample_figure()
+    save_figure(fig, 'figure', str(tmp_path / 'foreground'), FORMATS, background=False)
+
+    assert fig.number in plt.get_fignums()
+
+    save_figure(fig, 'figure', str(tmp_path / 'background'), FORMATS, background=True)
+    wait_for_saves()
+
+    assert fig.number not in plt.get_fignums()
+    for fmt in FORMATS:
+        foreground = (tmp_path / 'foreground' / f'figure.{fmt}').read_bytes()
+        background = (tmp_path / 'background' / f'figure.{fmt}').read_bytes()
+        assert foreground == background, fmt
+
+
+def test_figure_saving_restores_previous_defaults():
+    before = dict(plot_config._save_settings)
+
+    with pytest.raises(RuntimeError):
+        with figure_saving(formats=['png'], background=not before['background']):
+            assert plot_config._save_settings == {'formats': ['png'],
+                                                  'background': not before['background']}
+            raise RuntimeError("job failed")
+
+    assert plot_config._save_settings == before
@@ -0,0 +1,121 @@
+"""
+Build manifest for incremental figure generation.
+Records a content fingerprint of every build job (input files, plotting
+module sources and parameters) and the files it wrote, so figures are only
+regenerated when their inputs changed or an output is missing or modified.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+MANIFEST_NAME = '.figure_manifest.json'
+MANIFEST_VERSION = 3
+
+
+def output_signature(path: str) -> Optional[List[int]]:
+    """(size, modification time in ns) of a file, or None if it is missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class BuildManifest:
+    """Fingerprints and outputs of the last successful build of each job."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Manifest file; a missing or unreadable file starts empty
+        """
+        self.path = Path(path)
+        self._entries = self._load()
+        self._file_hashes = {}
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        if manifest.get('version') != MANIFEST_VERSION:
+            return {}
+        return manifest.get('jobs', {})
+
+    def hash_file(self, path: str) -> str:
+        """SHA-256 of a file's contents, computed once per run."""
+        key = str(path)
+        if key not in self._file_hashes:
+            digest = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+            self._file_hashes[key] = digest.hexdigest()
+        return self._file_hashes[key]
+
+    def fingerprint(self,
+                    inputs: Dict[str, str],
+                    sources: Dict[str, str],
+                    params: Dict) -> str:
+        """
+        Fingerprint of one build job.
+
+        Files are hashed under the given names rather than their paths, so
+        the same files at another location give the same fingerprint.
+
+        Args:
+            inputs: Data files the job reads, keyed by name
+            sources: Source files of the plotting code it runs, keyed by name
+            params: JSON-serializable job parameters
+
+        Returns:
+            Hex digest changing whenever any input, source or parameter does
+        """
+        digest = hashlib.sha256()
+
+        for kind, files in (('input', inputs), ('source', sources)):
+            for name in sorted(files):
+                digest.update(f"{kind}:{name}:{self.hash_file(files[name])}\n".encode())
+
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def is_current(self, key: str, fingerprint: str) -> bool:
+        """
+        Whether the job was last built from exactly this fingerprint and
+        every file it wrote is still there, unchanged since.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry['fingerprint'] != fingerprint:
+            return False
+
+        return all(signature is not None and output_signature(path) == signature
+                   for path, signature in entry['outputs'].items())
+
+    def record(self, key: str, fingerprint: str, outputs: Iterable[str] = ()):
+        """
+        Record a successful build of a job.
+
+        Args:
+            key: Job key
+            fingerprint: Fingerprint the job was built from
+            outputs: Files the job wrote
+        """
+        self._entries[key] = {
+            'fingerprint': fingerprint,
+            'outputs': {str(path): output_signature(path) for path in outputs}
+        }
+
+    def save(self):
+        """Write the manifest atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': MANIFEST_VERSION, 'jobs': self._entries},
+                      f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
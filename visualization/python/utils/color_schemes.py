@@ -32,6 +32,17 @@ VEGETATION_COLORS = {
     'Barren': '#D2B48C'           # Tan
 }
 
+# Numeric vegetation mapping (unknown types map to Barren, i.e. no fuel)
+VEGETATION_NUMERIC_MAP = {
+    'Barren': 0,
+    'DenseForest': 1,
+    'SparseForest': 2,
+    'Shrubland': 3,
+    'Grassland': 4,
+    'Water': 5,
+    'Urban': 6
+}
+
 # Phase colors
 PHASE_COLORS = {
     'SubCritical': '#4169E1',     # Royal blue
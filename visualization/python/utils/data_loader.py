@@ -6,7 +6,10 @@ import numpy as np
 from pathlib import Path
 from typing import Tuple, Dict, List, Optional
 
+from .profiling import profiled
 
+
+@profiled('load.timeseries')
 def load_timeseries(filepath: str) -> pd.DataFrame:
     """
     Load time series data from CSV file.
@@ -23,6 +26,7 @@ def load_timeseries(filepath: str) -> pd.DataFrame:
     return df
 
 
+@profiled('load.grid_snapshot')
 def load_grid_snapshot(filepath: str) -> pd.DataFrame:
     """
     Load grid snapshot data from CSV file.
@@ -39,6 +43,7 @@ def load_grid_snapshot(filepath: str) -> pd.DataFrame:
     return df
 
 
+@profiled('load.phase_data')
 def load_phase_data(filepath: str) -> pd.DataFrame:
     """
     Load phase transition data from CSV file.
@@ -52,6 +57,7 @@ def load_phase_data(filepath: str) -> pd.DataFrame:
     return pd.read_csv(filepath)
 
 
+@profiled('load.climate_scenarios')
 def load_climate_scenarios(filepath: str) -> pd.DataFrame:
     """
     Load climate scenario data from CSV file.
@@ -65,6 +71,7 @@ def load_climate_scenarios(filepath: str) -> pd.DataFrame:
     return pd.read_csv(filepath)
 
 
+@profiled('load.comparison_summary')
 def load_comparison_summary(filepath: str) -> pd.DataFrame:
     """
     Load comparison summary data from CSV file.
@@ -1,11 +1,33 @@
 """
 Plotting configuration for publication-quality figures.
 """
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import matplotlib.pyplot as plt
 import matplotlib as mpl
 from pathlib import Path
 from typing import Tuple, List, Optional
 
+from .profiling import profile_stage
+
+FIGURE_FORMATS = ['png', 'pdf', 'svg']
+VECTOR_FORMATS = ('pdf', 'svg', 'eps', 'ps')
+PNG_DPI = 300
+
+# Collections with at least this many elements (mesh cells, markers) are
+# embedded as images in vector output instead of one path per element
+RASTERIZE_MIN_ELEMENTS = 5000
+
+# Defaults for save_figure, set through configure_figure_saving
+_save_settings = {'formats': list(FIGURE_FORMATS), 'background': False}
+_save_executor = None
+_pending_saves = []
+_save_lock = threading.Lock()
+
+# Output paths collected by record_figure_outputs (None when not recording)
+_recorded_outputs = None
+
 
 def set_publication_style():
     """
@@ -77,30 +99,196 @@ def get_figure_size(fig_type: str = 'default') -> Tuple[float, float]:
     return sizes.get(fig_type, sizes['default'])
 
 
+def configure_figure_saving(formats: Optional[List[str]] = None,
+                            background: Optional[bool] = None):
+    """
+    Set the defaults of save_figure.
+    
+    Args:
+        formats: Formats saved when a call does not name any
+        background: Whether formats are written on a background thread
+    """
+    if formats is not None:
+        _save_settings['formats'] = list(formats)
+    if background is not None:
+        _save_settings['background'] = background
+
+
+@contextmanager
+def figure_saving(formats: Optional[List[str]] = None,
+                  background: Optional[bool] = None):
+    """
+    Set the defaults of save_figure for the duration of the block.
+    
+    The previous defaults are restored on exit, even if the block raises.
+    
+    Args:
+        formats: Formats saved when a call does not name any
+        background: Whether formats are written on a background thread
+    """
+    previous = dict(_save_settings)
+    configure_figure_saving(formats=formats, background=background)
+    try:
+        yield
+    finally:
+        _save_settings.clear()
+        _save_settings.update(previous)
+
+
+@contextmanager
+def record_figure_outputs():
+    """
+    Collect the files figures are written to during the block.
+    
+    Yields:
+        List filled with the paths passed to save_figure and
+        record_figure_output, in order and without duplicates
+    """
+    global _recorded_outputs
+    previous = _recorded_outputs
+    _recorded_outputs = outputs = []
+    try:
+        yield outputs
+    finally:
+        _recorded_outputs = previous
+
+
+def record_figure_output(path):
+    """Note a file written outside save_figure (HTML, GIF, ...) for record_figure_outputs."""
+    if _recorded_outputs is not None and str(path) not in _recorded_outputs:
+        _recorded_outputs.append(str(path))
+
+
+def _collection_size(collection) -> int:
+    """Number of elements (mesh cells, markers or paths) in a collection."""
+    array = collection.get_array()
+    if array is not None:
+        return array.size
+    return max(len(collection.get_paths()), len(collection.get_offsets()))
+
+
+def _rasterize_large_collections(fig: plt.Figure) -> List:
+    """
+    Rasterize the large collections of a figure in vector output.
+    
+    Returns:
+        The collections changed, to restore once the figure is saved
+    """
+    rasterized = []
+    for ax in fig.axes:
+        for collection in ax.collections:
+            if (not collection.get_rasterized()
+                    and _collection_size(collection) >= RASTERIZE_MIN_ELEMENTS):
+                collection.set_rasterized(True)
+                rasterized.append(collection)
+    return rasterized
+
+
+def _tight_bbox(fig: plt.Figure, dpi: float):
+    """Padded tight bounding box, as savefig(bbox_inches='tight') finds it."""
+    figure_dpi = fig.dpi
+    fig.set_dpi(dpi)
+    try:
+        fig.draw_without_rendering()
+        bbox = fig.get_tightbbox(fig.canvas.get_renderer())
+    finally:
+        fig.set_dpi(figure_dpi)
+    return bbox.padded(mpl.rcParams['savefig.pad_inches'])
+
+
+def _write_figure(fig: plt.Figure, targets: List[Tuple[Path, str]],
+                  bbox, rasterized: List):
+    """Write a figure in every target format, then undo the rasterization."""
+    try:
+        for filepath, fmt in targets:
+            try:
+                with profile_stage(f'save.{fmt}', figure=filepath.stem):
+                    fig.savefig(filepath, format=fmt, bbox_inches=bbox,
+                               dpi=PNG_DPI if fmt == 'png' else None)
+            except Exception as e:
+                print(f"Error saving {filepath}: {e}")
+                raise
+            print(f"Saved: {filepath}")
+    finally:
+        for collection in rasterized:
+            collection.set_rasterized(False)
+
+
 def save_figure(fig: plt.Figure, 
                 name: str, 
                 output_dir: str = "visualization/figures",
-                formats: List[str] = None):
+                formats: List[str] = None,
+                background: Optional[bool] = None):
     """
     Save figure in multiple formats with consistent settings.
     
+    The tight bounding box is computed once for all formats, and large
+    collections (meshes, dense scatters) are rasterized in vector formats.
+    With background saving the figure is closed (detached from pyplot) and
+    written on a background thread; it must not be modified until
+    wait_for_saves() returns.
+    
     Args:
         fig: Matplotlib figure object
         name: Base filename (without extension)
         output_dir: Output directory path
-        formats: List of formats to save (default: ['png', 'pdf', 'svg'])
+        formats: List of formats to save (default: configured formats,
+            initially ['png', 'pdf', 'svg'])
+        background: Write on the background thread (default: configured)
     """
     if formats is None:
-        formats = ['png', 'pdf', 'svg']
+        formats = _save_settings['formats']
+    if background is None:
+        background = _save_settings['background']
     
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
     
-    for fmt in formats:
-        filepath = output_path / f"{name}.{fmt}"
-        fig.savefig(filepath, format=fmt, bbox_inches='tight', 
-                   dpi=300 if fmt == 'png' else None)
-        print(f"Saved: {filepath}")
+    # A figure saved again must not change under a pending write
+    with _save_lock:
+        earlier_saves = [future for _, saved, future in _pending_saves if saved is fig]
+    for future in earlier_saves:
+        future.exception()
+    
+    targets = [(output_path / f"{name}.{fmt}", fmt) for fmt in formats]
+    for filepath, _ in targets:
+        record_figure_output(filepath)
+    with profile_stage('save.layout', figure=name):
+        bbox = _tight_bbox(fig, PNG_DPI)
+        rasterized = []
+        if any(fmt in VECTOR_FORMATS for fmt in formats):
+            rasterized = _rasterize_large_collections(fig)
+    
+    if not background:
+        _write_figure(fig, targets, bbox, rasterized)
+        return
+    
+    # pyplot must not touch the figure while the background thread draws it
+    plt.close(fig)
+    
+    global _save_executor
+    with _save_lock:
+        if _save_executor is None:
+            _save_executor = ThreadPoolExecutor(max_workers=1,
+                                                thread_name_prefix='figure-saver')
+        future = _save_executor.submit(_write_figure, fig, targets, bbox, rasterized)
+        _pending_saves.append((name, fig, future))
+
+
+def wait_for_saves():
+    """
+    Block until all background saves have finished.
+    
+    Raises:
+        RuntimeError: If any figure failed to save
+    """
+    with _save_lock:
+        pending = list(_pending_saves)
+        _pending_saves.clear()
+    
+    failed = [name for name, _, future in pending if future.exception() is not None]
+    if failed:
+        raise RuntimeError(f"Failed to save figure(s): {', '.join(failed)}")
 
 
 def create_figure_with_subplots(n_rows: int = 1, 
@@ -0,0 +1,167 @@
+"""
+Timing instrumentation for the figure pipeline.
+Stages record wall time, CPU time of the running thread and the process's
+peak RSS. Nothing is recorded unless a Profiler is active.
+"""
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Dict, List, Optional
+
+_active_profiler = None
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+
+
+class Profiler:
+    """Collects one event per completed stage, from any thread."""
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str, **args):
+        """
+        Time a stage.
+
+        Args:
+            name: Stage name; the part before the first '.' is its category
+                (load, analysis, save)
+            **args: JSON-serializable details kept with the event
+        """
+        start = time.time()
+        start_wall = time.perf_counter()
+        start_cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            event = {
+                'stage': name,
+                'start': start,
+                'wall': time.perf_counter() - start_wall,
+                'cpu': time.thread_time() - start_cpu,
+                'peak_rss_mb': peak_rss_mb(),
+                'pid': os.getpid(),
+                'thread': threading.get_native_id()
+            }
+            if args:
+                event['args'] = args
+            with self._lock:
+                self.events.append(event)
+
+
+@contextmanager
+def use_profiler(profiler: Optional[Profiler]):
+    """Make a profiler the active one for the duration of the block."""
+    global _active_profiler
+    previous = _active_profiler
+    _active_profiler = profiler
+    try:
+        yield profiler
+    finally:
+        _active_profiler = previous
+
+
+@contextmanager
+def profile_stage(name: str, **args):
+    """Time a stage with the active profiler; a no-op without one."""
+    if _active_profiler is None:
+        yield
+        return
+
+    with _active_profiler.stage(name, **args):
+        yield
+
+
+def profiled(name: str):
+    """Decorator timing every call of a function as the given stage."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active_profiler is None:
+                return func(*args, **kwargs)
+            with _active_profiler.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def summarize_events(events: List[Dict]) -> List[Dict]:
+    """
+    Aggregate events per stage.
+
+    Times are inclusive: a stage's time contains that of stages nested in
+    it, such as loading inside an analysis.
+
+    Returns:
+        One row per stage with calls, total/mean/max wall time, total CPU
+        time and peak RSS, sorted by total wall time
+    """
+    stages = {}
+    for event in events:
+        row = stages.setdefault(event['stage'], {
+            'stage': event['stage'], 'calls': 0, 'wall_total': 0.0,
+            'wall_max': 0.0, 'cpu_total': 0.0, 'peak_rss_mb': 0.0
+        })
+        row['calls'] += 1
+        row['wall_total'] += event['wall']
+        row['wall_max'] = max(row['wall_max'], event['wall'])
+        row['cpu_total'] += event['cpu']
+        row['peak_rss_mb'] = max(row['peak_rss_mb'], event['peak_rss_mb'])
+
+    rows = sorted(stages.values(), key=lambda row: row['wall_total'], reverse=True)
+    for row in rows:
+        row['wall_mean'] = row['wall_total'] / row['calls']
+    return rows
+
+
+def format_summary(rows: List[Dict]) -> str:
+    """Plain-text table of summarize_events rows."""
+    width = max([len('Stage')] + [len(row['stage']) for row in rows])
+    lines = [f"{'Stage':<{width}}  {'Calls':>6}  {'Wall (s)':>9}  {'Mean (s)':>9}  "
+             f"{'Max (s)':>8}  {'CPU (s)':>8}  {'Peak RSS (MB)':>13}"]
+    for row in rows:
+        lines.append(f"{row['stage']:<{width}}  {row['calls']:>6}  "
+                     f"{row['wall_total']:>9.2f}  {row['wall_mean']:>9.3f}  "
+                     f"{row['wall_max']:>8.2f}  {row['cpu_total']:>8.2f}  "
+                     f"{row['peak_rss_mb']:>13.0f}")
+    return '\n'.join(lines)
+
+
+def write_trace(events: List[Dict], path: str):
+    """
+    Write events as a Chrome trace (chrome://tracing, Perfetto).
+
+    The per-stage summary is stored next to the events under 'stages'.
+    """
+    trace_events = []
+    for event in events:
+        trace_events.append({
+            'name': event['stage'],
+            'cat': event['stage'].split('.')[0],
+            'ph': 'X',
+            'ts': event['start'] * 1e6,
+            'dur': event['wall'] * 1e6,
+            'pid': event['pid'],
+            'tid': event['thread'],
+            'args': dict(event.get('args', {}),
+                         cpu=event['cpu'], peak_rss_mb=event['peak_rss_mb'])
+        })
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': trace_events,
+                   'stages': summarize_events(events)}, f, indent=1)
@@ -11,12 +11,142 @@ import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 import argparse
 import json
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import Future
+
+sys.path.append(str(Path(__file__).parent))
+from scripts.transitions import TransitionEffects
+from scripts.video_assembler import (FrameStreamEncoder, VideoAssembler, VideoConfig,
+                                     split_concat_entries)
+
+
+class FrameGraph:
+    """
+    Frames of a compiled video, described as nodes and rendered on demand.
+    
+    Nodes are tuples:
+        ('title',)                       title card
+        ('source', path, (w, h))         source image at a given size
+        ('split', path_2d, path_3d)      2D and 3D sources side by side
+        ('fade', node, step, n_steps)    node faded towards black
+    
+    Every source image is decoded once, directly into all the sizes the
+    video uses it at. Results are reference counted from the playback
+    plan and released after their last use, so memory holds only frames
+    that are still needed.
+    
+    The lock only guards the cache and reference counts; nodes are
+    computed outside it, so encoder threads render frames in parallel.
+    A thread requesting a node another thread is computing waits for it.
+    """
+    
+    def __init__(self, compiler, entries):
+        """
+        Args:
+            compiler: VideoCompiler providing resolution and title card
+            entries: (node, frame count) in playback order; every entry is
+                rendered exactly once
+        """
+        self.compiler = compiler
+        self.transitions = TransitionEffects()
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._uses = Counter()
+        self._sizes = defaultdict(set)
+        
+        # Each distinct node is computed once, requesting its inputs once
+        seen = set()
+        for node, _ in entries:
+            self._uses[node] += 1
+            self._count_inputs(node, seen)
+    
+    def _inputs(self, node):
+        """Nodes a node is computed from."""
+        kind = node[0]
+        if kind == 'source':
+            return [('image', node[1])]
+        if kind == 'split':
+            half = self.compiler.half_size
+            return [('source', node[1], half), ('source', node[2], half)]
+        if kind == 'fade':
+            return [node[1]]
+        return []
+    
+    def _count_inputs(self, node, seen):
+        if node in seen:
+            return
+        seen.add(node)
+        
+        if node[0] == 'source':
+            self._sizes[node[1]].add(node[2])
+        for dependency in self._inputs(node):
+            self._uses[dependency] += 1
+            self._count_inputs(dependency, seen)
+    
+    def frame(self, node):
+        """Render a node (thread-safe); the result must not be modified."""
+        return self._get(node)
+    
+    def _get(self, node):
+        # The first request computes the node; later ones wait for its result
+        with self._lock:
+            pending = self._cache.get(node)
+            owner = pending is None
+            if owner:
+                pending = self._cache[node] = Future()
+        
+        if owner:
+            try:
+                result = self._compute(node, [self._get(dependency)
+                                              for dependency in self._inputs(node)])
+            except BaseException as e:
+                pending.set_exception(e)
+                with self._lock:
+                    self._cache.pop(node, None)
+                raise
+            pending.set_result(result)
+        else:
+            result = pending.result()
+        
+        # Keep results that are requested again, drop them after the last use
+        with self._lock:
+            self._uses[node] -= 1
+            if self._uses[node] <= 0 and self._cache.get(node) is pending:
+                del self._cache[node]
+        
+        return result
+    
+    def _compute(self, node, inputs):
+        kind = node[0]
+        if kind == 'title':
+            return np.asarray(self.compiler.render_title_frame())
+        if kind == 'image':
+            # Decode once into every size the video uses the image at
+            with Image.open(node[1]) as image:
+                image = image.convert('RGB')
+                return {size: np.asarray(image if image.size == size else image.resize(size))
+                        for size in self._sizes[node[1]]}
+        if kind == 'source':
+            return inputs[0][node[2]]
+        if kind == 'split':
+            return self.compiler.compose_split_screen(*inputs)
+        if kind == 'fade':
+            _, _, step, n_steps = node
+            progress = step / (n_steps - 1) if n_steps > 1 else 1.0
+            return self.transitions.fade_to_black(inputs[0], progress)
+        raise ValueError(f"Unknown frame node: {kind}")
+
 
 class VideoCompiler:
-    def __init__(self, frame_rate=60, duration=15):
+    def __init__(self, frame_rate=60, duration=15, resolution=(1920, 1080)):
         self.frame_rate = frame_rate
         self.duration = duration
         self.total_frames = frame_rate * duration
+        self.resolution = resolution
+        self.half_size = (resolution[0] // 2, resolution[1])
         
     def check_dependencies(self):
         """Check if required tools are installed"""
@@ -26,6 +156,13 @@ class VideoCompiler:
         
     def create_title_frame(self, output_path, width=1920, height=1080):
         """Create opening title frame"""
+        self.render_title_frame(width, height).save(output_path)
+        
+    def render_title_frame(self, width=None, height=None):
+        """Render the opening title frame as an image"""
+        width = width or self.resolution[0]
+        height = height or self.resolution[1]
+        
         # Create black background
         img = Image.new('RGB', (width, height), color='black')
         draw = ImageDraw.Draw(img)
@@ -54,7 +191,7 @@ class VideoCompiler:
         draw.text((title_x, height//2 - 100), title, fill='white', font=title_font)
         draw.text((subtitle_x, height//2), subtitle, fill='gray', font=subtitle_font)
         
-        img.save(output_path)
+        return img
         
     def create_transition_frames(self, frame1_path, frame2_path, output_dir, num_frames=30):
         """Create smooth transition between two frames"""
@@ -68,130 +205,175 @@ class VideoCompiler:
             
     def create_split_screen(self, frame_2d_path, frame_3d_path, output_path):
         """Create split screen showing both 2D and 3D views"""
-        frame_2d = Image.open(frame_2d_path)
-        frame_3d = Image.open(frame_3d_path)
+        halves = [np.asarray(Image.open(path).convert('RGB').resize(self.half_size))
+                  for path in (frame_2d_path, frame_3d_path)]
+        Image.fromarray(self.compose_split_screen(*halves)).save(output_path)
         
-        # Resize to half width each
-        width, height = 1920, 1080
-        frame_2d = frame_2d.resize((width // 2, height))
-        frame_3d = frame_3d.resize((width // 2, height))
+    def compose_split_screen(self, frame_2d, frame_3d):
+        """Place half-width 2D and 3D frames side by side with a divider"""
+        width, height = self.resolution
+        split_x = width // 2
         
-        # Create combined image
-        combined = Image.new('RGB', (width, height))
-        combined.paste(frame_2d, (0, 0))
-        combined.paste(frame_3d, (width // 2, 0))
+        combined = np.empty((height, width, 3), dtype=np.uint8)
+        combined[:, :split_x] = frame_2d
+        combined[:, split_x:] = frame_3d
         
         # Add divider line
-        draw = ImageDraw.Draw(combined)
-        draw.line([(width // 2, 0), (width // 2, height)], fill='white', width=2)
+        combined[:, split_x - 1:split_x + 1] = 255
+        
+        return combined
+        
+    def compile_video(self, frames_dir, output_path, video_structure,
+                      encode_workers=1, chunk_frames=None, compare_encoding=False,
+                      verify=False):
+        """
+        Compile frames into final video according to structure
         
-        combined.save(output_path)
+        The structure is turned into a playback plan of frame nodes (see
+        FrameGraph) whose frames are rendered in memory and piped to the
+        encoder; nothing is written besides the video.
+        With encode_workers > 1 the timeline is cut at segment boundaries
+        (and every chunk_frames frames, GOP-aligned) and the chunks are
+        encoded concurrently, then joined without re-encoding.
+        compare_encoding also times a single-process encode for reference.
+        The encoded properties are known, so probing the result is opt-in
+        (verify).
+        """
+        entries, segment_starts = self.build_plan(frames_dir, video_structure)
+        frame_counter = sum(count for _, count in entries)
         
-    def compile_video(self, frames_dir, output_path, video_structure):
-        """Compile frames into final video according to structure"""
+        print(f"Compiling {frame_counter} frames ({len(entries)} distinct) into video...")
+        
+        if encode_workers > 1:
+            self._encode_chunked(entries, segment_starts, output_path, encode_workers,
+                                 chunk_frames, compare_encoding)
+        else:
+            self._encode_single(entries, output_path)
+        
+        print(f"✓ Video saved to {output_path}")
+        
+        # Verify video properties
+        if verify:
+            self._verify_video(output_path)
+        
+    def build_plan(self, frames_dir, video_structure):
+        """
+        Describe the video as frame nodes held for a number of frames
+        
+        Returns:
+            ((node, frame count) in playback order, entry index where each
+            segment starts)
+        """
         frames_path = Path(frames_dir)
-        temp_dir = frames_path / "temp_video"
-        temp_dir.mkdir(exist_ok=True)
+        full_size = tuple(self.resolution)
         
-        frame_counter = 0
+        # (frame node, frame count) in playback order; repeated frames are
+        # held instead of rendered again
+        entries = []
+        segment_starts = []
         
         # Process each segment of the video
         for segment in video_structure:
+            segment_starts.append(len(entries))
             segment_type = segment['type']
             duration_seconds = segment['duration']
             segment_frames = int(duration_seconds * self.frame_rate)
             
             if segment_type == 'title':
-                # Create title frame
-                title_path = temp_dir / "title.png"
-                self.create_title_frame(title_path)
-                
-                # Duplicate for duration
-                for i in range(segment_frames):
-                    shutil.copy(title_path, temp_dir / f"frame_{frame_counter:06d}.png")
-                    frame_counter += 1
+                # Title frame, held for the whole segment
+                entries.append((('title',), segment_frames))
                     
             elif segment_type == '2d_view':
                 # Use 2D frames
                 source_frames = sorted(frames_path.glob("2d_frames/frame_*.png"))
-                self._copy_frames_with_interpolation(source_frames, temp_dir, 
-                                                   frame_counter, segment_frames)
-                frame_counter += segment_frames
+                entries.extend(((('source', str(path), full_size), count)
+                                for path, count in self._map_frames_with_holds(
+                                    source_frames, segment_frames)))
                 
             elif segment_type == '3d_view':
                 # Use 3D frames
                 source_frames = sorted(frames_path.glob("3d_frames/3d_frame_*.png"))
-                self._copy_frames_with_interpolation(source_frames, temp_dir,
-                                                   frame_counter, segment_frames)
-                frame_counter += segment_frames
+                entries.extend(((('source', str(path), full_size), count)
+                                for path, count in self._map_frames_with_holds(
+                                    source_frames, segment_frames)))
                 
             elif segment_type == 'split_screen':
-                # Create split screen frames
+                # One split screen frame per distinct source pair
                 source_2d = sorted(frames_path.glob("2d_frames/frame_*.png"))
                 source_3d = sorted(frames_path.glob("3d_frames/3d_frame_*.png"))
                 
-                for i in range(segment_frames):
-                    src_idx = min(int(i * len(source_2d) / segment_frames), len(source_2d) - 1)
-                    
-                    if src_idx < len(source_2d) and src_idx < len(source_3d):
-                        split_path = temp_dir / f"frame_{frame_counter:06d}.png"
-                        self.create_split_screen(source_2d[src_idx], source_3d[src_idx], split_path)
-                    frame_counter += 1
+                n_pairs = min(len(source_2d), len(source_3d))
+                if n_pairs:
+                    for src_idx, count in self._source_holds(len(source_2d), segment_frames):
+                        if src_idx < n_pairs:
+                            entries.append((('split', str(source_2d[src_idx]),
+                                             str(source_3d[src_idx])), count))
                     
             elif segment_type == 'fade_out':
                 # Fade to black
-                last_frame_path = temp_dir / f"frame_{frame_counter-1:06d}.png"
-                if last_frame_path.exists():
-                    last_frame = Image.open(last_frame_path)
-                    black_frame = Image.new('RGB', last_frame.size, color='black')
-                    
-                    for i in range(segment_frames):
-                        alpha = i / (segment_frames - 1)
-                        blended = Image.blend(last_frame, black_frame, alpha)
-                        blended.save(temp_dir / f"frame_{frame_counter:06d}.png")
-                        frame_counter += 1
-        
-        # Use ffmpeg to create video
-        print(f"Compiling {frame_counter} frames into video...")
-        
-        ffmpeg_cmd = [
-            'ffmpeg',
-            '-y',  # Overwrite output
-            '-framerate', str(self.frame_rate),
-            '-i', str(temp_dir / 'frame_%06d.png'),
-            '-c:v', 'libx264',
-            '-preset', 'slow',  # Better compression
-            '-crf', '18',  # High quality
-            '-pix_fmt', 'yuv420p',  # Compatibility
-            '-movflags', '+faststart',  # Web optimization
-            str(output_path)
-        ]
+                if entries:
+                    last_node = entries[-1][0]
+                    entries.extend((('fade', last_node, i, segment_frames), 1)
+                                   for i in range(segment_frames))
         
-        subprocess.run(ffmpeg_cmd, check=True)
+        return entries, segment_starts
         
-        # Clean up temporary files
-        shutil.rmtree(temp_dir)
+    def _encode_single(self, entries, output_path):
+        """Render the plan and pipe it into one ffmpeg process"""
+        graph = FrameGraph(self, entries)
+        config = VideoConfig(fps=self.frame_rate, preset='slow', crf=18)
         
-        print(f"✓ Video saved to {output_path}")
+        with FrameStreamEncoder(output_path, config) as encoder:
+            for node, count in entries:
+                encoder.write_frame(graph.frame(node), count)
+            if not encoder.close():
+                raise RuntimeError("Encoding failed")
         
-        # Verify video properties
-        self._verify_video(output_path)
+    def _encode_chunked(self, entries, segment_starts, output_path, workers,
+                        chunk_frames, compare_encoding):
+        """Encode segment/GOP chunks concurrently and join them by stream copy"""
+        config = VideoConfig(fps=self.frame_rate, preset='slow', crf=18)
+        chunks = split_concat_entries(entries, segment_starts, chunk_frames,
+                                      gop_size=self.frame_rate)
+        graph = FrameGraph(self, [entry for chunk in chunks for entry in chunk])
         
-    def _copy_frames_with_interpolation(self, source_frames, dest_dir, 
-                                       start_frame, target_frames):
-        """Copy frames with temporal interpolation if needed"""
-        if not source_frames:
-            return
+        assembler = VideoAssembler(output_dir=str(Path(output_path).parent))
+        report = assembler.encode_frame_chunks_parallel(chunks, graph.frame,
+                                                        str(output_path), config, workers)
+        if report is None:
+            raise RuntimeError("Chunked encoding failed")
+        
+        if compare_encoding:
+            output_path = Path(output_path)
+            reference_path = output_path.with_name(f"{output_path.stem}_single_process.mp4")
+            start = time.perf_counter()
+            self._encode_single(entries, reference_path)
+            single_time = time.perf_counter() - start
+            reference_path.unlink(missing_ok=True)
             
-        # Calculate frame mapping
+            print(f"Encoding wall time: {report['wall_time']:.1f}s with {workers} encoders "
+                  f"vs {single_time:.1f}s single-process "
+                  f"({single_time / report['wall_time']:.2f}x)")
+        
+    def _source_holds(self, n_sources, target_frames):
+        """Map target frames onto source indices as (source index, hold count) runs"""
+        runs = []
         for i in range(target_frames):
             # Map target frame to source frame
-            source_idx = min(int(i * len(source_frames) / target_frames), 
-                           len(source_frames) - 1)
+            source_idx = min(int(i * n_sources / target_frames), n_sources - 1)
+            if runs and runs[-1][0] == source_idx:
+                runs[-1][1] += 1
+            else:
+                runs.append([source_idx, 1])
+        return [tuple(run) for run in runs]
             
-            # Copy frame
-            shutil.copy(source_frames[source_idx], 
-                       dest_dir / f"frame_{start_frame + i:06d}.png")
+    def _map_frames_with_holds(self, source_frames, target_frames):
+        """Hold each source frame for as many target frames as it covers"""
+        if not source_frames:
+            return []
+            
+        return [(source_frames[source_idx], count)
+                for source_idx, count in self._source_holds(len(source_frames), target_frames)]
             
     def _verify_video(self, video_path):
         """Verify video properties"""
@@ -204,7 +386,12 @@ class VideoCompiler:
             str(video_path)
         ]
         
-        result = subprocess.run(probe_cmd, capture_output=True, text=True)
+        try:
+            result = subprocess.run(probe_cmd, capture_output=True, text=True)
+        except FileNotFoundError:
+            print("⚠ ffprobe not found, skipping verification")
+            return
+        
         if result.returncode == 0:
             info = json.loads(result.stdout)
             stream = info['streams'][0]
@@ -240,6 +427,14 @@ def main():
     parser.add_argument('output_video', help='Output video file (MP4)')
     parser.add_argument('--fps', type=int, default=60, help='Frame rate (default: 60)')
     parser.add_argument('--duration', type=int, default=15, help='Duration in seconds (default: 15)')
+    parser.add_argument('--encode-workers', type=int, default=1,
+                        help='Concurrent encoders; above 1 the video is encoded in chunks (default: 1)')
+    parser.add_argument('--chunk-frames', type=int,
+                        help='Maximum frames per chunk, rounded up to whole seconds (default: one chunk per segment)')
+    parser.add_argument('--compare-encoding', action='store_true',
+                        help='Also time a single-process encode and report both wall times')
+    parser.add_argument('--verify', action='store_true',
+                        help='Probe the finished video with ffprobe')
     
     args = parser.parse_args()
     
@@ -247,7 +442,11 @@ def main():
     compiler.check_dependencies()
     
     video_structure = create_demo_video_structure()
-    compiler.compile_video(args.frames_dir, args.output_video, video_structure)
+    compiler.compile_video(args.frames_dir, args.output_video, video_structure,
+                           encode_workers=args.encode_workers,
+                           chunk_frames=args.chunk_frames,
+                           compare_encoding=args.compare_encoding,
+                           verify=args.verify)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -8,7 +8,7 @@ from pathlib import Path
 import json
 import numpy as np
 import pandas as pd
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 import warnings
 
 # Add paths for imports
@@ -18,6 +18,8 @@ sys.path.append(str(Path(__file__).parent.parent / 'python'))
 from scripts.data_exporter import SimulationDataExporter
 from scripts.interpolator import FrameInterpolator
 from scripts.segment_composer import VideoSegmentComposer, SegmentConfig
+from scripts.parallel_renderer import ParallelSegmentRenderer
+from scripts.render_journal import CheckpointedRenderer
 from scripts.video_assembler import VideoAssembler, VideoConfig, VideoQualityChecker
 
 # Import data loading utilities
@@ -40,7 +42,11 @@ class DemoVideoGenerator:
     def generate_demo_video(self,
                            simulation_output_dir: str,
                            output_name: str = "forest_fire_demo_15s_1080p60",
-                           use_sample_data: bool = False) -> str:
+                           use_sample_data: bool = False,
+                           workers: int = 1,
+                           work_dir: Optional[str] = None,
+                           resume: bool = False,
+                           seed: int = 0) -> str:
         """
         Generate the complete 15-second demo video.
         
@@ -48,6 +54,12 @@ class DemoVideoGenerator:
             simulation_output_dir: Directory with simulation outputs
             output_name: Output video filename
             use_sample_data: Whether to use sample data for testing
+            workers: Number of render processes (1 renders serially)
+            work_dir: Directory for checkpointed chunk renders; enables
+                chunked rendering that can be resumed after a crash
+            resume: Reuse chunks completed by an earlier run in work_dir
+            seed: Seed of the generated sample and scenario data, so reruns
+                render (and resume) identical inputs
             
         Returns:
             Path to generated video
@@ -57,20 +69,12 @@ class DemoVideoGenerator:
         print(f"Duration: 15 seconds @ 60fps (900 frames)")
         print()
         
-        # Load simulation data
-        if use_sample_data:
-            print("Generating sample simulation data...")
-            snapshots = self._generate_sample_snapshots()
-        else:
-            print(f"Loading simulation data from {simulation_output_dir}...")
-            snapshots = self._load_simulation_snapshots(simulation_output_dir)
-        
+        snapshots, scenario_snapshots = self._load_inputs(
+            simulation_output_dir, use_sample_data, seed
+        )
         if not snapshots:
-            print("Error: No simulation data found!")
             return None
         
-        print(f"Loaded {len(snapshots)} snapshots")
-        
         # Configure video settings
         video_config = VideoConfig(
             resolution=(1920, 1080),
@@ -80,55 +84,19 @@ class DemoVideoGenerator:
             preset='slow'
         )
         
-        # Generate video segments
-        all_frames = []
-        
-        # Segment 1: Opening (0-5s) - Ignition and initial spread
-        print("\nGenerating Segment 1: Opening (0-5s)...")
-        opening_frames = self.segment_composer.compose_opening_segment(
-            snapshots, duration=5.0, fps=video_config.fps
-        )
-        all_frames.extend(opening_frames)
-        print(f"  Generated {len(opening_frames)} frames")
-        
-        # Segment 2: Middle (5-10s) - Critical transition with 3D
-        print("\nGenerating Segment 2: Middle (5-10s)...")
-        middle_frames = self.segment_composer.compose_middle_segment(
-            snapshots, duration=5.0, start_time=5.0, fps=video_config.fps
-        )
-        all_frames.extend(middle_frames)
-        print(f"  Generated {len(middle_frames)} frames")
-        
-        # Segment 3: Finale (10-15s) - Climate comparison
-        print("\nGenerating Segment 3: Finale (10-15s)...")
-        
-        # For comparison, we need two scenarios
-        if use_sample_data:
-            scenario_snapshots = self._generate_sample_snapshots(scenario='rcp85')
+        if work_dir:
+            video_path = self._render_checkpointed(
+                snapshots, scenario_snapshots, output_name, video_config,
+                work_dir, resume
+            )
+        elif workers > 1:
+            video_path = self._render_parallel(
+                snapshots, scenario_snapshots, output_name, video_config, workers
+            )
         else:
-            # Try to load RCP8.5 scenario
-            scenario_snapshots = self._load_simulation_snapshots(
-                simulation_output_dir, scenario='rcp85'
+            video_path = self._render_serial(
+                snapshots, scenario_snapshots, output_name, video_config
             )
-            
-        if not scenario_snapshots:
-            print("  Warning: No scenario data found, using modified baseline")
-            scenario_snapshots = self._modify_snapshots_for_scenario(snapshots)
-        
-        finale_frames = self.segment_composer.compose_finale_segment(
-            snapshots, scenario_snapshots,
-            duration=5.0, start_time=10.0, fps=video_config.fps
-        )
-        all_frames.extend(finale_frames)
-        print(f"  Generated {len(finale_frames)} frames")
-        
-        print(f"\nTotal frames: {len(all_frames)}")
-        
-        # Create video
-        print("\nAssembling video...")
-        video_path = self.video_assembler.create_video_from_frames(
-            all_frames, output_name, video_config
-        )
         
         if video_path:
             print(f"\nVideo created: {video_path}")
@@ -152,7 +120,7 @@ class DemoVideoGenerator:
             # Create additional formats
             print("\nCreating additional formats...")
             variants = self.video_assembler.create_video_variants(
-                video_path, create_webm=True, create_gif=True
+                video_path, create_webm=True, create_gif=True, create_thumbnails=True
             )
             
             for fmt, path in variants.items():
@@ -164,6 +132,140 @@ class DemoVideoGenerator:
             print("\nError: Video creation failed!")
             return None
     
+    def _load_inputs(self,
+                     simulation_output_dir: str,
+                     use_sample_data: bool,
+                     seed: int) -> Tuple[Dict[str, pd.DataFrame], Dict[str, pd.DataFrame]]:
+        """
+        Load or generate the baseline and climate scenario snapshots.
+        
+        Returns:
+            Tuple of (baseline snapshots, scenario snapshots); the baseline
+            is empty if no simulation data was found
+        """
+        # Load simulation data
+        if use_sample_data:
+            print("Generating sample simulation data...")
+            snapshots = self._generate_sample_snapshots(seed=seed)
+        else:
+            print(f"Loading simulation data from {simulation_output_dir}...")
+            snapshots = self._load_simulation_snapshots(simulation_output_dir)
+        
+        if not snapshots:
+            print("Error: No simulation data found!")
+            return {}, {}
+        
+        print(f"Loaded {len(snapshots)} snapshots")
+        
+        # For comparison, we need two scenarios
+        if use_sample_data:
+            scenario_snapshots = self._generate_sample_snapshots(scenario='rcp85', seed=seed)
+        else:
+            # Try to load RCP8.5 scenario
+            scenario_snapshots = self._load_simulation_snapshots(
+                simulation_output_dir, scenario='rcp85'
+            )
+            
+        if not scenario_snapshots:
+            print("Warning: No scenario data found, using modified baseline")
+            scenario_snapshots = self._modify_snapshots_for_scenario(snapshots, seed=seed)
+        
+        return snapshots, scenario_snapshots
+    
+    def _render_serial(self,
+                       snapshots: Dict[str, pd.DataFrame],
+                       scenario_snapshots: Dict[str, pd.DataFrame],
+                       output_name: str,
+                       video_config: VideoConfig) -> str:
+        """Render all segments in this process, streaming them into the encoder."""
+        fps = video_config.fps
+        segments = [
+            # Segment 1: Opening (0-5s) - Ignition and initial spread
+            ("Segment 1: Opening (0-5s)", 'opening', (snapshots,),
+             {'duration': 5.0, 'fps': fps}),
+            # Segment 2: Middle (5-10s) - Critical transition with 3D
+            ("Segment 2: Middle (5-10s)", 'middle', (snapshots,),
+             {'duration': 5.0, 'start_time': 5.0, 'fps': fps}),
+            # Segment 3: Finale (10-15s) - Climate comparison
+            ("Segment 3: Finale (10-15s)", 'finale', (snapshots, scenario_snapshots),
+             {'duration': 5.0, 'start_time': 10.0, 'fps': fps}),
+        ]
+        
+        # Each distinct frame is rendered once and held for its run length
+        def iter_runs():
+            total_frames = 0
+            for title, kind, data, params in segments:
+                print(f"\nGenerating {title}...")
+                segment = self.segment_composer.prepare_segment(kind, *data, **params)
+                distinct = 0
+                for run in self.segment_composer.iter_segment_runs(segment):
+                    distinct += 1
+                    yield run
+                total_frames += segment['total_frames']
+                print(f"  Generated {segment['total_frames']} frames ({distinct} distinct)")
+            
+            print(f"\nTotal frames: {total_frames}")
+        
+        # Create video
+        print("\nAssembling video...")
+        return self.video_assembler.create_video_from_runs(
+            iter_runs(), output_name, video_config
+        )
+    
+    def _render_parallel(self,
+                         snapshots: Dict[str, pd.DataFrame],
+                         scenario_snapshots: Dict[str, pd.DataFrame],
+                         output_name: str,
+                         video_config: VideoConfig,
+                         workers: int) -> str:
+        """Render all segments on a worker pool, streaming into the encoder."""
+        renderer = ParallelSegmentRenderer(
+            workers=workers,
+            composer_kwargs={'output_dir': str(self.segment_composer.output_dir)}
+        )
+        
+        fps = video_config.fps
+        renderer.add_segment('opening', snapshots, duration=5.0, fps=fps)
+        renderer.add_segment('middle', snapshots, duration=5.0, start_time=5.0, fps=fps)
+        renderer.add_segment('finale', snapshots, scenario_snapshots,
+                             duration=5.0, start_time=10.0, fps=fps)
+        
+        return renderer.render_to_video(output_name, video_config,
+                                        self.video_assembler)
+    
+    def _render_checkpointed(self,
+                             snapshots: Dict[str, pd.DataFrame],
+                             scenario_snapshots: Dict[str, pd.DataFrame],
+                             output_name: str,
+                             video_config: VideoConfig,
+                             work_dir: str,
+                             resume: bool) -> str:
+        """Render segments as journaled chunks, skipping completed ones."""
+        renderer = self._checkpointed_renderer(
+            snapshots, scenario_snapshots, video_config, work_dir
+        )
+        
+        print(f"\nRendering chunks in {work_dir}" + (" (resuming)" if resume else ""))
+        return renderer.render(output_name, self.video_assembler, resume=resume)
+    
+    def _checkpointed_renderer(self,
+                               snapshots: Dict[str, pd.DataFrame],
+                               scenario_snapshots: Dict[str, pd.DataFrame],
+                               video_config: VideoConfig,
+                               work_dir: str) -> CheckpointedRenderer:
+        """Checkpointed renderer with the three demo segments queued."""
+        renderer = CheckpointedRenderer(
+            work_dir, video_config, composer=self.segment_composer
+        )
+        
+        fps = video_config.fps
+        renderer.add_segment('opening', snapshots, duration=5.0, fps=fps)
+        renderer.add_segment('middle', snapshots, duration=5.0, start_time=5.0, fps=fps)
+        renderer.add_segment('finale', snapshots, scenario_snapshots,
+                             duration=5.0, start_time=10.0, fps=fps)
+        
+        return renderer
+    
     def _load_simulation_snapshots(self, 
                                   output_dir: str,
                                   scenario: str = 'baseline') -> Dict[str, pd.DataFrame]:
@@ -186,8 +288,10 @@ class DemoVideoGenerator:
     def _generate_sample_snapshots(self, 
                                   n_snapshots: int = 20,
                                   grid_size: int = 50,
-                                  scenario: str = 'baseline') -> Dict[str, pd.DataFrame]:
-        """Generate sample snapshots for testing."""
+                                  scenario: str = 'baseline',
+                                  seed: int = 0) -> Dict[str, pd.DataFrame]:
+        """Generate sample snapshots for testing (identical for equal seeds)."""
+        rng = np.random.default_rng(seed)
         snapshots = {}
         
         # Adjust parameters based on scenario
@@ -216,20 +320,20 @@ class DemoVideoGenerator:
                     elif dist < fire_radius:
                         state = 'Burning'
                     elif dist < fire_radius + 5:
-                        state = 'Tree' if np.random.random() > 0.1 else 'Empty'
+                        state = 'Tree' if rng.random() > 0.1 else 'Empty'
                     else:
-                        state = 'Tree' if np.random.random() > 0.2 else 'Empty'
+                        state = 'Tree' if rng.random() > 0.2 else 'Empty'
                     
                     # Create realistic elevation
-                    elevation = 500 + 50 * np.sin(x/10) + 30 * np.cos(y/8) + np.random.normal(0, 5)
+                    elevation = 500 + 50 * np.sin(x/10) + 30 * np.cos(y/8) + rng.normal(0, 5)
                     
                     grid_data.append({
                         'x': x,
                         'y': y,
                         'state': state,
                         'elevation': elevation,
-                        'moisture': 0.3 + 0.2 * np.random.random(),
-                        'temperature': 25 + 5 * np.random.random()
+                        'moisture': 0.3 + 0.2 * rng.random(),
+                        'temperature': 25 + 5 * rng.random()
                     })
             
             df = pd.DataFrame(grid_data)
@@ -240,8 +344,10 @@ class DemoVideoGenerator:
     
     def _modify_snapshots_for_scenario(self, 
                                       baseline_snapshots: Dict[str, pd.DataFrame],
-                                      scenario: str = 'rcp85') -> Dict[str, pd.DataFrame]:
-        """Modify baseline snapshots to simulate different scenario."""
+                                      scenario: str = 'rcp85',
+                                      seed: int = 0) -> Dict[str, pd.DataFrame]:
+        """Modify baseline snapshots to simulate a scenario (identical for equal seeds)."""
+        rng = np.random.default_rng(seed)
         modified = {}
         
         for time_key, snapshot in baseline_snapshots.items():
@@ -256,7 +362,7 @@ class DemoVideoGenerator:
                 # Randomly ignite more trees
                 if n_trees > 0:
                     ignite_prob = 0.1 if scenario == 'rcp85' else 0.05
-                    ignite_mask = tree_mask & (np.random.random(len(modified_snap)) < ignite_prob)
+                    ignite_mask = tree_mask & (rng.random(len(modified_snap)) < ignite_prob)
                     modified_snap.loc[ignite_mask, 'state'] = 'Burning'
             
             # Adjust environmental parameters
@@ -291,6 +397,28 @@ def main():
         action='store_true',
         help='Use sample data for testing'
     )
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=1,
+        help='Number of parallel render processes (default: 1)'
+    )
+    parser.add_argument(
+        '--work-dir',
+        default=None,
+        help='Render checkpointed chunks in this directory'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Resume an interrupted render from --work-dir'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='Seed of generated sample and scenario data (default: 0)'
+    )
     parser.add_argument(
         '--quick',
         action='store_true',
@@ -299,6 +427,9 @@ def main():
     
     args = parser.parse_args()
     
+    if args.resume and not args.work_dir:
+        parser.error("--resume requires --work-dir")
+    
     # Create generator
     generator = DemoVideoGenerator()
     
@@ -313,7 +444,11 @@ def main():
     video_path = generator.generate_demo_video(
         args.input,
         args.output,
-        use_sample_data=args.sample
+        use_sample_data=args.sample,
+        workers=args.workers,
+        work_dir=args.work_dir,
+        resume=args.resume,
+        seed=args.seed
     )
     
     if video_path:
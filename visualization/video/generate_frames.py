@@ -13,6 +13,11 @@ from pathlib import Path
 import multiprocessing as mp
 from functools import partial
 import argparse
+import sys
+
+sys.path.append(str(Path(__file__).parent))
+from scripts.shared_frames import copy_figure_into, stream_frames
+from scripts.video_assembler import FrameStreamEncoder, VideoConfig
 
 # Color scheme for cell states
 CELL_COLORS = {
@@ -55,11 +60,20 @@ def load_frame_metrics(metrics_path):
 
 def create_2d_frame(frame_data, metrics, frame_number, output_path, config):
     """Generate a single 2D visualization frame"""
+    draw_2d_frame(frame_data, metrics, frame_number, config)
+    
+    # Save frame
+    plt.savefig(output_path, dpi=100, bbox_inches='tight', pad_inches=0.1, facecolor='black')
+    plt.close()
+
+def draw_2d_frame(frame_data, metrics, frame_number, config):
+    """Draw a 2D visualization frame onto a new 1920x1080 figure"""
     
     # Set up figure with specific DPI for 1080p
     fig_width = 19.2  # 1920 pixels at 100 DPI
     fig_height = 10.8  # 1080 pixels at 100 DPI
     fig, ax = plt.subplots(1, 1, figsize=(fig_width, fig_height), dpi=100)
+    fig.patch.set_facecolor('black')
     
     # Get grid dimensions
     width = frame_data['x'].max() + 1
@@ -112,9 +126,7 @@ def create_2d_frame(frame_data, metrics, frame_number, output_path, config):
     # Add scale bar
     add_scale_bar(ax, width, height)
     
-    # Save frame
-    plt.savefig(output_path, dpi=100, bbox_inches='tight', pad_inches=0.1, facecolor='black')
-    plt.close()
+    return fig
 
 def interpolate_color(color1, color2, t):
     """Linear interpolation between two colors"""
@@ -177,6 +189,36 @@ def generate_frame_wrapper(args):
     create_2d_frame(frame_data, metrics, frame_num, output_path, config)
     print(f"Generated frame {frame_num}")
 
+def render_2d_frame_into(task, out):
+    """Render one frame into a shared frame slot (for stream_frames)"""
+    frame_num, input_dir, config = task
+    
+    frame_data = load_frame_data(input_dir / f"frames/frame_{frame_num:06d}.csv")
+    metrics = load_frame_metrics(input_dir / f"frames/metrics_{frame_num:06d}.csv")
+    
+    fig = draw_2d_frame(frame_data, metrics, frame_num, config)
+    copy_figure_into(fig, out)
+    plt.close(fig)
+
+def stream_all_frames(input_dir, output_video, config, num_processes=None, fps=60):
+    """Render all frames in parallel straight into a video, without PNG files"""
+    input_path = Path(input_dir)
+    Path(output_video).parent.mkdir(parents=True, exist_ok=True)
+    
+    frame_files = sorted(input_path.glob("frames/frame_*.csv"))
+    frame_numbers = [int(f.stem.split('_')[1]) for f in frame_files]
+    
+    print(f"Streaming {len(frame_numbers)} frames to {output_video}")
+    
+    tasks = [(num, input_path, config) for num in frame_numbers]
+    encoder = FrameStreamEncoder(output_video, VideoConfig(fps=fps))
+    stream_frames(tasks, render_2d_frame_into, encoder, workers=num_processes)
+    
+    if encoder.close():
+        print(f"Encoded {len(frame_numbers)} frames")
+    else:
+        print("Encoding failed")
+
 def generate_all_frames(input_dir, output_dir, config, num_processes=None):
     """Generate all frames in parallel"""
     input_path = Path(input_dir)
@@ -206,6 +248,8 @@ def main():
     parser.add_argument('input_dir', help='Input directory with CSV exports')
     parser.add_argument('output_dir', help='Output directory for PNG frames')
     parser.add_argument('--processes', type=int, help='Number of parallel processes')
+    parser.add_argument('--video', help='Stream frames straight into this video file instead of writing PNGs')
+    parser.add_argument('--fps', type=int, default=60, help='Frame rate for --video')
     
     args = parser.parse_args()
     
@@ -215,7 +259,10 @@ def main():
         'color_scheme': 'default'
     }
     
-    generate_all_frames(args.input_dir, args.output_dir, config, args.processes)
+    if args.video:
+        stream_all_frames(args.input_dir, args.video, config, args.processes, args.fps)
+    else:
+        generate_all_frames(args.input_dir, args.output_dir, config, args.processes)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,11 +1,58 @@
 """
 Camera path definitions and control for 3D animations.
+
+Paths are structured arrays with one record per frame (CAMERA_DTYPE); each
+record carries its precomputed world-to-camera view matrix.
 """
 import numpy as np
 from typing import List, Dict, Tuple
 from scipy.interpolate import interp1d
 import math
 
+from .terrain_renderer import camera_view_matrices
+
+# One record per frame: timing, spherical camera position and view matrix
+CAMERA_DTYPE = np.dtype([
+    ('frame', np.int64),
+    ('time', np.float64),
+    ('azimuth', np.float64),
+    ('elevation', np.float64),
+    ('distance', np.float64),
+    ('view', np.float64, (4, 4))
+])
+
+
+# Interpolation kinds in decreasing spline order
+SPLINE_ORDERS = {'cubic': 3, 'quadratic': 2, 'linear': 1}
+
+
+def camera_records(frames: np.ndarray,
+                   times: np.ndarray,
+                   azimuth: np.ndarray,
+                   elevation: np.ndarray,
+                   distance: np.ndarray) -> np.ndarray:
+    """
+    Pack per-frame camera positions into a CAMERA_DTYPE array.
+    
+    Args:
+        frames: Frame number of every record
+        times: Time of every frame in seconds
+        azimuth: Azimuth per frame in degrees
+        elevation: Elevation per frame in degrees
+        distance: Camera distance per frame
+        
+    Returns:
+        Structured camera path with view matrices
+    """
+    path = np.empty(len(times), dtype=CAMERA_DTYPE)
+    path['frame'] = frames
+    path['time'] = times
+    path['azimuth'] = azimuth
+    path['elevation'] = elevation
+    path['distance'] = distance
+    path['view'] = camera_view_matrices(azimuth, elevation, distance) if len(path) else 0.0
+    return path
+
 
 class CameraPathController:
     """Generate and control camera movements for 3D views."""
@@ -24,7 +71,7 @@ class CameraPathController:
                            key_points: List[Dict],
                            duration: float,
                            fps: int = 60,
-                           smoothing: str = 'cubic') -> List[Dict]:
+                           smoothing: str = 'cubic') -> np.ndarray:
         """
         Generate smooth camera movements between keyframes.
         
@@ -35,49 +82,39 @@ class CameraPathController:
             smoothing: Interpolation method ('linear', 'cubic', 'quadratic')
             
         Returns:
-            List of camera positions for each frame
+            Structured array (CAMERA_DTYPE) with the camera of every frame
         """
         total_frames = int(duration * fps)
         
         # Extract keyframe data
         times = [kp['time'] for kp in key_points]
-        azimuths = [kp['azimuth'] for kp in key_points]
-        elevations = [kp['elevation'] for kp in key_points]
-        distances = [kp['distance'] for kp in key_points]
-        
-        # Create interpolation functions
-        azimuth_interp = interp1d(times, azimuths, kind=smoothing, 
-                                 fill_value='extrapolate')
-        elevation_interp = interp1d(times, elevations, kind=smoothing,
-                                   fill_value='extrapolate')
-        distance_interp = interp1d(times, distances, kind=smoothing,
-                                  fill_value='extrapolate')
-        
-        # Generate camera positions for each frame
-        camera_positions = []
-        for frame in range(total_frames):
-            t = frame / fps
-            
-            camera_pos = {
-                'frame': frame,
-                'time': t,
-                'azimuth': float(azimuth_interp(t)),
-                'elevation': float(elevation_interp(t)),
-                'distance': float(distance_interp(t))
-            }
-            
-            camera_positions.append(camera_pos)
+        values = np.array([[kp['azimuth'] for kp in key_points],
+                           [kp['elevation'] for kp in key_points],
+                           [kp['distance'] for kp in key_points]], dtype=float)
+        
+        # A spline needs more keyframes than its order; fall back to lower orders
+        order = SPLINE_ORDERS.get(smoothing, 0)
+        if order >= len(times):
+            smoothing = next(kind for kind, kind_order in SPLINE_ORDERS.items()
+                             if kind_order < len(times))
+        
+        # One interpolator evaluates all three channels for all frames
+        interpolator = interp1d(times, values, kind=smoothing, axis=1,
+                                fill_value='extrapolate')
+        frames = np.arange(total_frames)
+        frame_times = frames / fps
+        azimuth, elevation, distance = interpolator(frame_times)
         
-        return camera_positions
+        return camera_records(frames, frame_times, azimuth, elevation, distance)
     
-    def get_cinematic_paths(self, duration: float, fps: int = 60) -> Dict[str, List[Dict]]:
+    def get_cinematic_paths(self, duration: float, fps: int = 60) -> Dict[str, np.ndarray]:
         """Get predefined cinematic camera movements."""
         return {
             name: func(duration, fps) 
             for name, func in self.paths.items()
         }
     
-    def _generate_orbit_path(self, duration: float, fps: int) -> List[Dict]:
+    def _generate_orbit_path(self, duration: float, fps: int) -> np.ndarray:
         """Generate circular orbit around the scene."""
         key_points = [
             {'time': 0.0, 'azimuth': -45, 'elevation': 30, 'distance': 10},
@@ -89,7 +126,7 @@ class CameraPathController:
         
         return self.generate_camera_path(key_points, duration, fps, 'cubic')
     
-    def _generate_flyover_path(self, duration: float, fps: int) -> List[Dict]:
+    def _generate_flyover_path(self, duration: float, fps: int) -> np.ndarray:
         """Generate flyover path from one corner to opposite."""
         key_points = [
             {'time': 0.0, 'azimuth': -45, 'elevation': 60, 'distance': 15},
@@ -100,7 +137,7 @@ class CameraPathController:
         
         return self.generate_camera_path(key_points, duration, fps, 'cubic')
     
-    def _generate_fire_tracking_path(self, duration: float, fps: int) -> List[Dict]:
+    def _generate_fire_tracking_path(self, duration: float, fps: int) -> np.ndarray:
         """Generate path that follows fire progression."""
         # This would ideally track actual fire data
         key_points = [
@@ -112,7 +149,7 @@ class CameraPathController:
         
         return self.generate_camera_path(key_points, duration, fps, 'cubic')
     
-    def _generate_reveal_path(self, duration: float, fps: int) -> List[Dict]:
+    def _generate_reveal_path(self, duration: float, fps: int) -> np.ndarray:
         """Generate dramatic reveal starting from close-up."""
         key_points = [
             {'time': 0.0, 'azimuth': 0, 'elevation': 10, 'distance': 3},
@@ -124,7 +161,7 @@ class CameraPathController:
         
         return self.generate_camera_path(key_points, duration, fps, 'quadratic')
     
-    def _generate_zoom_path(self, duration: float, fps: int) -> List[Dict]:
+    def _generate_zoom_path(self, duration: float, fps: int) -> np.ndarray:
         """Generate zoom in/out path."""
         key_points = [
             {'time': 0.0, 'azimuth': -45, 'elevation': 30, 'distance': 12},
@@ -134,7 +171,7 @@ class CameraPathController:
         
         return self.generate_camera_path(key_points, duration, fps, 'cubic')
     
-    def _generate_pan_path(self, duration: float, fps: int) -> List[Dict]:
+    def _generate_pan_path(self, duration: float, fps: int) -> np.ndarray:
         """Generate horizontal panning path."""
         key_points = [
             {'time': 0.0, 'azimuth': -90, 'elevation': 30, 'distance': 10},
@@ -147,7 +184,7 @@ class CameraPathController:
     def combine_paths(self,
                      paths: List[Tuple[str, float]],
                      total_duration: float,
-                     fps: int = 60) -> List[Dict]:
+                     fps: int = 60) -> np.ndarray:
         """
         Combine multiple camera paths sequentially.
         
@@ -159,7 +196,7 @@ class CameraPathController:
         Returns:
             Combined camera path
         """
-        combined_path = []
+        segments = [np.empty(0, dtype=CAMERA_DTYPE)]
         current_time = 0.0
         
         for path_name, path_duration in paths:
@@ -168,21 +205,19 @@ class CameraPathController:
                 segment = self.paths[path_name](path_duration, fps)
                 
                 # Adjust timing and add to combined path
-                for pos in segment:
-                    adjusted_pos = pos.copy()
-                    adjusted_pos['time'] += current_time
-                    adjusted_pos['frame'] = int(adjusted_pos['time'] * fps)
-                    combined_path.append(adjusted_pos)
+                segment['time'] += current_time
+                segment['frame'] = (segment['time'] * fps).astype(np.int64)
+                segments.append(segment)
                 
                 current_time += path_duration
         
-        return combined_path
+        return np.concatenate(segments)
     
     def smooth_transition(self,
-                         path1: List[Dict],
-                         path2: List[Dict],
+                         path1: np.ndarray,
+                         path2: np.ndarray,
                          transition_duration: float,
-                         fps: int = 60) -> List[Dict]:
+                         fps: int = 60) -> np.ndarray:
         """
         Create smooth transition between two camera paths.
         
@@ -223,11 +258,10 @@ class CameraPathController:
         )
         
         # Combine paths
-        combined = path1[:-1] + transition + path2[1:]
+        combined = np.concatenate([path1[:-1], transition, path2[1:]])
         
         # Recalculate frame numbers
-        for i, pos in enumerate(combined):
-            pos['frame'] = i
-            pos['time'] = i / fps
+        combined['frame'] = np.arange(len(combined))
+        combined['time'] = combined['frame'] / fps
         
         return combined
\ No newline at end of file
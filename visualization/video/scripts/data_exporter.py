@@ -5,10 +5,13 @@ Prepares simulation data for frame rendering.
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import Dict, Tuple, Optional
 import json
 from datetime import datetime
 
+from .frame_store import FrameStoreWriter
+from .grid_arrays import grid_shape, snapshot_to_arrays
+
 
 class SimulationDataExporter:
     """Export simulation data at regular intervals for video generation."""
@@ -21,19 +24,84 @@ class SimulationDataExporter:
                         simulation_snapshots: Dict[str, pd.DataFrame],
                         target_duration: float = 15.0,
                         fps: int = 60,
-                        scenario_name: str = "baseline") -> Dict:
+                        scenario_name: str = "baseline",
+                        batch_frames: Optional[int] = None) -> Dict:
         """
         Export grid states at regular intervals for video generation.
         
+        All frames of the scenario are written to one binary frame container
+        (see frame_store.FrameStore for random access).
+        
         Args:
             simulation_snapshots: Dict of timestamp -> grid DataFrame
             target_duration: Target video duration in seconds
             fps: Frames per second
             scenario_name: Name of the scenario
+            batch_frames: Frames interpolated per batch (default: the whole
+                timeline at once)
             
         Returns:
             Dict with export metadata
         """
+        timeline = self.prepare_timeline(simulation_snapshots, target_duration, fps)
+        
+        container_filename = f"{scenario_name}_frames.ffstore"
+        
+        # Export metadata
+        metadata = {
+            'scenario': scenario_name,
+            'container': container_filename,
+            'grid_shape': list(timeline['shape']),
+            'static_layers': sorted(timeline['static_layers']),
+            'video_duration': target_duration,
+            'fps': fps,
+            'total_frames': timeline['total_frames'],
+            'simulation_duration': timeline['simulation_duration'],
+            'time_scale': timeline['time_scale'],
+            'frame_data': []
+        }
+        
+        # The container is only moved into place once every frame is written
+        with FrameStoreWriter(
+            self.output_dir / container_filename,
+            static_layers=timeline['static_layers'],
+            metadata={'scenario': scenario_name, 'fps': fps}
+        ) as writer:
+            # Generate frame data
+            for frame in self.iter_timeline(timeline, batch_frames):
+                frame_info = {
+                    'frame_index': frame['frame_index'],
+                    'video_time': frame['video_time'],
+                    'simulation_time': frame['simulation_time']
+                }
+                
+                # Append frame to the scenario container
+                writer.add_frame(frame['state'], frame['layers'], frame_info)
+                metadata['frame_data'].append(frame_info)
+        
+        # Save metadata
+        metadata_path = self.output_dir / f"{scenario_name}_metadata.json"
+        with open(metadata_path, 'w') as f:
+            json.dump(metadata, f, indent=2)
+        
+        return metadata
+    
+    def prepare_timeline(self,
+                         simulation_snapshots: Dict[str, pd.DataFrame],
+                         target_duration: float = 15.0,
+                         fps: int = 60) -> Dict:
+        """
+        Stack snapshots into arrays and map every video frame onto them.
+        
+        Args:
+            simulation_snapshots: Dict of timestamp -> grid DataFrame
+            target_duration: Target video duration in seconds
+            fps: Frames per second
+            
+        Returns:
+            Timeline dict with (S, H, W) snapshot stacks, static layers and
+            per-frame bracket indices and alpha weights
+        """
         # Calculate required frames
         total_frames = int(target_duration * fps)
         
@@ -47,130 +115,135 @@ class SimulationDataExporter:
         sim_duration = sorted_times[-1] - sorted_times[0]
         time_scale = sim_duration / target_duration
         
-        # Export metadata
-        metadata = {
-            'scenario': scenario_name,
-            'video_duration': target_duration,
-            'fps': fps,
+        video_times = np.arange(total_frames) / fps
+        sim_times = sorted_times[0] + video_times * time_scale
+        
+        # Convert each snapshot once into (S, H, W) stacks
+        snapshots = [simulation_snapshots[str(t)] for t in sorted_times]
+        shape = grid_shape(snapshots[0])
+        arrays = [snapshot_to_arrays(snapshot, shape) for snapshot in snapshots]
+        states = np.stack([a['state'] for a in arrays])
+        layer_names = [name for name in arrays[0]
+                       if name != 'state' and all(name in a for a in arrays)]
+        stacks = {name: np.stack([a[name] for a in arrays]) for name in layer_names}
+        
+        # Layers identical in every snapshot are stored once
+        static_layers = {name: stack[0] for name, stack in stacks.items()
+                         if (stack == stack[0]).all()}
+        layers = {name: stack for name, stack in stacks.items()
+                  if name not in static_layers}
+        
+        idx1, idx2, alpha = self._snapshot_brackets(sim_times, np.asarray(sorted_times))
+        
+        return {
+            'shape': shape,
             'total_frames': total_frames,
             'simulation_duration': sim_duration,
             'time_scale': time_scale,
-            'frame_data': []
+            'video_times': video_times,
+            'simulation_times': sim_times,
+            'states': states,
+            'layers': layers,
+            'static_layers': static_layers,
+            'brackets': (idx1, idx2, alpha)
         }
+    
+    def iter_timeline(self, timeline: Dict, batch_frames: Optional[int] = None):
+        """
+        Interpolate the timeline batch by batch.
         
-        # Generate frame data
-        for frame_idx in range(total_frames):
-            video_time = frame_idx / fps
-            sim_time = sorted_times[0] + video_time * time_scale
-            
-            # Find nearest snapshots for interpolation
-            snapshot_idx = self._find_snapshot_indices(sim_time, sorted_times)
+        Memory is bounded by batch_frames, so long runs can be streamed.
+        
+        Args:
+            timeline: Timeline from prepare_timeline
+            batch_frames: Frames interpolated per batch (default: all)
             
-            # Get interpolated data
-            frame_data = self._interpolate_snapshot(
-                sim_time, sorted_times, simulation_snapshots, snapshot_idx
+        Yields:
+            Frame dicts with index, times, 'state' grid and 'layers' grids
+        """
+        total_frames = timeline['total_frames']
+        batch_frames = batch_frames or max(total_frames, 1)
+        idx1, idx2, alpha = timeline['brackets']
+        
+        for start in range(0, total_frames, batch_frames):
+            batch = slice(start, min(start + batch_frames, total_frames))
+            states, layers = self._interpolate_batch(
+                timeline['states'], timeline['layers'],
+                idx1[batch], idx2[batch], alpha[batch]
             )
             
-            # Save frame data
-            frame_filename = f"{scenario_name}_frame_{frame_idx:05d}.json"
-            frame_path = self.output_dir / frame_filename
-            
-            frame_info = {
-                'frame_index': frame_idx,
-                'video_time': video_time,
-                'simulation_time': sim_time,
-                'data_file': frame_filename
-            }
-            
-            # Save grid data as JSON for easy loading
-            self._save_frame_data(frame_path, frame_data)
-            metadata['frame_data'].append(frame_info)
+            for offset, frame_idx in enumerate(range(batch.start, batch.stop)):
+                yield {
+                    'frame_index': frame_idx,
+                    'video_time': float(timeline['video_times'][frame_idx]),
+                    'simulation_time': float(timeline['simulation_times'][frame_idx]),
+                    'state': states[offset],
+                    'layers': {name: stack[offset] for name, stack in layers.items()}
+                }
+    
+    def _snapshot_brackets(self, sim_times: np.ndarray,
+                           sorted_times: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Find the two snapshots bracketing every frame time in one search.
         
-        # Save metadata
-        metadata_path = self.output_dir / f"{scenario_name}_metadata.json"
-        with open(metadata_path, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        Returns:
+            (first index, second index, interpolation alpha) per frame
+        """
+        n_snapshots = len(sorted_times)
         
-        return metadata
-    
-    def _find_snapshot_indices(self, sim_time: float, sorted_times: List[float]) -> Tuple[int, int]:
-        """Find the two snapshot indices for interpolation."""
-        for i in range(len(sorted_times) - 1):
-            if sorted_times[i] <= sim_time <= sorted_times[i + 1]:
-                return i, i + 1
+        # First bracket [t_i, t_i+1] containing the time, as a linear scan would find
+        idx1 = np.clip(np.searchsorted(sorted_times, sim_times, side='left') - 1,
+                       0, n_snapshots - 2)
+        idx2 = idx1 + 1
         
         # If beyond range, use nearest
-        if sim_time < sorted_times[0]:
-            return 0, 0
-        else:
-            return len(sorted_times) - 1, len(sorted_times) - 1
-    
-    def _interpolate_snapshot(self, 
-                             sim_time: float,
-                             sorted_times: List[float],
-                             snapshots: Dict[str, pd.DataFrame],
-                             indices: Tuple[int, int]) -> pd.DataFrame:
-        """Interpolate between two snapshots."""
-        idx1, idx2 = indices
-        
-        # If same index, no interpolation needed
-        if idx1 == idx2:
-            return snapshots[str(sorted_times[idx1])].copy()
+        before = sim_times < sorted_times[0]
+        after = sim_times > sorted_times[-1]
+        idx1[after] = n_snapshots - 1
+        idx2[before] = 0
+        idx2[after] = n_snapshots - 1
         
         t1, t2 = sorted_times[idx1], sorted_times[idx2]
-        snapshot1 = snapshots[str(t1)]
-        snapshot2 = snapshots[str(t2)]
-        
-        # Calculate interpolation factor
-        alpha = (sim_time - t1) / (t2 - t1) if t2 != t1 else 0
-        
-        # Create interpolated snapshot
-        interpolated = snapshot1.copy()
-        
-        # Interpolate continuous values
-        continuous_cols = ['moisture', 'temperature', 'elevation']
-        for col in continuous_cols:
-            if col in snapshot1.columns and col in snapshot2.columns:
-                interpolated[col] = (1 - alpha) * snapshot1[col] + alpha * snapshot2[col]
-        
-        # Handle discrete state transitions
-        if 'state' in snapshot1.columns:
-            # For fire spread, we can show progression
-            interpolated['state'] = self._interpolate_states(
-                snapshot1['state'], snapshot2['state'], alpha
-            )
+        span = np.where(t2 != t1, t2 - t1, 1.0)
+        alpha = np.where(t2 != t1, (sim_times - t1) / span, 0.0)
         
-        return interpolated
+        return idx1, idx2, alpha
     
-    def _interpolate_states(self, states1: pd.Series, states2: pd.Series, 
-                           alpha: float) -> pd.Series:
-        """Interpolate between discrete cell states."""
-        # Simple approach: switch states based on alpha threshold
-        # More sophisticated: probabilistic transition
-        interpolated = states1.copy()
-        
-        # Find cells that changed state
-        changed_mask = states1 != states2
+    def _interpolate_batch(self,
+                           states: np.ndarray,
+                           layers: Dict[str, np.ndarray],
+                           idx1: np.ndarray,
+                           idx2: np.ndarray,
+                           alpha: np.ndarray) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Interpolate a batch of frames as (T, H, W) array operations.
         
-        # For changed cells, transition based on alpha
-        # This creates a wave effect for fire spread
-        transition_threshold = 0.5  # Can be randomized for organic look
+        Returns:
+            (T, H, W) states and a (T, H, W) stack per layer
+        """
+        weight = alpha.astype(np.float32)[:, None, None]
         
-        interpolated[changed_mask & (alpha > transition_threshold)] = states2[changed_mask & (alpha > transition_threshold)]
+        # Interpolate continuous values; category codes switch like states
+        interpolated_layers = {
+            name: (self._interpolate_states(stack[idx1], stack[idx2], alpha)
+                   if stack.dtype == np.uint8
+                   else (1 - weight) * stack[idx1] + weight * stack[idx2])
+            for name, stack in layers.items()
+        }
         
-        return interpolated
+        return (self._interpolate_states(states[idx1], states[idx2], alpha),
+                interpolated_layers)
     
-    def _save_frame_data(self, path: Path, data: pd.DataFrame):
-        """Save frame data in efficient format."""
-        # Convert DataFrame to dict for JSON serialization
-        frame_dict = {
-            'grid_data': data.to_dict('records'),
-            'shape': (data.index.get_level_values('x').max() + 1,
-                     data.index.get_level_values('y').max() + 1)
-        }
+    def _interpolate_states(self, states1: np.ndarray, states2: np.ndarray,
+                           alpha: np.ndarray) -> np.ndarray:
+        """Interpolate between discrete cell states."""
+        # Simple approach: switch states based on alpha threshold
+        # More sophisticated: probabilistic transition
+        transition_threshold = 0.5  # Can be randomized for organic look
         
-        with open(path, 'w') as f:
-            json.dump(frame_dict, f)
+        # Changed cells take their new state once alpha passes the threshold
+        switched = (alpha > transition_threshold)[:, None, None]
+        return np.where(switched, states2, states1)
     
     def prepare_scenario_comparison(self,
                                    baseline_snapshots: Dict[str, pd.DataFrame],
@@ -0,0 +1,164 @@
+"""
+Content-addressed frame cache.
+Frames are keyed by a hash of everything that determines their pixels
+(snapshot content, camera, overlay text), so identical frames are rendered
+once and repeated frames can be encoded as holds.
+"""
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+DIGEST_SIZE = 16
+
+
+def _normalize(value):
+    """Turn key inputs into a canonical, hashable representation."""
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _normalize(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(v) for v in value)
+    if isinstance(value, (float, np.floating)):
+        # Ignore float noise far below anything visible in a frame
+        return round(float(value), 6)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.ndarray):
+        return snapshot_digest(value)
+    return value
+
+
+def frame_key(*inputs) -> str:
+    """
+    Build a cache key from the inputs that determine a frame.
+
+    Args:
+        *inputs: Snapshot digests, camera parameters, overlay text, ...
+
+    Returns:
+        Hex digest identifying the frame content
+    """
+    digest = hashlib.blake2b(repr(_normalize(inputs)).encode(),
+                             digest_size=DIGEST_SIZE)
+    return digest.hexdigest()
+
+
+def snapshot_digest(snapshot) -> str:
+    """
+    Hash the content of a grid snapshot.
+
+    Args:
+        snapshot: Snapshot DataFrame, array or list of cell records
+
+    Returns:
+        Hex digest of the snapshot content
+    """
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+
+    if isinstance(snapshot, pd.DataFrame):
+        digest.update(repr(list(snapshot.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(snapshot, index=True).values.tobytes())
+    elif isinstance(snapshot, np.ndarray):
+        digest.update(repr((snapshot.shape, snapshot.dtype.str)).encode())
+        digest.update(np.ascontiguousarray(snapshot).data)
+    else:
+        digest.update(repr(_normalize(snapshot)).encode())
+
+    return digest.hexdigest()
+
+
+def hold_runs(keys: Iterable[str]) -> Iterator[Tuple[int, int]]:
+    """
+    Group consecutive identical frame keys.
+
+    Args:
+        keys: Frame keys in output order
+
+    Yields:
+        (first frame index, number of frames) for each run
+    """
+    run_start = 0
+    run_key = None
+    index = -1
+
+    for index, key in enumerate(keys):
+        if index > 0 and key != run_key:
+            yield run_start, index - run_start
+            run_start = index
+        run_key = key
+
+    if index >= 0:
+        yield run_start, index + 1 - run_start
+
+
+class FrameCache:
+    """Least-recently-used cache of rendered frames."""
+
+    def __init__(self, max_frames: int = 64):
+        """
+        Args:
+            max_frames: Number of frames kept in memory (0 disables caching)
+        """
+        self.max_frames = max_frames
+        self.hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._frames
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return a cached frame, or None."""
+        frame = self._frames.get(key)
+        if frame is not None:
+            self._frames.move_to_end(key)
+        return frame
+
+    def put(self, key: str, frame: np.ndarray) -> np.ndarray:
+        """
+        Store a frame.
+
+        Cached frames are shared between callers, so they are made read-only.
+        """
+        if self.max_frames <= 0:
+            return frame
+
+        frame.flags.writeable = False
+        self._frames[key] = frame
+        self._frames.move_to_end(key)
+
+        while len(self._frames) > self.max_frames:
+            self._frames.popitem(last=False)
+
+        return frame
+
+    def get_or_render(self, key: str, render: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        Return the cached frame for key, rendering it on a miss.
+
+        Args:
+            key: Frame key from frame_key()
+            render: Zero-argument callable producing the frame
+
+        Returns:
+            Frame array (read-only when cached)
+        """
+        frame = self.get(key)
+        if frame is not None:
+            self.hits += 1
+            return frame
+
+        self.misses += 1
+        return self.put(key, render())
+
+    def stats(self) -> Dict[str, int]:
+        """Cache hit and miss counts."""
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self)}
+
+    def clear(self):
+        """Drop all cached frames."""
+        self._frames.clear()
@@ -12,7 +12,7 @@ import matplotlib.colors as mcolors
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_agg import FigureCanvasAgg
 from pathlib import Path
-from typing import Dict, Tuple, Optional, List
+from typing import Dict, Tuple, Optional, List, Union
 import json
 
 # Import color schemes from visualization module
@@ -21,6 +21,23 @@ sys.path.append(str(Path(__file__).parent.parent.parent / 'python'))
 from utils.color_schemes import CELL_STATE_COLORS, create_state_colormap
 from utils.plot_config import set_publication_style
 
+from .grid_arrays import STATE_NAMES, snapshot_to_arrays
+from .terrain_renderer import CachedTerrainRenderer
+
+# Grid snapshot as a DataFrame indexed by (x, y) or as dense grid arrays
+GridData = Union[pd.DataFrame, Dict[str, np.ndarray]]
+
+# RGB colour per state code
+STATE_PALETTE = np.array([mcolors.to_rgb(CELL_STATE_COLORS.get(state, '#808080'))
+                          for state in STATE_NAMES])
+
+
+def as_grid_arrays(grid_data: GridData) -> Dict[str, np.ndarray]:
+    """Dense grid arrays of a snapshot (arrays are passed through unchanged)."""
+    if isinstance(grid_data, pd.DataFrame):
+        return snapshot_to_arrays(grid_data)
+    return grid_data
+
 
 class GridFrameRenderer:
     """Render 2D grid frames for video."""
@@ -32,7 +49,7 @@ class GridFrameRenderer:
         set_publication_style()
     
     def render_frame(self,
-                    grid_data: pd.DataFrame,
+                    grid_data: GridData,
                     frame_number: int,
                     layout: str = 'full',
                     show_grid: bool = False) -> np.ndarray:
@@ -40,7 +57,7 @@ class GridFrameRenderer:
         Render a single 2D grid frame.
         
         Args:
-            grid_data: Grid data DataFrame
+            grid_data: Grid data DataFrame or grid arrays with a 'state' grid
             frame_number: Frame index
             layout: Layout type ('full', 'left', 'right')
             show_grid: Whether to show grid lines
@@ -65,12 +82,9 @@ class GridFrameRenderer:
         else:
             ax = fig.add_subplot(111)
         
-        # Extract grid dimensions
-        width = grid_data.index.get_level_values('x').max() + 1
-        height = grid_data.index.get_level_values('y').max() + 1
-        
-        # Create state matrix
-        state_matrix = self._create_state_matrix(grid_data, width, height)
+        # State codes are plotted directly
+        state_matrix = as_grid_arrays(grid_data)['state']
+        height, width = state_matrix.shape
         
         # Create colormap
         cmap, norm = create_state_colormap()
@@ -102,23 +116,384 @@ class GridFrameRenderer:
         plt.close(fig)
         
         return frame
+
+
+def render_text_panel(text: str,
+                      canvas_size: Tuple[int, int] = (1920, 1080),
+                      font_config: Optional[Dict] = None) -> np.ndarray:
+    """
+    Rasterize a text box once so it can be blended onto many frames.
+    
+    Args:
+        text: Text to draw (may span several lines)
+        canvas_size: (width, height) of the scratch canvas; the text must fit
+        font_config: Matplotlib font properties
+        
+    Returns:
+        (height, width, 4) uint8 RGBA panel cropped to the text box
+    """
+    width, height = canvas_size
+    fig = Figure(figsize=(width / 100, height / 100), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    fig.patch.set_alpha(0)
+    
+    fig.text(0.5, 0.5, text, ha='center', va='center', color='white',
+             fontdict=font_config or {'family': 'sans-serif', 'weight': 'bold', 'size': 14},
+             bbox=dict(boxstyle='round,pad=0.5', facecolor='black', alpha=0.7))
+    canvas.draw()
+    rgba = np.asarray(canvas.buffer_rgba())
+    
+    # Crop to the drawn box
+    rows = np.flatnonzero(rgba[:, :, 3].any(axis=1))
+    cols = np.flatnonzero(rgba[:, :, 3].any(axis=0))
+    panel = rgba[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1].copy()
+    
+    plt.close(fig)
+    
+    return panel
+
+
+def blend_panel(frame: np.ndarray, panel: np.ndarray, x: int, y: int) -> np.ndarray:
+    """
+    Alpha-blend an RGBA panel onto an RGB frame in place.
+    
+    Args:
+        frame: (height, width, 3) uint8 frame, modified in place
+        panel: RGBA panel from render_text_panel
+        x, y: Top-left corner of the panel (clipped to the frame)
+        
+    Returns:
+        The frame
+    """
+    x0, y0 = max(x, 0), max(y, 0)
+    x1 = min(x + panel.shape[1], frame.shape[1])
+    y1 = min(y + panel.shape[0], frame.shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return frame
+    
+    # Only the panel's footprint is touched
+    region = panel[y0 - y:y1 - y, x0 - x:x1 - x]
+    alpha = region[:, :, 3:].astype(np.float32) / 255
+    target = frame[y0:y1, x0:x1]
+    target[:] = (target * (1 - alpha) + region[:, :, :3] * alpha + 0.5).astype(np.uint8)
+    
+    return frame
+
+
+def encode_index(index: np.ndarray) -> np.ndarray:
+    """RGBA image holding a grid of 16-bit indices in its red and green bytes."""
+    rgba = np.zeros(index.shape + (4,), dtype=np.uint8)
+    rgba[..., 0] = index >> 8
+    rgba[..., 1] = index & 0xFF
+    rgba[..., 3] = 255
+    return rgba
+
+
+class SplitScreenRenderer:
+    """Render two grids side by side, each at native half-width resolution."""
+    
+    def __init__(self, resolution: Tuple[int, int] = (1920, 1080), dpi: int = 150,
+                 divider_width: int = 4):
+        """
+        Args:
+            resolution: (width, height) of the composed frame
+            dpi: Render DPI
+            divider_width: Width in pixels of the white divider line
+        """
+        self.resolution = resolution
+        self.dpi = dpi
+        self.divider_width = divider_width
+        self.half_width = resolution[0] // 2
+        set_publication_style()
+        
+        # State colours as the state colormap draws them
+        cmap, norm = create_state_colormap()
+        self.palette = cmap(norm(np.arange(256)), bytes=True)
+        self.colours, self.colour_index = np.unique(self.palette, axis=0,
+                                                    return_inverse=True)
+        self.colour_index = self.colour_index.ravel()
+        
+        # One figure holds both sides; it is only drawn to lay out new grid
+        # shapes, frames are then rasterized from that layout
+        self.canvas, self.images = self._figure()
+        self._layouts = {}
+        
+        self.font_config = {
+            'family': 'sans-serif',
+            'weight': 'bold',
+            'size': 14
+        }
+        # Statistics are a table and need aligned columns
+        self.table_font_config = dict(self.font_config, family='monospace')
+        self._panels = {}
     
-    def _create_state_matrix(self, grid_data: pd.DataFrame, 
-                           width: int, height: int) -> np.ndarray:
-        """Convert grid data to state matrix."""
-        state_map = {'Empty': 0, 'Tree': 1, 'Burning': 2, 'Burnt': 3}
-        matrix = np.zeros((height, width))
-        
-        for idx, row in grid_data.iterrows():
-            if isinstance(idx, tuple):
-                x, y = idx
-            else:
-                x, y = int(row['x']), int(row['y'])
+    def render_frame(self, left_data: GridData, right_data: GridData,
+                     out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Render two grids side by side with a divider.
+        
+        Args:
+            left_data: Grid data or grid arrays shown on the left
+            right_data: Grid data or grid arrays shown on the right
+            out: Optional (height, width, 3) uint8 buffer for the result
             
-            state = row.get('state', 'Empty')
-            matrix[int(y), int(x)] = state_map.get(state, 0)
+        Returns:
+            Frame as numpy array (RGB)
+        """
+        grids = [as_grid_arrays(grid_data)['state'] for grid_data in (left_data, right_data)]
+        background, sides = self.layout(tuple(states.shape for states in grids))
+        
+        width, height = self.resolution
+        if out is None:
+            out = np.empty((height, width, 3), dtype=np.uint8)
+        out[:] = background
+        
+        for states, (region, rows, cols, cells, pixels, colours) in zip(grids, sides):
+            out[region] = self.palette[states.take(rows, axis=0).take(cols, axis=1), :3]
+            out[pixels] = colours[self.colour_index[states[cells]], np.arange(len(pixels[0]))]
         
-        return matrix
+        # Divider
+        half = self.divider_width // 2
+        out[:, self.half_width - half:self.half_width + half] = 255
+        
+        return out
+    
+    def layout(self, shapes: Tuple[Tuple[int, int], Tuple[int, int]]) -> Tuple:
+        """
+        Pixel layout of frames for a pair of grid shapes, drawn on first use.
+        
+        The figure is drawn once per distinct state colour, with both grids
+        filled with that colour. Everything outside the grids is static and
+        every pixel inside depends only on the cell under it, so a frame is
+        a gather per side plus a lookup for the pixels the chrome blends into.
+        
+        Args:
+            shapes: (height, width) of the left and right grids
+            
+        Returns:
+            (background, sides); each side is the (rows, cols) slice the grid
+            touches, the cell row and column under its pixels, and the cells
+            and positions of the remaining pixels with their colour for each
+            state colour
+        """
+        if shapes in self._layouts:
+            return self._layouts[shapes]
+        
+        states = [np.flatnonzero(self.colour_index == colour)[0]
+                  for colour in range(len(self.colours))]
+        frames = self._draw(self.canvas, self.images,
+                            ([self.palette[np.full(shape, state, dtype=np.uint8)]
+                              for shape in shapes] for state in states))
+        
+        # Cell under every pixel, read back from draws of the row and column
+        # indices so ties between cells resolve exactly as Matplotlib does.
+        # Spines would cover the edge cells, so these use a copy without them
+        canvas, images = self._figure(spines=False)
+        indices = self._draw(canvas, images,
+                             ([encode_index(np.indices(shape)[axis]) for shape in shapes]
+                              for axis in (0, 1)))
+        indices = (indices[..., 0].astype(np.intp) << 8) | indices[..., 1]
+        
+        height = self.resolution[1]
+        sides = []
+        for image, shape in zip(self.images, shapes):
+            box = image.axes.bbox
+            region = (slice(int(np.floor(height - box.y1)), int(np.ceil(height - box.y0))),
+                      slice(int(np.floor(box.x0)), int(np.ceil(box.x1))))
+            cells = (np.minimum(indices[0][region], shape[0] - 1),
+                     np.minimum(indices[1][region], shape[1] - 1))
+            
+            # Rows and columns are gathered separately; the few pixels where
+            # the resampling is not separable, and those the chrome blends
+            # into, are looked up per pixel
+            rows = cells[0][:, cells[0].shape[1] // 2]
+            cols = cells[1][cells[1].shape[0] // 2]
+            plain = ((frames[(slice(None),) + region] == self.colours[:, None, None, :3])
+                     .all(axis=-1).all(axis=0)
+                     & (cells[0] == rows[:, None]) & (cells[1] == cols))
+            pixels = np.nonzero(~plain)
+            sides.append((region, rows, cols, (cells[0][pixels], cells[1][pixels]),
+                          (pixels[0] + region[0].start, pixels[1] + region[1].start),
+                          frames[:, pixels[0] + region[0].start, pixels[1] + region[1].start]))
+        
+        self._layouts[shapes] = (frames[0], sides)
+        return self._layouts[shapes]
+    
+    def _figure(self, spines: bool = True) -> Tuple[FigureCanvasAgg, List]:
+        """Figure with an image per side, in GridFrameRenderer's 'full' layout."""
+        width, height = self.resolution
+        fig = Figure(figsize=(width / self.dpi, height / self.dpi), dpi=self.dpi)
+        canvas = FigureCanvasAgg(fig)
+        
+        images = []
+        for left in (0, self.half_width):
+            ax = fig.add_axes([(left + 0.05 * self.half_width) / width, 0.05,
+                               0.9 * self.half_width / width, 0.9])
+            ax.set_xticks([])
+            ax.set_yticks([])
+            if not spines:
+                ax.set_frame_on(False)
+            images.append(ax.imshow(self.palette[np.zeros((1, 1), dtype=np.uint8)],
+                                    interpolation='nearest', aspect='equal'))
+        return canvas, images
+    
+    @staticmethod
+    def _draw(canvas: FigureCanvasAgg, images: List, frames) -> np.ndarray:
+        """Draw the figure for each pair of RGBA side images, returned as RGB."""
+        drawn = []
+        for rgba_pair in frames:
+            for image, rgba in zip(images, rgba_pair):
+                height, width = rgba.shape[:2]
+                image.set_data(rgba)
+                image.set_extent((-0.5, width - 0.5, height - 0.5, -0.5))
+                image.axes.set_xlim(-0.5, width - 0.5)
+                image.axes.set_ylim(height - 0.5, -0.5)
+            canvas.draw()
+            drawn.append(np.asarray(canvas.buffer_rgba())[:, :, :3].copy())
+        return np.stack(drawn)
+    
+    def panel(self, text: str, font_config: Optional[Dict] = None) -> np.ndarray:
+        """RGBA text panel, rasterized on first use."""
+        font_config = font_config or self.font_config
+        key = (text, font_config['family'])
+        if key not in self._panels:
+            self._panels[key] = render_text_panel(text, self.resolution, font_config)
+        return self._panels[key]
+    
+    def add_labels(self, frame: np.ndarray, left_label: str, right_label: str,
+                   margin: int = 30) -> np.ndarray:
+        """Draw a label centred at the top of each half (in place)."""
+        for label, center_x in ((left_label, self.half_width // 2),
+                                (right_label, self.half_width + self.half_width // 2)):
+            panel = self.panel(label)
+            blend_panel(frame, panel, center_x - panel.shape[1] // 2, margin)
+        
+        return frame
+    
+    def add_statistics(self, frame: np.ndarray, left_metrics: Dict, right_metrics: Dict,
+                       left_label: str, right_label: str, margin: int = 60) -> np.ndarray:
+        """Draw a comparison table of two metrics dicts at the bottom centre (in place)."""
+        panel = self.panel(self.statistics_text(left_metrics, right_metrics,
+                                                left_label, right_label),
+                           self.table_font_config)
+        width, height = self.resolution
+        blend_panel(frame, panel, (width - panel.shape[1]) // 2,
+                    height - margin - panel.shape[0])
+        
+        return frame
+    
+    @staticmethod
+    def statistics_text(left_metrics: Dict, right_metrics: Dict,
+                        left_label: str, right_label: str) -> str:
+        """Format the comparison table shown by add_statistics."""
+        rows = [('', left_label, right_label)]
+        if 'burnt_fraction' in left_metrics:
+            rows.append(('Burnt', f"{left_metrics['burnt_fraction']:.1%}",
+                         f"{right_metrics['burnt_fraction']:.1%}"))
+        if 'active_fires' in left_metrics:
+            rows.append(('Active fires', str(left_metrics['active_fires']),
+                         str(right_metrics['active_fires'])))
+        if 'largest_cluster' in left_metrics:
+            rows.append(('Largest fire', str(left_metrics['largest_cluster']),
+                         str(right_metrics['largest_cluster'])))
+        if 'percolation' in left_metrics:
+            rows.append(('Percolation', f"{left_metrics['percolation']:.2f}",
+                         f"{right_metrics['percolation']:.2f}"))
+        
+        widths = [max(len(row[col]) for row in rows) for col in range(3)]
+        lines = [f"{row[0]:<{widths[0]}}   {row[1]:>{widths[1]}}   {row[2]:>{widths[2]}}"
+                 for row in rows]
+        return 'FINAL STATISTICS\n' + '\n'.join(lines)
+
+
+class ZoomFrameRenderer:
+    """
+    Rasterize the visible window of a grid at output resolution.
+    
+    Only the cells inside the window are looked up, through a state colour
+    LUT, so a zoomed frame is as sharp as a full render at that zoom and
+    costs a single gather instead of a Matplotlib draw.
+    """
+    
+    def __init__(self, resolution: Tuple[int, int] = (1920, 1080),
+                 axes_position: Tuple[float, float, float, float] = (0.05, 0.05, 0.9, 0.9),
+                 background: str = 'white'):
+        """
+        Args:
+            resolution: (width, height) of the output frame
+            axes_position: (left, bottom, width, height) figure fraction the
+                grid is fitted into, as in GridFrameRenderer's 'full' layout
+            background: Colour outside the grid
+        """
+        self.resolution = resolution
+        self.axes_position = axes_position
+        self.background = (np.array(mcolors.to_rgb(background)) * 255).round().astype(np.uint8)
+        self.palette = (STATE_PALETTE * 255).round().astype(np.uint8)
+    
+    def view_window(self, grid_shape: Tuple[int, int], center: Tuple[float, float],
+                    zoom: float) -> Tuple[float, float, float, float]:
+        """
+        Grid window shown at a zoom level, kept inside the grid.
+        
+        Args:
+            grid_shape: (height, width) of the grid
+            center: (x, y) cell the view is centred on
+            zoom: Magnification (1 shows the whole grid)
+            
+        Returns:
+            (x0, y0, width, height) of the window in cell units
+        """
+        height, width = grid_shape
+        zoom = max(zoom, 1.0)
+        window_width, window_height = width / zoom, height / zoom
+        
+        # Cell i covers [i, i + 1)
+        x0 = np.clip(center[0] + 0.5 - window_width / 2, 0, width - window_width)
+        y0 = np.clip(center[1] + 0.5 - window_height / 2, 0, height - window_height)
+        return float(x0), float(y0), window_width, window_height
+    
+    def render_frame(self, grid_data: GridData, center: Tuple[float, float],
+                     zoom: float) -> np.ndarray:
+        """
+        Render the grid zoomed on a cell.
+        
+        Args:
+            grid_data: Grid data DataFrame or grid arrays with a 'state' grid
+            center: (x, y) cell to zoom on
+            zoom: Magnification (1 shows the whole grid)
+            
+        Returns:
+            Frame as numpy array (RGB)
+        """
+        states = as_grid_arrays(grid_data)['state']
+        out_width, out_height = self.resolution
+        x0, y0, window_width, window_height = self.view_window(states.shape, center, zoom)
+        
+        # Fit the window into the axes box with equal aspect, centred
+        left, bottom, box_width, box_height = self.axes_position
+        box_width *= out_width
+        box_height *= out_height
+        scale = min(box_width / window_width, box_height / window_height)
+        origin_x = left * out_width + (box_width - window_width * scale) / 2
+        origin_y = (1 - bottom) * out_height - box_height + (box_height - window_height * scale) / 2
+        
+        # Cell under the centre of every output column and row
+        cols = x0 + (np.arange(out_width) + 0.5 - origin_x) / scale
+        rows = y0 + (np.arange(out_height) + 0.5 - origin_y) / scale
+        col_mask = (cols >= x0) & (cols < x0 + window_width)
+        row_mask = (rows >= y0) & (rows < y0 + window_height)
+        cols = np.minimum(cols[col_mask].astype(np.intp), states.shape[1] - 1)
+        rows = np.minimum(rows[row_mask].astype(np.intp), states.shape[0] - 1)
+        
+        frame = np.empty((out_height, out_width, 3), dtype=np.uint8)
+        frame[:] = self.background
+        row_range = np.flatnonzero(row_mask)
+        col_range = np.flatnonzero(col_mask)
+        if row_range.size and col_range.size:
+            frame[row_range[0]:row_range[-1] + 1, col_range[0]:col_range[-1] + 1] = \
+                self.palette[states.take(rows, axis=0).take(cols, axis=1)]
+        
+        return frame
 
 
 class TerrainFrameRenderer:
@@ -128,114 +503,55 @@ class TerrainFrameRenderer:
         self.resolution = resolution
         self.dpi = dpi
         self.fig_size = (resolution[0] / dpi, resolution[1] / dpi)
+        self._terrain = None
+        self._terrain_lighting = None
     
     def render_3d_frame(self,
-                       grid_data: pd.DataFrame,
+                       grid_data: GridData,
                        camera_position: Dict,
                        lighting_config: Optional[Dict] = None) -> np.ndarray:
         """
         Render 3D terrain frame.
         
+        The terrain mesh, hillshade and contours are cached between calls
+        and only rebuilt when the elevation grid or lighting changes.
+        
         Args:
-            grid_data: Grid data with elevation
+            grid_data: Grid data DataFrame or grid arrays with elevation
             camera_position: Camera position dict with azimuth, elevation, distance
-            lighting_config: Lighting configuration
+            lighting_config: Lighting configuration (light_azimuth,
+                light_altitude, ambient)
             
         Returns:
             Frame as numpy array
         """
-        from mpl_toolkits.mplot3d import Axes3D
-        
-        # Create figure
-        fig = Figure(figsize=self.fig_size, dpi=self.dpi)
-        canvas = FigureCanvasAgg(fig)
-        ax = fig.add_subplot(111, projection='3d')
-        
-        # Extract data
-        width = grid_data.index.get_level_values('x').max() + 1
-        height = grid_data.index.get_level_values('y').max() + 1
-        
-        # Create meshgrid
-        x = np.arange(width)
-        y = np.arange(height)
-        X, Y = np.meshgrid(x, y)
+        arrays = as_grid_arrays(grid_data)
+        shape = next(iter(arrays.values())).shape
         
         # Get elevation data
-        Z = self._create_elevation_matrix(grid_data, width, height)
+        Z = arrays['elevation'] if 'elevation' in arrays else np.zeros(shape)
         
         # Get state colors
-        colors = self._create_color_matrix(grid_data, width, height)
-        
-        # Plot surface
-        surf = ax.plot_surface(X, Y, Z, facecolors=colors,
-                              linewidth=0, antialiased=True,
-                              shade=True, alpha=0.95)
-        
-        # Set camera position
-        ax.view_init(elev=camera_position.get('elevation', 30),
-                    azim=camera_position.get('azimuth', -45))
-        
-        # Set distance (zoom)
-        ax.dist = camera_position.get('distance', 10)
-        
-        # Configure axes
-        ax.set_xlim(0, width-1)
-        ax.set_ylim(0, height-1)
-        ax.set_zlim(Z.min() * 0.9, Z.max() * 1.1)
-        
-        # Remove axes for cleaner look
-        ax.set_axis_off()
-        
-        # Add lighting effects
-        if lighting_config:
-            ax.set_box_aspect([1, height/width, 0.3])
+        states = arrays['state'] if 'state' in arrays else np.zeros(shape, dtype=np.uint8)
+        colors = STATE_PALETTE[states]
         
-        # Draw to canvas
-        canvas.draw()
-        
-        # Convert to numpy array
-        buf = canvas.buffer_rgba()
-        frame = np.asarray(buf)[:, :, :3]
-        
-        plt.close(fig)
-        
-        return frame
-    
-    def _create_elevation_matrix(self, grid_data: pd.DataFrame,
-                                width: int, height: int) -> np.ndarray:
-        """Create elevation matrix from grid data."""
-        matrix = np.zeros((height, width))
-        
-        for idx, row in grid_data.iterrows():
-            if isinstance(idx, tuple):
-                x, y = idx
-            else:
-                x, y = int(row['x']), int(row['y'])
-            
-            elevation = row.get('elevation', 0)
-            matrix[int(y), int(x)] = elevation
-        
-        return matrix
+        terrain = self.get_terrain(Z, lighting_config)
+        return terrain.render(colors, camera=camera_position)
     
-    def _create_color_matrix(self, grid_data: pd.DataFrame,
-                            width: int, height: int) -> np.ndarray:
-        """Create color matrix based on cell states."""
-        colors = np.ones((height, width, 4))  # RGBA
-        
-        for idx, row in grid_data.iterrows():
-            if isinstance(idx, tuple):
-                x, y = idx
-            else:
-                x, y = int(row['x']), int(row['y'])
-            
-            state = row.get('state', 'Empty')
-            color = CELL_STATE_COLORS.get(state, '#808080')
-            
-            # Convert hex to RGB
-            rgb = mcolors.to_rgb(color)
-            colors[int(y), int(x), :3] = rgb
-        
-        return colors
+    def get_terrain(self, elevation: np.ndarray,
+                    lighting_config: Optional[Dict] = None) -> CachedTerrainRenderer:
+        """Return the cached terrain renderer, rebuilding it for new elevation or lighting."""
+        lighting = dict(lighting_config or {})
+        if (self._terrain is None
+                or self._terrain_lighting != lighting
+                or self._terrain.elevation.shape != elevation.shape
+                or not np.array_equal(self._terrain.elevation, elevation)):
+            self._terrain = CachedTerrainRenderer(
+                elevation, resolution=self.resolution, **lighting
+            )
+            self._terrain_lighting = lighting
+        
+        return self._terrain
 
 
 class OverlayRenderer:
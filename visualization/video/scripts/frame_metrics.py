@@ -0,0 +1,128 @@
+"""
+Per-frame fire metrics computed on state grids.
+Definitions follow the simulator's MetricsCollector (the columns of
+simulation_results.csv) and OrderParameters.burntFraction, so overlays
+report the same numbers as the simulation output. burntFraction leaves out
+water cells, so it is only matched when the vegetation grid is given.
+"""
+from typing import Dict, Optional
+import numpy as np
+from scipy import ndimage
+
+from .grid_arrays import STATE_NUMERIC_MAP, VEGETATION_NUMERIC_MAP
+
+EMPTY = STATE_NUMERIC_MAP['Empty']
+TREE = STATE_NUMERIC_MAP['Tree']
+BURNING = STATE_NUMERIC_MAP['Burning']
+BURNT = STATE_NUMERIC_MAP['Burnt']
+WATER = VEGETATION_NUMERIC_MAP['Water']
+
+# Fire clusters connect through all eight neighbours, as in MetricsCollector
+CLUSTER_STRUCTURE = np.ones((3, 3), dtype=bool)
+
+
+def fire_clusters(states: np.ndarray):
+    """
+    Label the connected clusters of burning cells.
+
+    Returns:
+        (labels, number of clusters) as from scipy.ndimage.label
+    """
+    return ndimage.label(states == BURNING, structure=CLUSTER_STRUCTURE)
+
+
+def percolation_indicator(labels: np.ndarray, largest_cluster: int) -> float:
+    """
+    Percolation indicator in [0, 1].
+
+    1 when a burning cluster connects the left and right edges, otherwise
+    a sigmoid of the largest cluster's share of the grid.
+    """
+    left = np.unique(labels[:, 0])
+    right = np.unique(labels[:, -1])
+    if np.intersect1d(left[left > 0], right[right > 0]).size:
+        return 1.0
+
+    cluster_ratio = largest_cluster / labels.size
+    return float(1.0 / (1.0 + np.exp(-10.0 * (cluster_ratio - 0.1))))
+
+
+def compute_frame_metrics(states: np.ndarray,
+                          vegetation: Optional[np.ndarray] = None) -> Dict:
+    """
+    Compute the fire metrics of one state grid.
+
+    Args:
+        states: (height, width) uint8 state codes
+        vegetation: (height, width) uint8 vegetation codes; without them
+            no cell is treated as water
+
+    Returns:
+        Dict with state_counts, active_fires, burnt_area, burnt_fraction
+        (burnt share of the burnable cells: non-empty and not water),
+        largest_cluster, tree_density, percolation and fire_centroid
+        ((x, y) mean of the burning cells, or None without fire)
+    """
+    counts = np.bincount(states.ravel(), minlength=len(STATE_NUMERIC_MAP))
+    total_cells = states.size
+
+    if vegetation is None:
+        burnable_cells = total_cells - counts[EMPTY]
+        burnable_burnt = counts[BURNT]
+    else:
+        burnable = (states != EMPTY) & (vegetation != WATER)
+        burnable_cells = int(np.count_nonzero(burnable))
+        burnable_burnt = int(np.count_nonzero(burnable & (states == BURNT)))
+
+    labels, n_clusters = fire_clusters(states)
+    largest_cluster = int(np.bincount(labels.ravel())[1:].max()) if n_clusters else 0
+
+    fire_centroid = None
+    if counts[BURNING]:
+        burning_y, burning_x = np.nonzero(labels)
+        fire_centroid = (float(burning_x.mean()), float(burning_y.mean()))
+
+    return {
+        'state_counts': {name: int(counts[code]) for name, code in STATE_NUMERIC_MAP.items()},
+        'active_fires': int(counts[BURNING]),
+        'burnt_area': int(counts[BURNT]),
+        'burnt_fraction': burnable_burnt / burnable_cells if burnable_cells > 0 else 0.0,
+        'largest_cluster': largest_cluster,
+        'tree_density': counts[TREE] / total_cells if total_cells > 0 else 0.0,
+        'percolation': percolation_indicator(labels, largest_cluster),
+        'fire_centroid': fire_centroid
+    }
+
+
+class FrameMetrics:
+    """Frame metrics memoized per snapshot, shared by frames showing it."""
+
+    def __init__(self):
+        self._metrics = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, snapshot_id: str, states: np.ndarray,
+            vegetation: Optional[np.ndarray] = None) -> Dict:
+        """
+        Metrics of a snapshot, computed on first request.
+
+        Args:
+            snapshot_id: Content digest identifying the snapshot
+            states: (height, width) uint8 state codes of the snapshot
+            vegetation: (height, width) uint8 vegetation codes, if known
+
+        Returns:
+            Metrics dict from compute_frame_metrics (shared; do not modify)
+        """
+        metrics = self._metrics.get(snapshot_id)
+        if metrics is None:
+            self.misses += 1
+            metrics = compute_frame_metrics(states, vegetation)
+            self._metrics[snapshot_id] = metrics
+        else:
+            self.hits += 1
+        return metrics
+
+    def clear(self):
+        self._metrics.clear()
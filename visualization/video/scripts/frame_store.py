@@ -0,0 +1,296 @@
+"""
+Binary frame container for exported video frames.
+
+Layout: an 8-byte magic, 64-byte aligned raw array blocks, a JSON index,
+and a trailer holding the index offset. Static layers (elevation) are
+stored once, cell states as one uint8 grid per frame (identical grids are
+shared), and other layers as keyframes plus sparse deltas of the cells that
+changed: float16 for continuous layers, uint8 codes for categorical ones
+(vegetation). The reader memory-maps the file for random access.
+"""
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+from .frame_cache import frame_key, snapshot_digest
+from .grid_arrays import arrays_to_dataframe
+
+MAGIC = b'FFSTORE1'
+TRAILER = struct.Struct('<Q8s')  # index offset, magic
+ALIGNMENT = 64
+FORMAT_VERSION = 1
+
+
+def _stored_values(layer: np.ndarray) -> np.ndarray:
+    """Layer as stored: uint8 codes unchanged, continuous values as float16."""
+    return layer if layer.dtype == np.uint8 else layer.astype(np.float16)
+
+
+def _decoded_values(block: np.ndarray) -> np.ndarray:
+    """Copy of a stored layer: float32 for continuous values, codes unchanged."""
+    return block.astype(np.float32) if block.dtype.kind == 'f' else np.array(block)
+
+
+class FrameStoreWriter:
+    """
+    Write frames into a binary frame container.
+
+    The container is written under a temporary name and only moved into
+    place by close(); a writer leaving a with block on an error discards it.
+    """
+
+    def __init__(self,
+                 path: str,
+                 static_layers: Optional[Dict[str, np.ndarray]] = None,
+                 metadata: Optional[Dict] = None,
+                 keyframe_interval: int = 30,
+                 max_delta_fraction: float = 0.25):
+        """
+        Args:
+            path: Output container path
+            static_layers: Layers identical in every frame, stored once
+            metadata: Extra JSON-serialisable metadata for the index
+            keyframe_interval: Frames between full continuous-layer keyframes
+            max_delta_fraction: Write a keyframe instead of a delta when more
+                than this fraction of cells changed
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.keyframe_interval = keyframe_interval
+        self.max_delta_fraction = max_delta_fraction
+        self.metadata = metadata or {}
+
+        self._partial_path = self.path.with_name(self.path.name + '.partial')
+        self._file = open(self._partial_path, 'wb')
+        self._file.write(MAGIC)
+        self._offset = len(MAGIC)
+
+        self.shape = None
+        self.frames = []
+        self.static = {}
+        self._last_state = None
+        self._keyframes = {}
+
+        try:
+            for name, layer in (static_layers or {}).items():
+                self._check_shape(layer)
+                self.static[name] = self._write_block(layer)
+        except Exception:
+            self.abort()
+            raise
+
+    def _check_shape(self, grid: np.ndarray):
+        if self.shape is None:
+            self.shape = tuple(grid.shape)
+        elif tuple(grid.shape) != self.shape:
+            raise ValueError(f"Grid shape {grid.shape} != {self.shape}")
+
+    def _write_block(self, array: np.ndarray) -> Dict:
+        """Append an aligned array block and describe it for the index."""
+        padding = -self._offset % ALIGNMENT
+        self._file.write(b'\0' * padding)
+        self._offset += padding
+
+        array = np.ascontiguousarray(array)
+        block = {'offset': self._offset, 'dtype': array.dtype.str,
+                 'shape': list(array.shape)}
+        self._file.write(array.data)
+        self._offset += array.nbytes
+        return block
+
+    def _encode_layer(self, name: str, layer: np.ndarray, frame_index: int) -> Dict:
+        """Store a layer as a keyframe or a sparse delta."""
+        values = _stored_values(layer)
+        keyframe = self._keyframes.get(name)
+
+        if keyframe is not None and frame_index - keyframe['frame'] < self.keyframe_interval:
+            changed = np.flatnonzero(values != keyframe['values'])
+            if changed.size <= self.max_delta_fraction * values.size:
+                entry = {'keyframe': keyframe['frame']}
+                if changed.size:
+                    entry['indices'] = self._write_block(changed.astype(np.uint32))
+                    entry['values'] = self._write_block(values.ravel()[changed])
+                return entry
+
+        block = self._write_block(values)
+        self._keyframes[name] = {'frame': frame_index, 'values': values}
+        return {'block': block}
+
+    def add_frame(self,
+                  state: np.ndarray,
+                  layers: Optional[Dict[str, np.ndarray]] = None,
+                  info: Optional[Dict] = None) -> int:
+        """
+        Append one frame.
+
+        Args:
+            state: (height, width) uint8 state codes
+            layers: (height, width) layers such as moisture, float or
+                uint8 category codes
+            info: JSON-serialisable frame information (times, ...)
+
+        Returns:
+            Index of the frame
+        """
+        layers = layers or {}
+        frame_index = len(self.frames)
+        self._check_shape(state)
+
+        # Frames often repeat the previous state grid; share its block
+        state = np.asarray(state, dtype=np.uint8)
+        if self._last_state is not None and np.array_equal(state, self._last_state[0]):
+            state_block = self._last_state[1]
+        else:
+            state_block = self._write_block(state)
+            self._last_state = (state, state_block)
+
+        entry = {'info': info or {}, 'state': state_block, 'layers': {}}
+        digests = [snapshot_digest(state)]
+        for name in sorted(layers):
+            self._check_shape(layers[name])
+            entry['layers'][name] = self._encode_layer(name, layers[name], frame_index)
+            digests.append(snapshot_digest(_stored_values(layers[name])))
+
+        # Content digest lets renderers deduplicate frames without decoding
+        entry['digest'] = frame_key(*digests)
+        self.frames.append(entry)
+        return frame_index
+
+    def close(self):
+        """Write the index and trailer and move the container into place."""
+        if self._file is None:
+            return
+
+        index = {
+            'version': FORMAT_VERSION,
+            'shape': list(self.shape) if self.shape else None,
+            'metadata': self.metadata,
+            'static': self.static,
+            'frames': self.frames
+        }
+        index_offset = self._offset
+        self._file.write(json.dumps(index).encode('utf-8'))
+        self._file.write(TRAILER.pack(index_offset, MAGIC))
+        self._file.close()
+        self._file = None
+        os.replace(self._partial_path, self.path)
+
+    def abort(self):
+        """Discard the partly written container."""
+        if self._file is None:
+            return
+
+        self._file.close()
+        self._file = None
+        self._partial_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class FrameStore:
+    """Random-access reader for frame containers."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._data = np.memmap(self.path, dtype=np.uint8, mode='r')
+
+        if bytes(self._data[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{self.path} is not a frame container")
+
+        index_offset, magic = TRAILER.unpack(bytes(self._data[-TRAILER.size:]))
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is truncated or corrupt")
+
+        index = json.loads(bytes(self._data[index_offset:-TRAILER.size]).decode('utf-8'))
+        if index['version'] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported frame container version {index['version']}")
+
+        self.shape = tuple(index['shape']) if index['shape'] else None
+        self.metadata = index['metadata']
+        self.frames = index['frames']
+        self._static = index['static']
+        self._static_cache = {}
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def _block(self, block: Dict) -> np.ndarray:
+        """Read-only view of an array block."""
+        dtype = np.dtype(block['dtype'])
+        count = int(np.prod(block['shape']))
+        start = block['offset']
+        return self._data[start:start + count * dtype.itemsize].view(dtype).reshape(block['shape'])
+
+    @property
+    def static_layers(self) -> List[str]:
+        return list(self._static)
+
+    def static(self, name: str) -> np.ndarray:
+        """Static layer (float32 or uint8 codes), decoded once and shared."""
+        if name not in self._static_cache:
+            layer = _decoded_values(self._block(self._static[name]))
+            layer.flags.writeable = False
+            self._static_cache[name] = layer
+        return self._static_cache[name]
+
+    def frame_info(self, n: int) -> Dict:
+        """Information stored with frame n (times, ...)."""
+        return self.frames[n]['info']
+
+    def frame_digest(self, n: int) -> str:
+        """Content digest of frame n."""
+        return self.frames[n]['digest']
+
+    def read_state(self, n: int) -> np.ndarray:
+        """uint8 state grid of frame n (read-only view into the file)."""
+        return self._block(self.frames[n]['state'])
+
+    def read_layer(self, n: int, name: str) -> np.ndarray:
+        """Layer of frame n as a float32 grid, or uint8 codes for categorical layers."""
+        entry = self.frames[n]['layers'][name]
+        if 'block' in entry:
+            return _decoded_values(self._block(entry['block']))
+
+        layer = self._block(self.frames[entry['keyframe']]['layers'][name]['block'])
+        layer = _decoded_values(layer)
+        if 'indices' in entry:
+            layer.ravel()[self._block(entry['indices'])] = self._block(entry['values'])
+        return layer
+
+    def read_frame(self, n: int) -> Dict[str, np.ndarray]:
+        """
+        Decode frame n.
+
+        Returns:
+            Dict with 'state', the frame's continuous layers and the shared
+            static layers
+        """
+        if not -len(self) <= n < len(self):
+            raise IndexError(f"Frame {n} out of range ({len(self)} frames)")
+
+        arrays = {'state': self.read_state(n)}
+        for name in self.frames[n]['layers']:
+            arrays[name] = self.read_layer(n, name)
+        for name in self._static:
+            arrays[name] = self.static(name)
+
+        return arrays
+
+    def read_dataframe(self, n: int) -> pd.DataFrame:
+        """Decode frame n as a snapshot DataFrame indexed by (x, y)."""
+        return arrays_to_dataframe(self.read_frame(n))
+
+    def close(self):
+        """Release the memory map."""
+        self._data = None
@@ -0,0 +1,115 @@
+"""
+Conversion between grid snapshot DataFrames and dense (height, width) arrays.
+Cell (x, y) maps to array element [y, x]; states and vegetation types are
+stored as uint8 codes.
+"""
+import warnings
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import sys
+sys.path.append(str(Path(__file__).parent.parent.parent / 'python'))
+from utils.color_schemes import STATE_NUMERIC_MAP, VEGETATION_NUMERIC_MAP
+
+# State and vegetation names indexed by their numeric code
+STATE_NAMES = np.array(sorted(STATE_NUMERIC_MAP, key=STATE_NUMERIC_MAP.get))
+VEGETATION_NAMES = np.array(sorted(VEGETATION_NUMERIC_MAP, key=VEGETATION_NUMERIC_MAP.get))
+
+# Text columns stored as uint8 code grids: column -> (name -> code, names by code)
+CATEGORICAL_COLUMNS = {
+    'state': (STATE_NUMERIC_MAP, STATE_NAMES),
+    'vegetation': (VEGETATION_NUMERIC_MAP, VEGETATION_NAMES)
+}
+
+
+def grid_shape(snapshot: pd.DataFrame) -> Tuple[int, int]:
+    """
+    Grid dimensions of a snapshot indexed by (x, y).
+
+    Returns:
+        (height, width)
+    """
+    x = snapshot.index.get_level_values('x')
+    y = snapshot.index.get_level_values('y')
+    return int(y.max()) + 1, int(x.max()) + 1
+
+
+def encode_categories(values, codes: Dict[str, int]) -> np.ndarray:
+    """Map category names to uint8 codes (unknown names become code 0)."""
+    values = pd.Series(np.asarray(values, dtype=object))
+    return values.map(codes).fillna(0).to_numpy(dtype=np.uint8)
+
+
+def encode_states(states) -> np.ndarray:
+    """Map state names to uint8 codes (unknown states become Empty)."""
+    return encode_categories(states, STATE_NUMERIC_MAP)
+
+
+def snapshot_to_arrays(snapshot: pd.DataFrame,
+                       shape: Optional[Tuple[int, int]] = None) -> Dict[str, np.ndarray]:
+    """
+    Convert a snapshot DataFrame into dense grid arrays.
+
+    Args:
+        snapshot: Grid snapshot with (x, y) MultiIndex
+        shape: (height, width); inferred from the index if None
+
+    Returns:
+        Dict with a uint8 code grid per categorical column ('state',
+        'vegetation') and a float32 grid per numeric column; other
+        columns are skipped with a warning
+    """
+    height, width = shape or grid_shape(snapshot)
+    x = snapshot.index.get_level_values('x').to_numpy(dtype=np.intp)
+    y = snapshot.index.get_level_values('y').to_numpy(dtype=np.intp)
+
+    arrays = {}
+    for column in CATEGORICAL_COLUMNS:
+        if column in snapshot.columns:
+            codes = np.zeros((height, width), dtype=np.uint8)
+            codes[y, x] = encode_categories(snapshot[column], CATEGORICAL_COLUMNS[column][0])
+            arrays[column] = codes
+
+    skipped = []
+    for column in snapshot.columns:
+        if column in CATEGORICAL_COLUMNS:
+            continue
+        if not pd.api.types.is_numeric_dtype(snapshot[column]):
+            skipped.append(str(column))
+            continue
+        layer = np.zeros((height, width), dtype=np.float32)
+        layer[y, x] = snapshot[column].to_numpy(dtype=np.float32)
+        arrays[column] = layer
+
+    if skipped:
+        warnings.warn(f"Skipping non-numeric snapshot columns: {', '.join(skipped)}")
+
+    return arrays
+
+
+def arrays_to_dataframe(arrays: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """
+    Convert dense grid arrays back into a snapshot DataFrame.
+
+    Args:
+        arrays: Dict with a 'state' code grid and optional categorical code
+            and float grids
+
+    Returns:
+        DataFrame indexed by (x, y) with state and vegetation names and
+        numeric columns
+    """
+    height, width = next(iter(arrays.values())).shape
+    x, y = np.meshgrid(np.arange(width), np.arange(height), indexing='ij')
+    index = pd.MultiIndex.from_arrays([x.ravel(), y.ravel()], names=['x', 'y'])
+
+    # Transposed views give x-major row order, matching the CSV snapshots
+    columns = {}
+    for name, layer in arrays.items():
+        values = layer.T.ravel()
+        columns[name] = (CATEGORICAL_COLUMNS[name][1][values]
+                         if name in CATEGORICAL_COLUMNS else values)
+
+    return pd.DataFrame(columns, index=index)
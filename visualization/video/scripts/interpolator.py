@@ -3,16 +3,131 @@ Frame interpolation for smooth animations.
 """
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Tuple
+from typing import Dict, Iterator, List, Sequence, Tuple
 from scipy.interpolate import interp1d
-from scipy.ndimage import gaussian_filter
+from scipy.ndimage import distance_transform_edt
+
+from .frame_store import FrameStore
+from .grid_arrays import CATEGORICAL_COLUMNS, STATE_NUMERIC_MAP, grid_shape, snapshot_to_arrays
+
+TREE = STATE_NUMERIC_MAP['Tree']
+BURNING = STATE_NUMERIC_MAP['Burning']
+BURNT = STATE_NUMERIC_MAP['Burnt']
+
+# Transition times stay below 1 so every change is complete at alpha = 1
+IGNITION_WINDOW = 0.999
+
+
+class FireStateInterpolator:
+    """
+    Deterministic state interpolation between two snapshots.
+    
+    Every changing cell gets transition times in [0, 1) once per snapshot
+    pair; the state of a frame is then a threshold comparison of those
+    times against the frame's alpha.
+    """
+    
+    def __init__(self, seed: int = 0, front_jitter: float = 0.15):
+        """
+        Args:
+            seed: Seed for the per-cell timing noise
+            front_jitter: Share of the ignition time drawn at random, giving
+                the fire front an organic edge
+        """
+        self.seed = seed
+        self.front_jitter = front_jitter
+    
+    def schedule(self,
+                 states_before: np.ndarray,
+                 states_after: np.ndarray,
+                 pair_index: int = 0) -> Dict[str, np.ndarray]:
+        """
+        Derive per-cell transition times for one snapshot pair.
+        
+        Trees igniting are ordered by distance to the burning front of the
+        first snapshot; burning cells burn out with P(burnt by alpha) = alpha².
+        Trees that are already burnt in the second snapshot burn in between.
+        
+        Args:
+            states_before: uint8 state grid of the first snapshot
+            states_after: uint8 state grid of the second snapshot
+            pair_index: Index of the pair, so each pair gets its own noise
+            
+        Returns:
+            Schedule accepted by states_at
+        """
+        rng = np.random.default_rng([self.seed, pair_index])
+        shape = states_before.shape
+        
+        changed = states_before != states_after
+        igniting = (states_before == TREE) & ((states_after == BURNING) | (states_after == BURNT))
+        burning_out = (states_before == BURNING) & (states_after == BURNT)
+        
+        # Cells that never change keep an unreachable transition time
+        first_time = np.full(shape, np.inf, dtype=np.float32)
+        second_time = np.full(shape, np.inf, dtype=np.float32)
+        
+        # Ignition follows the distance to the current fire front
+        if igniting.any():
+            burning_before = states_before == BURNING
+            if burning_before.any():
+                distance = distance_transform_edt(~burning_before)[igniting]
+                span = distance.max() - distance.min()
+                front = (distance - distance.min()) / span if span > 0 else np.zeros_like(distance)
+            else:
+                front = rng.random(igniting.sum())
+            
+            jitter = rng.random(igniting.sum())
+            ignite_time = (1 - self.front_jitter) * front + self.front_jitter * jitter
+            first_time[igniting] = ignite_time * IGNITION_WINDOW
+        
+        # Burning out: P(alpha > sqrt(U)) = alpha², the slower burn-out curve
+        burnout_draw = np.sqrt(rng.random(shape)).astype(np.float32) * IGNITION_WINDOW
+        first_time[burning_out] = burnout_draw[burning_out]
+        
+        # Trees burnt by the second snapshot burn out after igniting
+        skipped = igniting & (states_after == BURNT)
+        second_time[skipped] = (first_time[skipped]
+                                + (IGNITION_WINDOW - first_time[skipped]) * burnout_draw[skipped])
+        
+        # Any other change switches at a random time
+        other = changed & ~igniting & ~burning_out
+        first_time[other] = rng.random(other.sum()) * IGNITION_WINDOW
+        
+        single_step = np.isinf(second_time) & changed
+        second_time[single_step] = first_time[single_step]
+        
+        middle_state = np.where(skipped, BURNING, states_after).astype(np.uint8)
+        
+        return {
+            'before': states_before,
+            'middle': middle_state,
+            'after': states_after,
+            'first_time': first_time,
+            'second_time': second_time
+        }
+    
+    def states_at(self, schedule: Dict[str, np.ndarray], alpha: float) -> np.ndarray:
+        """
+        State grid at interpolation factor alpha.
+        
+        Args:
+            schedule: Result of schedule() for the snapshot pair
+            alpha: Position between the snapshots (0-1)
+            
+        Returns:
+            uint8 state grid
+        """
+        states = np.where(alpha > schedule['first_time'], schedule['middle'], schedule['before'])
+        return np.where(alpha > schedule['second_time'], schedule['after'], states).astype(np.uint8)
 
 
 class FrameInterpolator:
     """Interpolate between snapshots for smooth animation."""
     
-    def __init__(self, smoothing_factor: float = 0.5):
+    def __init__(self, smoothing_factor: float = 0.5, seed: int = 0):
         self.smoothing_factor = smoothing_factor
+        self.state_interpolator = FireStateInterpolator(seed=seed)
     
     def interpolate_frames(self,
                           snapshots: List[pd.DataFrame],
@@ -22,6 +137,9 @@ class FrameInterpolator:
         """
         Interpolate between snapshots for smooth animation.
         
+        Materialises every frame as a DataFrame; prefer iter_frames for
+        long or high-resolution runs.
+        
         Args:
             snapshots: List of grid snapshots
             timestamps: Simulation times for each snapshot
@@ -31,161 +149,120 @@ class FrameInterpolator:
         Returns:
             List of interpolated frames
         """
-        total_frames = int(duration * target_fps)
+        first_snapshot = snapshots[0]
+        x = first_snapshot.index.get_level_values('x').to_numpy()
+        y = first_snapshot.index.get_level_values('y').to_numpy()
+        state_names = {code: name for name, code in STATE_NUMERIC_MAP.items()}
+        
+        # Every layer is interpolated, since each frame holds its own copy anyway
         interpolated_frames = []
+        for frame in self.iter_frames(snapshots, timestamps, target_fps, duration,
+                                      static_layers=()):
+            # Rows keep the order of the first snapshot
+            frame_data = first_snapshot.copy()
+            for var, layer in {**frame['static'], **frame['layers']}.items():
+                values = layer[y, x]
+                frame_data[var] = (CATEGORICAL_COLUMNS[var][1][values]
+                                   if var in CATEGORICAL_COLUMNS else values)
+            frame_data['state'] = pd.Series(frame['state'][y, x],
+                                            index=frame_data.index).map(state_names)
+            
+            interpolated_frames.append(frame_data)
         
-        # Create interpolation functions for continuous variables
-        continuous_vars = ['moisture', 'temperature', 'elevation']
-        interpolators = {}
+        return interpolated_frames
+    
+    def iter_frames(self,
+                    snapshots: Sequence,
+                    timestamps: List[float],
+                    target_fps: int = 60,
+                    duration: float = 15.0,
+                    static_layers: Tuple[str, ...] = ('elevation',)) -> Iterator[Dict]:
+        """
+        Lazily interpolate frames, keeping only two snapshots decoded.
         
-        # Get grid dimensions
-        first_snapshot = snapshots[0]
-        width = first_snapshot.index.get_level_values('x').max() + 1
-        height = first_snapshot.index.get_level_values('y').max() + 1
-        
-        # Prepare data for interpolation
-        for var in continuous_vars:
-            if var in first_snapshot.columns:
-                # Create time series for each cell
-                var_data = np.array([
-                    snapshot[var].values for snapshot in snapshots
-                ])
-                
-                # Create interpolator
-                interpolators[var] = interp1d(
-                    timestamps, var_data, axis=0, 
-                    kind='linear', fill_value='extrapolate'
-                )
+        Args:
+            snapshots: Sequence of grid snapshot DataFrames, or a FrameStore
+            timestamps: Simulation times for each snapshot (ascending)
+            target_fps: Target frames per second
+            duration: Video duration in seconds
+            static_layers: Layers that do not change during a run (terrain),
+                taken once from the first snapshot and shared by every frame
+            
+        Yields:
+            Frame dicts with 'frame_index', 'video_time', 'simulation_time',
+            a uint8 'state' grid, 'layers' (float32, or uint8 category codes)
+            and the shared 'static' layers
+        """
+        total_frames = int(duration * target_fps)
+        n_snapshots = len(timestamps)
+        
+        shape = None if isinstance(snapshots, FrameStore) else grid_shape(snapshots[0])
+        decoded = {}
+        
+        def decode(i: int) -> Dict[str, np.ndarray]:
+            if i not in decoded:
+                if isinstance(snapshots, FrameStore):
+                    decoded[i] = snapshots.read_frame(i)
+                else:
+                    decoded[i] = snapshot_to_arrays(snapshots[i], shape)
+            return decoded[i]
+        
+        first = decode(0)
+        static = {}
+        for name in static_layers:
+            if name in first:
+                static[name] = np.array(first[name], dtype=np.float32)
+                static[name].flags.writeable = False
+        layer_names = [name for name in first if name != 'state' and name not in static]
         
-        # Generate interpolated frames
+        idx_before = 0
+        schedule_pair = None
+        schedule = None
         for frame_idx in range(total_frames):
             # Calculate simulation time for this frame
             video_time = frame_idx / target_fps
-            sim_time = np.interp(
+            sim_time = float(np.interp(
                 video_time,
                 [0, duration],
                 [timestamps[0], timestamps[-1]]
-            )
+            ))
             
-            # Create new frame
-            frame_data = first_snapshot.copy()
+            # Advance to the first bracket [t_i, t_i+1] containing the time
+            while idx_before < n_snapshots - 2 and sim_time > timestamps[idx_before + 1]:
+                idx_before += 1
+            idx_after = min(idx_before + 1, n_snapshots - 1)
             
-            # Interpolate continuous variables
-            for var, interp_func in interpolators.items():
-                frame_data[var] = interp_func(sim_time)
+            # Drop snapshots that no longer bracket the frame
+            for i in [i for i in decoded if i not in (idx_before, idx_after)]:
+                del decoded[i]
             
-            # Handle discrete states (fire spread)
-            frame_data['state'] = self._interpolate_fire_states(
-                snapshots, timestamps, sim_time, width, height
-            )
+            before, after = decode(idx_before), decode(idx_after)
             
-            interpolated_frames.append(frame_data)
-        
-        return interpolated_frames
-    
-    def _interpolate_fire_states(self,
-                                snapshots: List[pd.DataFrame],
-                                timestamps: List[float],
-                                target_time: float,
-                                width: int,
-                                height: int) -> pd.Series:
-        """
-        Interpolate discrete fire states with realistic transitions.
-        """
-        # Find surrounding snapshots
-        idx_before = 0
-        idx_after = len(timestamps) - 1
-        
-        for i in range(len(timestamps) - 1):
-            if timestamps[i] <= target_time <= timestamps[i + 1]:
-                idx_before = i
-                idx_after = i + 1
-                break
-        
-        # If same index, return that state
-        if idx_before == idx_after:
-            return snapshots[idx_before]['state'].copy()
-        
-        # Get states
-        states_before = snapshots[idx_before]['state']
-        states_after = snapshots[idx_after]['state']
-        
-        # Calculate interpolation factor
-        t1, t2 = timestamps[idx_before], timestamps[idx_after]
-        alpha = (target_time - t1) / (t2 - t1) if t2 != t1 else 0
-        
-        # Create transition probability map
-        result_states = states_before.copy()
-        
-        # Find cells that transition
-        tree_to_burning = (states_before == 'Tree') & (states_after == 'Burning')
-        burning_to_burnt = (states_before == 'Burning') & (states_after == 'Burnt')
-        
-        # Apply transitions based on alpha with some randomness
-        # This creates organic-looking fire spread
-        if alpha > 0:
-            # Trees catching fire
-            transition_prob = self._create_fire_front_probability(
-                states_before, states_after, width, height, alpha
-            )
+            t1, t2 = timestamps[idx_before], timestamps[idx_after]
+            alpha = (sim_time - t1) / (t2 - t1) if t2 != t1 else 0.0
             
-            tree_mask = tree_to_burning & (transition_prob > np.random.random(len(states_before)))
-            result_states[tree_mask] = 'Burning'
+            # Transition times are derived once per snapshot pair
+            if schedule_pair != (idx_before, idx_after):
+                schedule_pair = (idx_before, idx_after)
+                schedule = self.state_interpolator.schedule(
+                    before['state'], after['state'], idx_before
+                )
             
-            # Burning to burnt transition
-            burnt_transition = alpha ** 2  # Slower transition for burning out
-            burnt_mask = burning_to_burnt & (np.random.random(len(states_before)) < burnt_transition)
-            result_states[burnt_mask] = 'Burnt'
-        
-        return result_states
-    
-    def _create_fire_front_probability(self,
-                                      states_before: pd.Series,
-                                      states_after: pd.Series,
-                                      width: int,
-                                      height: int,
-                                      alpha: float) -> np.ndarray:
-        """
-        Create probability map for fire front progression.
-        """
-        # Convert states to grid
-        grid_before = self._states_to_grid(states_before, width, height)
-        grid_after = self._states_to_grid(states_after, width, height)
-        
-        # Find fire front (cells adjacent to burning cells)
-        burning_before = (grid_before == 2).astype(float)
-        
-        # Apply Gaussian filter to create smooth fire front
-        fire_influence = gaussian_filter(burning_before, sigma=1.5)
-        
-        # Create probability based on distance from fire and alpha
-        probability = fire_influence * alpha * 2  # Scale factor for visible progression
-        
-        # Add some noise for organic look
-        noise = np.random.normal(0, 0.1, probability.shape)
-        probability += noise * alpha
-        
-        # Clip to valid range
-        probability = np.clip(probability, 0, 1)
-        
-        return probability.flatten()
-    
-    def _states_to_grid(self, states: pd.Series, width: int, height: int) -> np.ndarray:
-        """Convert state series to 2D grid."""
-        state_map = {'Empty': 0, 'Tree': 1, 'Burning': 2, 'Burnt': 3}
-        
-        grid = np.zeros((height, width), dtype=int)
-        for idx, state in states.items():
-            if isinstance(idx, tuple):
-                x, y = idx
-            else:
-                # Assume sequential ordering
-                y = idx // width
-                x = idx % width
+            # Interpolate continuous variables; category codes switch halfway
+            layers = {var: ((after[var] if alpha > 0.5 else before[var])
+                            if before[var].dtype == np.uint8
+                            else ((1 - alpha) * before[var] + alpha * after[var]).astype(np.float32))
+                      for var in layer_names}
             
-            grid[y, x] = state_map.get(state, 0)
-        
-        return grid
+            yield {
+                'frame_index': frame_idx,
+                'video_time': video_time,
+                'simulation_time': sim_time,
+                # Handle discrete states (fire spread)
+                'state': self.state_interpolator.states_at(schedule, alpha),
+                'layers': layers,
+                'static': static
+            }
     
     def smooth_trajectory(self,
                          positions: List[Tuple[float, float, float]],
@@ -202,22 +279,11 @@ class FrameInterpolator:
         Returns:
             Smoothed positions
         """
-        positions_array = np.array(positions)
-        
-        # Create interpolators for each dimension
-        x_interp = interp1d(timestamps, positions_array[:, 0], 
-                           kind='cubic', fill_value='extrapolate')
-        y_interp = interp1d(timestamps, positions_array[:, 1],
-                           kind='cubic', fill_value='extrapolate')
-        z_interp = interp1d(timestamps, positions_array[:, 2],
-                           kind='cubic', fill_value='extrapolate')
-        
-        # Interpolate positions
-        smooth_positions = []
-        for t in target_times:
-            x = float(x_interp(t))
-            y = float(y_interp(t))
-            z = float(z_interp(t))
-            smooth_positions.append((x, y, z))
-        
-        return smooth_positions
\ No newline at end of file
+        positions_array = np.array(positions, dtype=float)
+        
+        # One spline over all three dimensions, evaluated at all times at once
+        interpolator = interp1d(timestamps, positions_array, axis=0,
+                                kind='cubic', fill_value='extrapolate')
+        smooth_positions = interpolator(np.asarray(target_times, dtype=float))
+        
+        return [tuple(position) for position in smooth_positions.tolist()]
\ No newline at end of file
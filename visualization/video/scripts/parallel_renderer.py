@@ -0,0 +1,202 @@
+"""
+Parallel segment rendering with ordered reassembly.
+Each distinct frame is rendered once by a process pool and released in
+order through a bounded reorder buffer, together with the number of frames
+it is held for, ready to be fed to a streaming encoder.
+"""
+import multiprocessing as mp
+import queue
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+from .segment_composer import VideoSegmentComposer
+from .video_assembler import VideoAssembler, VideoConfig
+
+# Per-worker state, created once by the pool initializer
+_composer = None
+_segment_specs = []
+_prepared_segments = {}
+
+
+def _init_worker(composer_kwargs: Dict, segment_specs: List[Tuple]):
+    """Build one warm composer per worker process."""
+    global _composer, _segment_specs, _prepared_segments
+    _composer = VideoSegmentComposer(**composer_kwargs)
+    _segment_specs = segment_specs
+    _prepared_segments = {}
+
+
+def _render_frame(segment_index: int, frame_index: int) -> np.ndarray:
+    """Render one frame, preparing its segment on first use in this worker."""
+    if segment_index not in _prepared_segments:
+        kind, data, params = _segment_specs[segment_index]
+        _prepared_segments[segment_index] = _composer.prepare_segment(
+            kind, *data, **params
+        )
+
+    return _composer.render_segment_frame(
+        _prepared_segments[segment_index], frame_index
+    )
+
+
+class ReorderBuffer:
+    """Hold out-of-order results and release them in sequence."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.released = 0
+        self._pending = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def push(self, index: int, item):
+        """
+        Store a result.
+
+        Args:
+            index: Sequence number of the result
+            item: Result payload
+        """
+        if index < self.released or index in self._pending:
+            raise ValueError(f"Duplicate result for index {index}")
+        if len(self._pending) >= self.capacity:
+            raise OverflowError(f"Reorder buffer full ({self.capacity} items)")
+
+        self._pending[index] = item
+
+    def pop_ready(self) -> List:
+        """Remove and return all results that continue the sequence."""
+        ready = []
+        while self.released in self._pending:
+            ready.append(self._pending.pop(self.released))
+            self.released += 1
+
+        return ready
+
+
+class ParallelSegmentRenderer:
+    """Render video segments on a worker pool, emitting frames in order."""
+
+    def __init__(self,
+                 workers: Optional[int] = None,
+                 max_pending: Optional[int] = None,
+                 composer_kwargs: Optional[Dict] = None):
+        """
+        Args:
+            workers: Number of worker processes (default: CPU count)
+            max_pending: Maximum frames in flight or waiting for reordering
+                (default: twice the number of workers)
+            composer_kwargs: Keyword arguments for each worker's composer
+        """
+        self.workers = workers or mp.cpu_count()
+        self.max_pending = max_pending or 2 * self.workers
+        self.composer_kwargs = composer_kwargs or {}
+        self.segment_specs = []
+        self.segment_lengths = []
+        self._runs = None
+
+    def add_segment(self, kind: str, *data, **params) -> int:
+        """
+        Queue a segment for rendering.
+
+        Args:
+            kind: Segment kind ('opening', 'middle' or 'finale')
+            *data: Simulation data for the segment
+            **params: Duration, start time and fps of the segment
+
+        Returns:
+            Number of frames in the segment
+        """
+        n_frames = VideoSegmentComposer.segment_frame_count(**params)
+        self.segment_specs.append((kind, data, params))
+        self.segment_lengths.append(n_frames)
+        self._runs = None
+        return n_frames
+
+    @property
+    def total_frames(self) -> int:
+        return sum(self.segment_lengths)
+
+    def _tasks(self) -> List[Tuple[int, int, int]]:
+        """
+        List (segment, first frame, hold count) runs in output order.
+
+        Frame keys are computed up front so consecutive identical frames
+        are dispatched as a single task.
+        """
+        if self._runs is None:
+            composer = VideoSegmentComposer(**self.composer_kwargs)
+            self._runs = []
+            for segment_index, (kind, data, params) in enumerate(self.segment_specs):
+                segment = composer.prepare_segment(kind, *data, **params)
+                self._runs.extend(
+                    (segment_index, first_frame, n_frames)
+                    for first_frame, n_frames in composer.segment_runs(segment)
+                )
+
+        return self._runs
+
+    def iter_frames(self) -> Iterator[np.ndarray]:
+        """Render all queued segments, yielding every output frame in order."""
+        for frame, count in self.iter_runs():
+            for _ in range(count):
+                yield frame
+
+    def iter_runs(self) -> Iterator[Tuple[np.ndarray, int]]:
+        """
+        Render all queued segments, yielding (frame, hold count) in output order.
+
+        At most max_pending distinct frames are in flight or buffered at any
+        time, so memory stays bounded regardless of segment length.
+        """
+        tasks = self._tasks()
+        results = queue.Queue()
+        buffer = ReorderBuffer(self.max_pending)
+        next_task = 0
+
+        with mp.Pool(processes=self.workers,
+                     initializer=_init_worker,
+                     initargs=(self.composer_kwargs, self.segment_specs)) as pool:
+            while buffer.released < len(tasks):
+                # Keep the pool busy without exceeding the buffer bound
+                while (next_task < len(tasks)
+                       and next_task - buffer.released < self.max_pending):
+                    pool.apply_async(
+                        _render_frame, tasks[next_task][:2],
+                        callback=lambda frame, n=next_task: results.put((n, frame, None)),
+                        error_callback=lambda exc, n=next_task: results.put((n, None, exc))
+                    )
+                    next_task += 1
+
+                index, frame, error = results.get()
+                if error is not None:
+                    segment_index, frame_index, _ = tasks[index]
+                    kind = self.segment_specs[segment_index][0]
+                    raise RuntimeError(
+                        f"Rendering frame {frame_index} of {kind} segment failed"
+                    ) from error
+
+                buffer.push(index, (frame, tasks[index][2]))
+                for ready_run in buffer.pop_ready():
+                    yield ready_run
+
+    def render_to_video(self,
+                        output_name: str,
+                        video_config: Optional[VideoConfig] = None,
+                        assembler: Optional[VideoAssembler] = None) -> Optional[str]:
+        """
+        Render all queued segments straight into a streaming encoder.
+
+        Args:
+            output_name: Output video filename (without extension)
+            video_config: Video configuration
+            assembler: Video assembler providing the output directory
+
+        Returns:
+            Path to created video
+        """
+        assembler = assembler or VideoAssembler()
+        print(f"Rendering {self.total_frames} frames "
+              f"({len(self._tasks())} distinct) on {self.workers} workers...")
+        return assembler.stream_video(self.iter_runs(), output_name, video_config)
@@ -0,0 +1,240 @@
+"""
+Checkpointed, resumable video rendering.
+Segments are encoded into independently playable chunks. A JSON journal
+records every finished chunk, so an interrupted render resumes at the first
+missing chunk and finishes with a stream-copy concatenation.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .frame_cache import frame_key, snapshot_digest
+from .segment_composer import VideoSegmentComposer
+from .video_assembler import FrameStreamEncoder, VideoAssembler, VideoConfig
+
+JOURNAL_VERSION = 1
+
+
+class RenderJournal:
+    """Persistent record of the chunks a render has completed."""
+
+    def __init__(self, path: str, fingerprint: str):
+        """
+        Args:
+            path: Journal file path
+            fingerprint: Digest of the render inputs; a journal written for
+                different inputs is discarded
+        """
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self.chunks = {}
+        self._load()
+
+    def _load(self):
+        """Read completed chunks from disk if the journal matches."""
+        if not self.path.exists():
+            return
+
+        try:
+            with open(self.path, 'r') as f:
+                journal = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Ignoring unreadable render journal {self.path}: {e}")
+            return
+
+        if (journal.get('version') != JOURNAL_VERSION
+                or journal.get('fingerprint') != self.fingerprint):
+            print("Render inputs changed, starting from scratch")
+            return
+
+        self.chunks = journal.get('chunks', {})
+
+    def _save(self):
+        """Write the journal atomically so a crash never leaves it truncated."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix('.tmp')
+
+        with open(temp_path, 'w') as f:
+            json.dump({
+                'version': JOURNAL_VERSION,
+                'fingerprint': self.fingerprint,
+                'chunks': self.chunks
+            }, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(temp_path, self.path)
+
+    @staticmethod
+    def chunk_id(segment: str, start: int, end: int) -> str:
+        return f"{segment}:{start}-{end}"
+
+    def is_complete(self, segment: str, start: int, end: int) -> bool:
+        """Whether a chunk was recorded and its file is still present."""
+        path = self.chunks.get(self.chunk_id(segment, start, end))
+        return path is not None and Path(path).exists()
+
+    def record_chunk(self, segment: str, start: int, end: int, path: str):
+        """
+        Mark a chunk as finished.
+
+        Args:
+            segment: Segment name
+            start: First frame of the chunk
+            end: Frame after the last frame of the chunk
+            path: Encoded chunk file
+        """
+        self.chunks[self.chunk_id(segment, start, end)] = str(path)
+        self._save()
+
+    def reset(self):
+        """Forget all completed chunks."""
+        self.chunks = {}
+        if self.path.exists():
+            self.path.unlink()
+
+
+class CheckpointedRenderer:
+    """Render segments chunk by chunk, resuming from a render journal."""
+
+    def __init__(self,
+                 work_dir: str,
+                 video_config: Optional[VideoConfig] = None,
+                 chunk_frames: int = 120,
+                 composer: Optional[VideoSegmentComposer] = None):
+        """
+        Args:
+            work_dir: Directory for chunk files and the journal
+            video_config: Video configuration shared by all chunks
+            chunk_frames: Frames per chunk
+            composer: Segment composer used for rendering
+        """
+        self.work_dir = Path(work_dir)
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self.video_config = video_config or VideoConfig()
+        self.chunk_frames = chunk_frames
+        self.composer = composer or VideoSegmentComposer()
+        self.segment_specs = []
+
+    def add_segment(self, kind: str, *data, **params) -> int:
+        """
+        Queue a segment for rendering.
+
+        Args:
+            kind: Segment kind ('opening', 'middle' or 'finale')
+            *data: Simulation data for the segment
+            **params: Duration, start time and fps of the segment
+
+        Returns:
+            Number of frames in the segment
+        """
+        n_frames = VideoSegmentComposer.segment_frame_count(**params)
+        name = f"{len(self.segment_specs):02d}_{kind}"
+        self.segment_specs.append((name, kind, data, params, n_frames))
+        return n_frames
+
+    def fingerprint(self) -> str:
+        """Digest of everything that determines the rendered chunks."""
+        config = self.video_config
+        inputs = [config.resolution, config.fps, config.codec, config.crf,
+                  config.preset, config.pixel_format, self.chunk_frames]
+
+        for name, kind, data, params, _ in self.segment_specs:
+            data_digests = [
+                {time_key: snapshot_digest(snapshot)
+                 for time_key, snapshot in snapshots.items()}
+                for snapshots in data
+            ]
+            inputs.append((name, kind, params, data_digests))
+
+        return frame_key(*inputs)
+
+    def _chunks(self, n_frames: int) -> List[Tuple[int, int]]:
+        """Split a segment into [start, end) frame ranges."""
+        return [(start, min(start + self.chunk_frames, n_frames))
+                for start in range(0, n_frames, self.chunk_frames)]
+
+    def _render_chunk(self, segment: Dict, runs: List[Tuple[int, int]],
+                      start: int, end: int, chunk_path: Path) -> bool:
+        """Encode frames [start, end) of a prepared segment into one file."""
+        # Encode to a temporary name so a killed encoder leaves no valid chunk
+        temp_path = chunk_path.with_name(f"partial_{chunk_path.name}")
+
+        with FrameStreamEncoder(str(temp_path), self.video_config) as encoder:
+            for first_frame, n_frames in runs:
+                run_start = max(first_frame, start)
+                run_end = min(first_frame + n_frames, end)
+                if run_start >= run_end:
+                    continue
+
+                frame = self.composer.render_segment_frame(segment, first_frame)
+                encoder.write_frame(frame, run_end - run_start)
+
+            success = encoder.close()
+
+        if success:
+            os.replace(temp_path, chunk_path)
+
+        return success
+
+    def render(self,
+               output_name: str,
+               assembler: Optional[VideoAssembler] = None,
+               resume: bool = True) -> Optional[str]:
+        """
+        Render all queued segments and join the chunks into one video.
+
+        Args:
+            output_name: Output video filename (without extension)
+            assembler: Video assembler providing the output directory
+            resume: Keep chunks completed by an earlier run
+
+        Returns:
+            Path to created video
+        """
+        assembler = assembler or VideoAssembler()
+        journal = RenderJournal(self.work_dir / f"{output_name}_journal.json",
+                                self.fingerprint())
+        if not resume:
+            journal.reset()
+
+        chunk_paths = []
+        for name, kind, data, params, n_frames in self.segment_specs:
+            segment = None
+            runs = None
+
+            for start, end in self._chunks(n_frames):
+                chunk_path = self.work_dir / f"{output_name}_{name}_{start:06d}.mp4"
+                chunk_paths.append(chunk_path)
+
+                if journal.is_complete(name, start, end):
+                    print(f"  {name} frames {start}-{end}: already rendered")
+                    continue
+
+                # Prepare the segment only when one of its chunks is missing
+                if segment is None:
+                    segment = self.composer.prepare_segment(kind, *data, **params)
+                    runs = self.composer.segment_runs(segment)
+
+                print(f"  {name} frames {start}-{end}: rendering")
+                try:
+                    success = self._render_chunk(segment, runs, start, end, chunk_path)
+                except FileNotFoundError:
+                    print("FFmpeg not found. Please install FFmpeg.")
+                    return None
+                except BrokenPipeError:
+                    print("FFmpeg terminated unexpectedly")
+                    return None
+
+                if not success:
+                    print(f"Encoding chunk {chunk_path.name} failed")
+                    return None
+
+                journal.record_chunk(name, start, end, str(chunk_path))
+
+        output_path = assembler.output_dir / f"{output_name}.mp4"
+        if not assembler.concat_chunks([str(p) for p in chunk_paths], str(output_path)):
+            return None
+
+        return str(output_path)
@@ -7,10 +7,18 @@ from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 import json
 
-from .frame_generator import GridFrameRenderer, TerrainFrameRenderer, OverlayRenderer
+from .frame_generator import (GridFrameRenderer, TerrainFrameRenderer, OverlayRenderer,
+                              SplitScreenRenderer, ZoomFrameRenderer)
 from .camera_paths import CameraPathController
 from .transitions import TransitionEffects
 from .interpolator import FrameInterpolator
+from .frame_cache import FrameCache, frame_key, hold_runs, snapshot_digest
+from .frame_metrics import FrameMetrics
+from .frame_store import FrameStore
+from .grid_arrays import snapshot_to_arrays
+
+# Left and right labels of the finale's scenario comparison
+FINALE_LABELS = ('BASELINE', 'RCP 8.5 (2100)')
 
 
 class SegmentConfig:
@@ -36,16 +44,28 @@ class SegmentConfig:
 class VideoSegmentComposer:
     """Compose video segments with specific characteristics."""
     
-    def __init__(self, output_dir: str = "video/output/segments"):
+    def __init__(self, output_dir: str = "video/output/segments",
+                 cache_size: int = 16):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
         self.grid_renderer = GridFrameRenderer()
         self.terrain_renderer = TerrainFrameRenderer()
+        self.split_renderer = SplitScreenRenderer()
+        self.zoom_renderer = ZoomFrameRenderer()
         self.overlay_renderer = OverlayRenderer()
         self.camera_controller = CameraPathController()
         self.transitions = TransitionEffects()
         self.interpolator = FrameInterpolator()
+        
+        # Renders keyed by content, shared by identical frames
+        self.frame_cache = FrameCache(cache_size)
+        
+        # Grid arrays and digest per snapshot object, converted once
+        self._converted_snapshots = {}
+        
+        # Metrics per snapshot id, shared by frames showing the snapshot
+        self.frame_metrics = FrameMetrics()
     
     def compose_segment(self,
                        frames_data: List[Dict],
@@ -76,12 +96,15 @@ class VideoSegmentComposer:
             if segment_config.render_type == '2d':
                 frame = self._render_2d_frame(frame_data, i)
             elif segment_config.render_type == '3d':
-                camera_pos = camera_positions[i] if camera_positions else {
+                camera_pos = camera_positions[i] if camera_positions is not None else {
                     'azimuth': -45, 'elevation': 30, 'distance': 10
                 }
                 frame = self._render_3d_frame(frame_data, camera_pos)
             elif segment_config.render_type == 'split':
-                frame = self._render_split_frame(frame_data, i)
+                # Frames may carry a second snapshot to compare against
+                frame = self._render_split_frame(
+                    frame_data, frame_data.get('comparison', frame_data)
+                )
             else:
                 frame = self._render_2d_frame(frame_data, i)
             
@@ -123,53 +146,9 @@ class VideoSegmentComposer:
         - Zoom from overview to fire location
         - Accelerated time initially
         """
-        frames = []
-        total_frames = int(duration * fps)
-        
-        # Load frame data
-        frame_data_list = self._load_frame_data(simulation_data, 0, duration)
-        
-        # Create zoom effect
-        zoom_duration = 2.0  # seconds
-        zoom_frames = int(zoom_duration * fps)
-        
-        for i in range(total_frames):
-            # Load grid data
-            frame_data = frame_data_list[min(i, len(frame_data_list) - 1)]
-            
-            # Render frame
-            if i < zoom_frames:
-                # Zoom effect
-                zoom_progress = i / zoom_frames
-                frame = self._render_zoom_frame(frame_data, zoom_progress)
-            else:
-                # Normal 2D view
-                frame = self._render_2d_frame(frame_data, i)
-            
-            # Add overlays
-            metrics = self._calculate_metrics(frame_data)
-            time_info = {
-                'video_time': i / fps,
-                'frame': i,
-                'scenario': 'Forest Fire Simulation'
-            }
-            
-            frame = self.overlay_renderer.add_overlays(
-                frame, metrics, time_info, style='minimal'
-            )
-            
-            # Fade in effect for first second
-            if i < fps:
-                fade_progress = i / fps
-                frame = self.transitions.fade_from_black(frame, fade_progress)
-            
-            # Add legend in corner
-            if i > fps * 2:  # After 2 seconds
-                frame = self.overlay_renderer.add_legend(frame, 'bottom-right')
-            
-            frames.append(frame)
-        
-        return frames
+        segment = self.prepare_opening_segment(simulation_data, duration, fps)
+        return [self.render_segment_frame(segment, i)
+                for i in range(segment['total_frames'])]
     
     def compose_middle_segment(self,
                               simulation_data: Dict,
@@ -184,52 +163,10 @@ class VideoSegmentComposer:
         - Rotating camera showing terrain impact
         - Highlight percolation transition
         """
-        frames = []
-        total_frames = int(duration * fps)
-        
-        # Load frame data
-        frame_data_list = self._load_frame_data(
-            simulation_data, start_time, start_time + duration
-        )
-        
-        # Get camera path
-        camera_positions = self.camera_controller.paths['orbit'](duration, fps)
-        
-        for i in range(total_frames):
-            # Load grid data
-            frame_data = frame_data_list[min(i, len(frame_data_list) - 1)]
-            
-            # Render 3D frame
-            camera_pos = camera_positions[i]
-            frame = self._render_3d_frame(frame_data, camera_pos)
-            
-            # Calculate metrics
-            metrics = self._calculate_metrics(frame_data)
-            
-            # Highlight percolation transition
-            if metrics.get('percolation', 0) > 0.5:
-                time_info = {
-                    'video_time': start_time + (i / fps),
-                    'frame': i,
-                    'scenario': 'CRITICAL TRANSITION'
-                }
-            else:
-                time_info = {
-                    'video_time': start_time + (i / fps),
-                    'frame': i
-                }
-            
-            frame = self.overlay_renderer.add_overlays(
-                frame, metrics, time_info, style='full'
-            )
-            
-            # Add visual effect during transition
-            if 0.4 < metrics.get('percolation', 0) < 0.6:
-                frame = self.transitions.apply_vignette(frame, strength=0.3)
-            
-            frames.append(frame)
-        
-        return frames
+        segment = self.prepare_middle_segment(simulation_data, duration,
+                                              start_time, fps)
+        return [self.render_segment_frame(segment, i)
+                for i in range(segment['total_frames'])]
     
     def compose_finale_segment(self,
                               baseline_data: Dict,
@@ -245,136 +182,406 @@ class VideoSegmentComposer:
         - Synchronized simulations
         - Final statistics overlay
         """
-        frames = []
-        total_frames = int(duration * fps)
+        segment = self.prepare_finale_segment(baseline_data, scenario_data,
+                                              duration, start_time, fps)
+        return [self.render_segment_frame(segment, i)
+                for i in range(segment['total_frames'])]
+    
+    def prepare_segment(self, kind: str, *data, **params) -> Dict:
+        """
+        Prepare the per-frame inputs of a named segment.
+        
+        Args:
+            kind: Segment kind ('opening', 'middle' or 'finale')
+            *data: Simulation data passed to the segment's prepare method
+            **params: Duration, start time and fps of the segment
+            
+        Returns:
+            Segment context accepted by render_segment_frame
+        """
+        preparers = {
+            'opening': self.prepare_opening_segment,
+            'middle': self.prepare_middle_segment,
+            'finale': self.prepare_finale_segment
+        }
+        if kind not in preparers:
+            raise ValueError(f"Unknown segment kind: {kind}")
         
-        # Load frame data for both scenarios
-        baseline_frames = self._load_frame_data(
-            baseline_data, start_time, start_time + duration
+        return preparers[kind](*data, **params)
+    
+    def render_segment_frame(self, segment: Dict, i: int) -> np.ndarray:
+        """Render frame i of a prepared segment, reusing identical frames."""
+        renderers = {
+            'opening': self.render_opening_frame,
+            'middle': self.render_middle_frame,
+            'finale': self.render_finale_frame
+        }
+        return self.frame_cache.get_or_render(
+            self.frame_key(segment, i),
+            lambda: renderers[segment['kind']](segment, i)
         )
-        scenario_frames = self._load_frame_data(
-            scenario_data, start_time, start_time + duration
+    
+    def frame_key(self, segment: Dict, i: int) -> str:
+        """
+        Content key of frame i of a prepared segment.
+        
+        Frames with equal keys are pixel-identical, so the key covers every
+        input the segment's render method depends on.
+        """
+        key_builders = {
+            'opening': self._opening_frame_inputs,
+            'middle': self._middle_frame_inputs,
+            'finale': self._finale_frame_inputs
+        }
+        return frame_key(segment['kind'], *key_builders[segment['kind']](segment, i))
+    
+    def segment_runs(self, segment: Dict) -> List[Tuple[int, int]]:
+        """
+        Split a prepared segment into runs of identical frames.
+        
+        Returns:
+            List of (first frame index, number of frames)
+        """
+        keys = (self.frame_key(segment, i) for i in range(segment['total_frames']))
+        return list(hold_runs(keys))
+    
+    def iter_segment_runs(self, segment: Dict):
+        """
+        Render each distinct frame of a prepared segment once.
+        
+        Yields:
+            (frame, number of frames to hold it for)
+        """
+        for first_frame, n_frames in self.segment_runs(segment):
+            yield self.render_segment_frame(segment, first_frame), n_frames
+    
+    @staticmethod
+    def segment_frame_count(duration: float = 5.0, fps: int = 60, **params) -> int:
+        """Number of frames a segment with the given parameters renders."""
+        return int(duration * fps)
+    
+    def prepare_opening_segment(self,
+                                simulation_data: Dict,
+                                duration: float = 5.0,
+                                fps: int = 60) -> Dict:
+        """Load frame data for the opening segment."""
+        return {
+            'kind': 'opening',
+            'fps': fps,
+            'total_frames': self.segment_frame_count(duration, fps),
+            'frame_data': self._load_frame_data(simulation_data, 0, duration),
+            'zoom_frames': int(2.0 * fps)  # 2 second zoom
+        }
+    
+    def _opening_frame_inputs(self, segment: Dict, i: int) -> Tuple:
+        """Inputs that determine frame i of the opening segment."""
+        fps = segment['fps']
+        frame_data_list = segment['frame_data']
+        frame_data = frame_data_list[min(i, len(frame_data_list) - 1)]
+        
+        zoom_progress = i / segment['zoom_frames'] if i < segment['zoom_frames'] else None
+        fade_progress = i / fps if i < fps else None
+        
+        return (frame_data['snapshot_id'], zoom_progress, f"{i / fps:.1f}",
+                fade_progress, i > fps * 2)
+    
+    def render_opening_frame(self, segment: Dict, i: int) -> np.ndarray:
+        """Render frame i of the opening segment."""
+        fps = segment['fps']
+        frame_data_list = segment['frame_data']
+        zoom_frames = segment['zoom_frames']
+        
+        # Load grid data
+        frame_data = frame_data_list[min(i, len(frame_data_list) - 1)]
+        
+        # Render frame
+        if i < zoom_frames:
+            # Zoom effect
+            zoom_progress = i / zoom_frames
+            frame = self._render_zoom_frame(frame_data, zoom_progress)
+        else:
+            # Normal 2D view
+            frame = self._render_2d_frame(frame_data, i)
+        
+        # Add overlays
+        metrics = self._calculate_metrics(frame_data)
+        time_info = {
+            'video_time': i / fps,
+            'frame': i,
+            'scenario': 'Forest Fire Simulation'
+        }
+        
+        frame = self.overlay_renderer.add_overlays(
+            frame, metrics, time_info, style='minimal'
         )
         
-        # Transition to split screen over 1 second
-        transition_frames = fps
+        # Fade in effect for first second
+        if i < fps:
+            fade_progress = i / fps
+            frame = self.transitions.fade_from_black(frame, fade_progress)
         
-        for i in range(total_frames):
-            # Get frame data
-            baseline_frame_data = baseline_frames[min(i, len(baseline_frames) - 1)]
-            scenario_frame_data = scenario_frames[min(i, len(scenario_frames) - 1)]
-            
-            # Render frames
-            baseline_render = self._render_2d_frame(baseline_frame_data, i)
-            scenario_render = self._render_2d_frame(scenario_frame_data, i)
-            
-            # Apply split screen transition
-            if i < transition_frames:
-                # Wipe transition
-                progress = i / transition_frames
-                frame = self.transitions.split_screen_wipe(
-                    baseline_render, scenario_render, progress, 'horizontal'
-                )
-            else:
-                # Full split screen
-                frame = self.transitions.create_split_screen(
-                    baseline_render, scenario_render, 'vertical'
-                )
-            
-            # Add overlays for each side
-            baseline_metrics = self._calculate_metrics(baseline_frame_data)
-            scenario_metrics = self._calculate_metrics(scenario_frame_data)
-            
-            # Create comparison metrics
+        # Add legend in corner
+        if i > fps * 2:  # After 2 seconds
+            frame = self.overlay_renderer.add_legend(frame, 'bottom-right')
+        
+        return frame
+    
+    def prepare_middle_segment(self,
+                               simulation_data: Dict,
+                               duration: float = 5.0,
+                               start_time: float = 5.0,
+                               fps: int = 60) -> Dict:
+        """Load frame data and camera path for the middle segment."""
+        return {
+            'kind': 'middle',
+            'fps': fps,
+            'start_time': start_time,
+            'total_frames': self.segment_frame_count(duration, fps),
+            'frame_data': self._load_frame_data(
+                simulation_data, start_time, start_time + duration
+            ),
+            'camera_positions': self.camera_controller.paths['orbit'](duration, fps)
+        }
+    
+    def _middle_frame_inputs(self, segment: Dict, i: int) -> Tuple:
+        """Inputs that determine frame i of the middle segment."""
+        frame_data_list = segment['frame_data']
+        frame_data = frame_data_list[min(i, len(frame_data_list) - 1)]
+        video_time = segment['start_time'] + (i / segment['fps'])
+        
+        return (frame_data['snapshot_id'], self._camera_key(segment['camera_positions'][i]),
+                f"{video_time:.1f}")
+    
+    def render_middle_frame(self, segment: Dict, i: int) -> np.ndarray:
+        """Render frame i of the middle segment."""
+        fps = segment['fps']
+        start_time = segment['start_time']
+        frame_data_list = segment['frame_data']
+        
+        # Load grid data
+        frame_data = frame_data_list[min(i, len(frame_data_list) - 1)]
+        
+        # Render 3D frame
+        camera_pos = segment['camera_positions'][i]
+        frame = self._render_3d_frame(frame_data, camera_pos)
+        
+        # Calculate metrics
+        metrics = self._calculate_metrics(frame_data)
+        
+        # Highlight percolation transition
+        if metrics.get('percolation', 0) > 0.5:
+            time_info = {
+                'video_time': start_time + (i / fps),
+                'frame': i,
+                'scenario': 'CRITICAL TRANSITION'
+            }
+        else:
             time_info = {
                 'video_time': start_time + (i / fps),
                 'frame': i
             }
+        
+        frame = self.overlay_renderer.add_overlays(
+            frame, metrics, time_info, style='full'
+        )
+        
+        # Add visual effect during transition
+        if 0.4 < metrics.get('percolation', 0) < 0.6:
+            frame = self.transitions.apply_vignette(frame, strength=0.3)
+        
+        return frame
+    
+    def prepare_finale_segment(self,
+                               baseline_data: Dict,
+                               scenario_data: Dict,
+                               duration: float = 5.0,
+                               start_time: float = 10.0,
+                               fps: int = 60) -> Dict:
+        """Load frame data of both scenarios for the finale segment."""
+        total_frames = self.segment_frame_count(duration, fps)
+        
+        return {
+            'kind': 'finale',
+            'fps': fps,
+            'start_time': start_time,
+            'total_frames': total_frames,
+            'baseline_frames': self._load_frame_data(
+                baseline_data, start_time, start_time + duration
+            ),
+            'scenario_frames': self._load_frame_data(
+                scenario_data, start_time, start_time + duration
+            ),
+            # Transition to split screen over 1 second
+            'transition_frames': fps,
+            # Fade to black in last 0.5 seconds
+            'fade_start': total_frames - int(0.5 * fps)
+        }
+    
+    def _finale_frame_inputs(self, segment: Dict, i: int) -> Tuple:
+        """Inputs that determine frame i of the finale segment."""
+        fps = segment['fps']
+        total_frames = segment['total_frames']
+        transition_frames = segment['transition_frames']
+        fade_start = segment['fade_start']
+        baseline_frames = segment['baseline_frames']
+        scenario_frames = segment['scenario_frames']
+        
+        wipe_progress = i / transition_frames if i < transition_frames else None
+        show_statistics = i >= transition_frames and i >= total_frames - fps
+        fade_progress = ((i - fade_start) / (total_frames - fade_start)
+                         if i >= fade_start else None)
+        
+        return (baseline_frames[min(i, len(baseline_frames) - 1)]['snapshot_id'],
+                scenario_frames[min(i, len(scenario_frames) - 1)]['snapshot_id'],
+                wipe_progress, show_statistics, fade_progress)
+    
+    def render_finale_frame(self, segment: Dict, i: int) -> np.ndarray:
+        """Render frame i of the finale segment."""
+        fps = segment['fps']
+        total_frames = segment['total_frames']
+        transition_frames = segment['transition_frames']
+        baseline_frames = segment['baseline_frames']
+        scenario_frames = segment['scenario_frames']
+        
+        # Get frame data
+        baseline_frame_data = baseline_frames[min(i, len(baseline_frames) - 1)]
+        scenario_frame_data = scenario_frames[min(i, len(scenario_frames) - 1)]
+        
+        # Both scenarios side by side, each rendered at half width
+        split_frame = self._render_split_frame(
+            baseline_frame_data, scenario_frame_data, FINALE_LABELS
+        )
+        
+        # Apply split screen transition
+        if i < transition_frames:
+            # Wipe from the full baseline view to the split screen
+            progress = i / transition_frames
+            baseline_render = self._render_2d_frame(baseline_frame_data, i)
+            frame = self.transitions.split_screen_wipe(
+                baseline_render, split_frame, progress, 'horizontal'
+            )
+        else:
+            frame = split_frame
             
-            # Add labels
-            if i >= transition_frames:
-                frame = self._add_split_screen_labels(
-                    frame, 'BASELINE', 'RCP 8.5 (2100)'
+            # Add final statistics in last second
+            if i >= total_frames - fps:
+                frame = self._add_final_statistics(
+                    frame,
+                    self._calculate_metrics(baseline_frame_data),
+                    self._calculate_metrics(scenario_frame_data),
+                    FINALE_LABELS
                 )
-                
-                # Add final statistics in last second
-                if i >= total_frames - fps:
-                    frame = self._add_final_statistics(
-                        frame, baseline_metrics, scenario_metrics
-                    )
-            
-            frames.append(frame)
         
-        # Fade to black in last 0.5 seconds
-        fade_start = total_frames - int(0.5 * fps)
-        for i in range(fade_start, total_frames):
+        # Fade to black at the end
+        fade_start = segment['fade_start']
+        if i >= fade_start:
             progress = (i - fade_start) / (total_frames - fade_start)
-            frames[i] = self.transitions.fade_to_black(frames[i], progress)
+            frame = self.transitions.fade_to_black(frame, progress)
         
-        return frames
+        return frame
     
     def _render_2d_frame(self, frame_data: Dict, frame_number: int) -> np.ndarray:
         """Render a 2D grid frame."""
-        grid_df = self._dict_to_dataframe(frame_data['grid_data'])
-        return self.grid_renderer.render_frame(grid_df, frame_number)
+        def render():
+            return self.grid_renderer.render_frame(self._frame_arrays(frame_data), frame_number)
+        
+        # The grid render depends only on the snapshot
+        return self.frame_cache.get_or_render(
+            frame_key('2d', self._snapshot_id(frame_data)), render
+        )
     
     def _render_3d_frame(self, frame_data: Dict, camera_pos: Dict) -> np.ndarray:
         """Render a 3D terrain frame."""
-        grid_df = self._dict_to_dataframe(frame_data['grid_data'])
-        return self.terrain_renderer.render_3d_frame(grid_df, camera_pos)
+        def render():
+            return self.terrain_renderer.render_3d_frame(self._frame_arrays(frame_data), camera_pos)
+        
+        return self.frame_cache.get_or_render(
+            frame_key('3d', self._snapshot_id(frame_data), self._camera_key(camera_pos)), render
+        )
+    
+    def _camera_key(self, camera_pos) -> Tuple[float, float, float]:
+        """Camera parameters that determine a 3D frame (dict or path record)."""
+        return tuple(float(camera_pos[name]) for name in ('azimuth', 'elevation', 'distance'))
+    
+    def _snapshot_id(self, frame_data: Dict) -> str:
+        """Content digest of the snapshot shown by a frame."""
+        if 'snapshot_id' not in frame_data:
+            frame_data['snapshot_id'] = snapshot_digest(frame_data['grid_data'])
+        return frame_data['snapshot_id']
     
-    def _render_split_frame(self, frame_data: Dict, frame_number: int) -> np.ndarray:
-        """Render split screen frame."""
-        # This would be implemented for side-by-side comparison
-        grid_df = self._dict_to_dataframe(frame_data['grid_data'])
-        return self.grid_renderer.render_frame(grid_df, frame_number, layout='left')
+    def _render_split_frame(self, left_data: Dict, right_data: Dict,
+                            labels: Optional[Tuple[str, str]] = None) -> np.ndarray:
+        """
+        Render two snapshots side by side (shared; do not modify).
+        
+        Both halves are rasterized at native half-width resolution from the
+        split renderer's layout; the labelled frame is cached per snapshot pair.
+        """
+        def render():
+            frame = self.split_renderer.render_frame(self._frame_arrays(left_data),
+                                                     self._frame_arrays(right_data))
+            if labels:
+                frame = self._add_split_screen_labels(frame, *labels)
+            return frame
+        
+        return self.frame_cache.get_or_render(
+            frame_key('split', self._snapshot_id(left_data), self._snapshot_id(right_data), labels),
+            render
+        )
     
     def _render_zoom_frame(self, frame_data: Dict, zoom_progress: float) -> np.ndarray:
         """Render frame with zoom effect."""
-        grid_df = self._dict_to_dataframe(frame_data['grid_data'])
-        
-        # Find fire location for zoom target
-        burning_cells = grid_df[grid_df['state'] == 'Burning']
-        if not burning_cells.empty:
-            # Get center of burning area
-            x_center = burning_cells.index.get_level_values('x').mean()
-            y_center = burning_cells.index.get_level_values('y').mean()
-        else:
-            # Default to center
-            x_center = grid_df.index.get_level_values('x').max() / 2
-            y_center = grid_df.index.get_level_values('y').max() / 2
+        arrays = self._frame_arrays(frame_data)
+        states = arrays['state']
         
-        # Render full frame
-        frame = self.grid_renderer.render_frame(grid_df, 0)
+        # Zoom on the fire, or on the grid centre before ignition
+        center = self._calculate_metrics(frame_data)['fire_centroid']
+        if center is None:
+            center = ((states.shape[1] - 1) / 2, (states.shape[0] - 1) / 2)
         
-        # Apply zoom
         zoom_factor = 1 + (2 - 1) * (1 - zoom_progress)  # Zoom out from 2x to 1x
-        zoomed_frames = self.transitions.zoom_transition(
-            [frame], (int(x_center * 10), int(y_center * 10)), zoom_factor
-        )
-        
-        return zoomed_frames[0]
+        return self.zoom_renderer.render_frame(arrays, center, zoom_factor)
     
     def _calculate_metrics(self, frame_data: Dict) -> Dict:
-        """Calculate metrics from frame data."""
-        grid_data = frame_data['grid_data']
-        
-        # Count states
-        state_counts = {'Empty': 0, 'Tree': 0, 'Burning': 0, 'Burnt': 0}
-        for cell in grid_data:
-            state = cell.get('state', 'Empty')
-            state_counts[state] = state_counts.get(state, 0) + 1
-        
-        total_cells = len(grid_data)
-        tree_cells = state_counts['Tree'] + state_counts['Burning'] + state_counts['Burnt']
-        
-        metrics = {
-            'active_fires': state_counts['Burning'],
-            'burnt_fraction': state_counts['Burnt'] / tree_cells if tree_cells > 0 else 0,
-            'percolation': 0.0  # Would need actual calculation
-        }
+        """Calculate metrics from frame data (once per snapshot)."""
+        arrays = self._frame_arrays(frame_data)
+        return self.frame_metrics.get(self._snapshot_id(frame_data), arrays['state'],
+                                      arrays.get('vegetation'))
+    
+    def _frame_arrays(self, frame_data: Dict) -> Dict[str, np.ndarray]:
+        """Grid arrays of a frame (frames built from cell records are converted once)."""
+        if 'arrays' not in frame_data:
+            frame_data['arrays'] = snapshot_to_arrays(self._dict_to_dataframe(frame_data['grid_data']))
+        return frame_data['arrays']
+    
+    def _snapshot_arrays(self, snapshot) -> Tuple[Dict[str, np.ndarray], str]:
+        """
+        Grid arrays and content digest of a snapshot.
+        
+        Each snapshot object is converted once per composer; the read-only
+        arrays are shared by every frame and segment that shows it.
+        """
+        entry = self._converted_snapshots.get(id(snapshot))
+        if entry is None or entry[0] is not snapshot:
+            grid = snapshot if isinstance(snapshot, pd.DataFrame) else self._dict_to_dataframe(snapshot)
+            arrays = snapshot_to_arrays(grid)
+            for array in arrays.values():
+                array.flags.writeable = False
+            
+            # Keep the snapshot referenced so its id cannot be reused
+            entry = (snapshot, arrays, snapshot_digest(snapshot))
+            self._converted_snapshots[id(snapshot)] = entry
         
-        return metrics
+        return entry[1], entry[2]
+    
+    def _closest_snapshots(self, snapshot_times: np.ndarray,
+                           frame_times: np.ndarray) -> np.ndarray:
+        """Index of the closest snapshot for every frame time (the earlier one on ties)."""
+        right = np.clip(np.searchsorted(snapshot_times, frame_times), 0, len(snapshot_times) - 1)
+        left = np.maximum(right - 1, 0)
+        use_left = (np.abs(frame_times - snapshot_times[left])
+                    <= np.abs(snapshot_times[right] - frame_times))
+        return np.where(use_left, left, right)
     
     def _dict_to_dataframe(self, grid_data: List[Dict]) -> pd.DataFrame:
         """Convert grid data dict to DataFrame."""
@@ -386,45 +593,74 @@ class VideoSegmentComposer:
     def _load_frame_data(self, simulation_data: Dict, 
                         start_time: float, end_time: float) -> List[Dict]:
         """Load frame data for time range."""
-        frames = []
+        if isinstance(simulation_data, FrameStore):
+            return self._load_store_frame_data(simulation_data, start_time, end_time)
         
         # Convert simulation snapshots to frame data format
         n_frames = int((end_time - start_time) * 60)  # 60 fps
+        frame_times = start_time + np.arange(n_frames) / 60.0
+        
+        # Map every frame to its closest snapshot in one search
+        time_keys = sorted(simulation_data.keys(), key=float)
+        snapshot_times = np.array([float(t) for t in time_keys])
+        frame_index = self._closest_snapshots(snapshot_times, frame_times)
+        
+        # Convert each snapshot shown in the range once
+        snapshots = {index: self._snapshot_arrays(simulation_data[time_keys[index]])
+                     for index in np.unique(frame_index)}
+        
+        frames = []
+        for frame_time, index in zip(frame_times, frame_index):
+            arrays, snapshot_id = snapshots[index]
+            frames.append({
+                'arrays': arrays,
+                'snapshot_id': snapshot_id,
+                'time': float(frame_time)
+            })
+        
+        return frames
+    
+    def _load_store_frame_data(self, store: FrameStore,
+                               start_time: float, end_time: float) -> List[Dict]:
+        """Load frame data for time range from an exported frame container."""
+        frames = []
+        
+        n_frames = int((end_time - start_time) * 60)  # 60 fps
+        store_fps = store.metadata.get('fps', 60)
         
-        # Get available snapshots
-        snapshot_times = sorted([float(t) for t in simulation_data.keys()])
+        # Decode each stored frame once, however many video frames show it
+        converted = {}
         
         for i in range(n_frames):
             frame_time = start_time + (i / 60.0)
             
-            # Find closest snapshot
-            closest_time = min(snapshot_times, key=lambda t: abs(t - frame_time))
-            snapshot = simulation_data[str(closest_time)]
+            # Random access to the stored frame at this video time
+            frame_index = min(max(int(round(frame_time * store_fps)), 0), len(store) - 1)
+            if frame_index not in converted:
+                converted[frame_index] = (
+                    store.read_frame(frame_index),
+                    store.frame_digest(frame_index)
+                )
+            arrays, snapshot_id = converted[frame_index]
             
-            # Convert to expected format
-            frame_data = {
-                'grid_data': snapshot.to_dict('records') if hasattr(snapshot, 'to_dict') else snapshot,
+            frames.append({
+                'arrays': arrays,
+                'snapshot_id': snapshot_id,
                 'time': frame_time
-            }
-            frames.append(frame_data)
+            })
         
         return frames
     
     def _add_split_screen_labels(self, frame: np.ndarray,
                                 left_label: str, right_label: str) -> np.ndarray:
-        """Add labels to split screen."""
-        height, width = frame.shape[:2]
-        
-        # This would add text labels to each side
-        # Implementation would use matplotlib or PIL
-        
-        return frame
+        """Add labels to split screen (in place)."""
+        return self.split_renderer.add_labels(frame, left_label, right_label)
     
     def _add_final_statistics(self, frame: np.ndarray,
                              baseline_metrics: Dict,
-                             scenario_metrics: Dict) -> np.ndarray:
-        """Add final statistics overlay."""
-        # This would add a statistics box showing comparison
-        # Implementation would use matplotlib text rendering
-        
-        return frame
\ No newline at end of file
+                             scenario_metrics: Dict,
+                             labels: Tuple[str, str] = FINALE_LABELS) -> np.ndarray:
+        """Add final statistics overlay to a copy of the frame."""
+        return self.split_renderer.add_statistics(
+            frame.copy(), baseline_metrics, scenario_metrics, *labels
+        )
\ No newline at end of file
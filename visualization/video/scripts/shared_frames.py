@@ -0,0 +1,177 @@
+"""
+Shared-memory frame transport between render workers and the encoder.
+Frames are rendered straight into slots of a shared-memory ring buffer and
+streamed to FFmpeg in order, so no frame is PNG-compressed, written to disk
+or pickled back to the parent process.
+"""
+import multiprocessing as mp
+import queue
+from multiprocessing import shared_memory
+from typing import Callable, Iterable, Optional, Sequence, Tuple
+import numpy as np
+from PIL import Image
+
+from .parallel_renderer import ReorderBuffer
+from .video_assembler import FrameStreamEncoder
+
+# Per-worker state, created once by the pool initializer
+_ring = None
+_render_into = None
+
+
+class SharedFrameRing:
+    """Fixed number of RGB frame slots in one shared-memory block."""
+
+    def __init__(self,
+                 n_slots: int,
+                 frame_shape: Tuple[int, int, int] = (1080, 1920, 3),
+                 name: Optional[str] = None):
+        """
+        Args:
+            n_slots: Number of frame slots
+            frame_shape: (height, width, channels) of every slot
+            name: Attach to an existing ring of this name instead of
+                creating one
+        """
+        self.n_slots = n_slots
+        self.frame_shape = tuple(frame_shape)
+        self.owner = name is None
+
+        size = n_slots * int(np.prod(self.frame_shape))
+        if self.owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            # Workers share the creator's resource tracker, which unlinks
+            # the block only once the creator closes it
+            self._shm = shared_memory.SharedMemory(name=name)
+
+        self._frames = np.ndarray((n_slots,) + self.frame_shape,
+                                  dtype=np.uint8, buffer=self._shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def slot(self, index: int) -> np.ndarray:
+        """Writable (height, width, channels) view of a slot."""
+        return self._frames[index]
+
+    def close(self):
+        """Detach from the block, removing it if this process created it."""
+        if self._shm is None:
+            return
+
+        self._frames = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def copy_figure_into(fig, out: np.ndarray):
+    """
+    Draw a Matplotlib figure and copy its RGB pixels into a frame slot.
+
+    Figures sized to the slot are copied directly; others are resized.
+
+    Args:
+        fig: Matplotlib figure with an Agg-based canvas
+        out: (height, width, 3) uint8 destination
+    """
+    fig.canvas.draw()
+    rgb = np.asarray(fig.canvas.buffer_rgba())[:, :, :3]
+
+    if rgb.shape != out.shape:
+        height, width = out.shape[:2]
+        rgb = np.asarray(Image.fromarray(rgb).resize((width, height), Image.LANCZOS))
+
+    out[:] = rgb
+
+
+def _init_ring_worker(ring_name: str,
+                      n_slots: int,
+                      frame_shape: Tuple[int, int, int],
+                      render_into: Callable,
+                      initializer: Optional[Callable],
+                      initargs: Sequence):
+    """Attach the worker to the ring and run the caller's initializer."""
+    global _ring, _render_into
+    _ring = SharedFrameRing(n_slots, frame_shape, name=ring_name)
+    _render_into = render_into
+
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def _render_slot(task, slot: int) -> int:
+    """Render one task into a slot of the ring."""
+    _render_into(task, _ring.slot(slot))
+    return slot
+
+
+def stream_frames(tasks: Iterable,
+                  render_into: Callable,
+                  encoder: FrameStreamEncoder,
+                  workers: Optional[int] = None,
+                  n_slots: Optional[int] = None,
+                  frame_shape: Tuple[int, int, int] = (1080, 1920, 3),
+                  initializer: Optional[Callable] = None,
+                  initargs: Sequence = ()) -> int:
+    """
+    Render tasks on a process pool and stream the frames to an encoder in order.
+
+    Args:
+        tasks: Picklable task descriptions, one per output frame
+        render_into: Module-level function render_into(task, out) filling
+            the (height, width, 3) uint8 slot out
+        encoder: Open encoder receiving the frames
+        workers: Number of worker processes (default: CPU count)
+        n_slots: Frame slots in the ring (default: twice the workers); this
+            bounds memory and the frames in flight
+        frame_shape: (height, width, 3) of every frame
+        initializer: Optional per-worker initializer run after attaching
+        initargs: Arguments for the initializer
+
+    Returns:
+        Number of frames written
+    """
+    tasks = list(tasks)
+    workers = workers or mp.cpu_count()
+    n_slots = n_slots or 2 * workers
+
+    results = queue.Queue()
+    buffer = ReorderBuffer(n_slots)
+    free_slots = list(range(n_slots))
+    next_task = 0
+
+    with SharedFrameRing(n_slots, frame_shape) as ring:
+        with mp.Pool(processes=workers,
+                     initializer=_init_ring_worker,
+                     initargs=(ring.name, n_slots, frame_shape,
+                               render_into, initializer, initargs)) as pool:
+            while buffer.released < len(tasks):
+                # A free slot is the only ticket to start rendering a frame
+                while next_task < len(tasks) and free_slots:
+                    pool.apply_async(
+                        _render_slot, (tasks[next_task], free_slots.pop()),
+                        callback=lambda slot, n=next_task: results.put((n, slot, None)),
+                        error_callback=lambda exc, n=next_task: results.put((n, None, exc))
+                    )
+                    next_task += 1
+
+                index, slot, error = results.get()
+                if error is not None:
+                    raise RuntimeError(f"Rendering frame {index} failed") from error
+
+                buffer.push(index, slot)
+                for ready_slot in buffer.pop_ready():
+                    encoder.write_frame(ring.slot(ready_slot))
+                    free_slots.append(ready_slot)
+
+    return len(tasks)
@@ -0,0 +1,334 @@
+"""
+Cached-projection terrain rasterizer for 3D video frames.
+Builds mesh, hillshade and contour geometry once, then rasterizes each
+frame with a vectorized painter's algorithm.
+"""
+import numpy as np
+import matplotlib.colors as mcolors
+from typing import Dict, Optional, Tuple
+
+# Camera distance 10 frames the whole terrain box, like mplot3d's ax.dist
+DISTANCE_SCALE = 0.25
+
+# Upper bound on candidate fragments evaluated per rasterization batch
+MAX_BATCH_FRAGMENTS = 4_000_000
+
+
+def camera_view_matrices(azimuth,
+                         elevation,
+                         distance) -> np.ndarray:
+    """
+    Build look-at view matrices for one or many camera positions.
+
+    Args:
+        azimuth: Azimuth angle(s) in degrees, measured from the +x axis
+        elevation: Elevation angle(s) in degrees above the terrain plane
+        distance: Camera distance(s), same scale as the camera paths
+
+    Returns:
+        Array of shape (N, 4, 4) with world-to-camera matrices
+    """
+    az = np.radians(np.atleast_1d(np.asarray(azimuth, dtype=float)))
+    el = np.radians(np.atleast_1d(np.asarray(elevation, dtype=float)))
+    radius = np.atleast_1d(np.asarray(distance, dtype=float)) * DISTANCE_SCALE
+    az, el, radius = np.broadcast_arrays(az, el, radius)
+
+    # Eye position on a sphere around the terrain centre
+    eye = np.stack([np.cos(el) * np.cos(az),
+                    np.cos(el) * np.sin(az),
+                    np.sin(el)], axis=-1) * radius[:, None]
+
+    forward = -eye / np.linalg.norm(eye, axis=-1, keepdims=True)
+    up = np.broadcast_to(np.array([0.0, 0.0, 1.0]), forward.shape)
+    side = np.cross(forward, up)
+
+    # Straight-down views have no defined side vector, fall back to +y up
+    degenerate = np.linalg.norm(side, axis=-1) < 1e-9
+    if degenerate.any():
+        side[degenerate] = np.cross(forward[degenerate], np.array([0.0, 1.0, 0.0]))
+    side /= np.linalg.norm(side, axis=-1, keepdims=True)
+    true_up = np.cross(side, forward)
+
+    views = np.zeros((len(eye), 4, 4))
+    views[:, 0, :3] = side
+    views[:, 1, :3] = true_up
+    views[:, 2, :3] = -forward
+    views[:, 0, 3] = -np.einsum('ij,ij->i', side, eye)
+    views[:, 1, 3] = -np.einsum('ij,ij->i', true_up, eye)
+    views[:, 2, 3] = np.einsum('ij,ij->i', forward, eye)
+    views[:, 3, 3] = 1.0
+
+    return views
+
+
+def camera_view(camera=None) -> np.ndarray:
+    """
+    View matrix of one camera.
+
+    Args:
+        camera: Camera path record (uses its precomputed 'view'), or a dict
+            with azimuth, elevation and distance
+
+    Returns:
+        (4, 4) world-to-camera matrix
+    """
+    if isinstance(camera, np.void) and 'view' in camera.dtype.names:
+        return camera['view']
+
+    camera = camera or {'azimuth': -45, 'elevation': 30, 'distance': 10}
+    return camera_view_matrices(camera.get('azimuth', -45),
+                                camera.get('elevation', 30),
+                                camera.get('distance', 10))[0]
+
+
+class CachedTerrainRenderer:
+    """Rasterize a static terrain mesh with per-frame cell colours."""
+
+    def __init__(self,
+                 elevation: np.ndarray,
+                 resolution: Tuple[int, int] = (1920, 1080),
+                 vertical_scale: float = 0.3,
+                 field_of_view: float = 30.0,
+                 background: str = '#0a0a1e',
+                 n_contours: int = 10,
+                 contour_alpha: float = 0.2,
+                 light_azimuth: float = 315.0,
+                 light_altitude: float = 45.0,
+                 ambient: float = 0.35):
+        """
+        Precompute terrain geometry, hillshade and contours.
+
+        Args:
+            elevation: Elevation grid of shape (height, width)
+            resolution: Output resolution (width, height) in pixels
+            vertical_scale: Height of the terrain box relative to its width
+            field_of_view: Vertical field of view in degrees
+            background: Background colour
+            n_contours: Number of elevation contour levels
+            contour_alpha: Opacity of contour lines over the surface
+            light_azimuth: Light source azimuth in degrees
+            light_altitude: Light source altitude in degrees
+            ambient: Minimum brightness of unlit faces
+        """
+        self.elevation = np.asarray(elevation, dtype=float)
+        self.resolution = resolution
+        self.height, self.width = self.elevation.shape
+        self.background = (np.array(mcolors.to_rgb(background)) * 255).astype(np.uint8)
+        self.focal = 0.5 * resolution[1] / np.tan(np.radians(field_of_view) / 2)
+
+        self._build_mesh(vertical_scale)
+        self._build_shading(light_azimuth, light_altitude, ambient)
+        self._build_contours(n_contours, contour_alpha)
+
+    def _build_mesh(self, vertical_scale: float):
+        """Create corner vertices and two triangles per cell."""
+        h, w = self.height, self.width
+
+        # Corner elevations are the mean of the surrounding cells
+        padded = np.pad(self.elevation, 1, mode='edge')
+        corners = 0.25 * (padded[:-1, :-1] + padded[1:, :-1] +
+                          padded[:-1, 1:] + padded[1:, 1:])
+
+        elev_min = self.elevation.min()
+        elev_range = self.elevation.max() - elev_min
+        z_factor = vertical_scale / elev_range if elev_range > 0 else 0.0
+        z = (corners - elev_min) * z_factor
+        self.cell_z = (self.elevation - elev_min) * z_factor
+
+        # Normalise the grid to a box of unit width centred on the origin
+        scale = 1.0 / max(w, h)
+        xs = (np.arange(w + 1) - w / 2) * scale
+        ys = (np.arange(h + 1) - h / 2) * scale
+        X, Y = np.meshgrid(xs, ys)
+
+        self.vertices = np.stack([X.ravel(), Y.ravel(),
+                                  (z - vertical_scale / 2).ravel(),
+                                  np.ones(X.size)], axis=1)
+        self._grid_step = scale
+
+        # Two triangles per cell, both mapped back to the cell index
+        rows, cols = np.mgrid[0:h, 0:w]
+        top_left = (rows * (w + 1) + cols).ravel()
+        top_right = top_left + 1
+        bottom_left = top_left + (w + 1)
+        bottom_right = bottom_left + 1
+
+        self.triangles = np.concatenate([
+            np.stack([top_left, top_right, bottom_right], axis=1),
+            np.stack([top_left, bottom_right, bottom_left], axis=1)
+        ])
+        self.triangle_cells = np.concatenate([np.arange(h * w)] * 2)
+
+    def _build_shading(self, light_azimuth: float, light_altitude: float,
+                       ambient: float):
+        """Compute per-cell hillshade brightness."""
+        dz_dy, dz_dx = np.gradient(self.cell_z, self._grid_step)
+        normals = np.stack([-dz_dx, -dz_dy, np.ones_like(dz_dx)], axis=-1)
+        normals /= np.linalg.norm(normals, axis=-1, keepdims=True)
+
+        az = np.radians(light_azimuth)
+        alt = np.radians(light_altitude)
+        light = np.array([np.cos(alt) * np.cos(az),
+                          np.cos(alt) * np.sin(az),
+                          np.sin(alt)])
+
+        lit = np.clip(normals @ light, 0, 1)
+        self.hillshade = ambient + (1 - ambient) * lit
+
+    def _build_contours(self, n_contours: int, contour_alpha: float):
+        """Mark cells crossed by contour levels and fold them into the shading."""
+        levels = np.linspace(self.elevation.min(), self.elevation.max(),
+                             n_contours + 2)[1:-1]
+        band = np.digitize(self.elevation, levels)
+
+        crossing = np.zeros(band.shape, dtype=bool)
+        crossing[:, :-1] |= band[:, :-1] != band[:, 1:]
+        crossing[:-1, :] |= band[:-1, :] != band[1:, :]
+        self.contour_mask = crossing
+
+        # Per-frame colour is cell_rgb * multiplier + offset
+        blend = contour_alpha * crossing
+        self._color_multiplier = (self.hillshade * (1 - blend)).ravel()[:, None]
+        self._color_offset = (255.0 * blend).ravel()[:, None]
+
+    def shade_colors(self, cell_colors: np.ndarray) -> np.ndarray:
+        """
+        Apply cached hillshade and contours to per-cell colours.
+
+        Args:
+            cell_colors: (height, width, 3) colours, float in [0, 1] or uint8
+
+        Returns:
+            (height * width, 3) uint8 face colours
+        """
+        rgb = np.asarray(cell_colors)[..., :3].reshape(-1, 3).astype(np.float32)
+        if np.asarray(cell_colors).dtype != np.uint8:
+            rgb *= 255.0
+
+        shaded = rgb * self._color_multiplier + self._color_offset
+        return np.clip(shaded, 0, 255).astype(np.uint8)
+
+    def project(self, view: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Project mesh vertices to screen space.
+
+        Args:
+            view: (4, 4) world-to-camera matrix
+
+        Returns:
+            Tuple of (N, 2) pixel coordinates and (N,) camera depths
+        """
+        camera = self.vertices @ view.T
+        depth = -camera[:, 2]
+
+        safe_depth = np.where(depth > 1e-6, depth, np.nan)
+        width, height = self.resolution
+        screen_x = width / 2 + self.focal * camera[:, 0] / safe_depth
+        screen_y = height / 2 - self.focal * camera[:, 1] / safe_depth
+
+        return np.stack([screen_x, screen_y], axis=1), depth
+
+    def render(self,
+               cell_colors: np.ndarray,
+               camera: Optional[Dict] = None,
+               view: Optional[np.ndarray] = None,
+               out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Render one frame.
+
+        Args:
+            cell_colors: (height, width, 3) per-cell colours
+            camera: Camera dict with azimuth, elevation, distance, or a
+                camera path record carrying its view matrix
+            view: Precomputed (4, 4) view matrix (overrides camera)
+            out: Optional (H, W, 3) uint8 buffer to render into
+
+        Returns:
+            Frame as numpy array (RGB, uint8)
+        """
+        if view is None:
+            view = camera_view(camera)
+
+        width, height = self.resolution
+        if out is None:
+            out = np.empty((height, width, 3), dtype=np.uint8)
+        out[:] = self.background
+
+        face_colors = self.shade_colors(cell_colors)
+        screen, depth = self.project(view)
+        self._rasterize(screen, depth, face_colors, out)
+
+        return out
+
+    def _rasterize(self, screen: np.ndarray, depth: np.ndarray,
+                   face_colors: np.ndarray, out: np.ndarray):
+        """Painter's-algorithm rasterization of all visible triangles."""
+        width, height = self.resolution
+        tri_xy = screen[self.triangles]                       # (T, 3, 2)
+        tri_depth = depth[self.triangles].mean(axis=1)
+
+        # Drop triangles behind the camera or entirely off screen
+        valid = np.isfinite(tri_xy).all(axis=(1, 2))
+        lo = np.floor(tri_xy.min(axis=1))
+        hi = np.ceil(tri_xy.max(axis=1))
+        valid &= (hi[:, 0] >= 0) & (lo[:, 0] < width)
+        valid &= (hi[:, 1] >= 0) & (lo[:, 1] < height)
+
+        visible = np.flatnonzero(valid)
+        if visible.size == 0:
+            return
+
+        # Paint far triangles first: rank 0 is the farthest
+        order = visible[np.argsort(-tri_depth[visible], kind='stable')]
+        tri_xy = tri_xy[order]
+        colors = face_colors[self.triangle_cells[order]]
+
+        x0 = np.clip(lo[order, 0], 0, width - 1).astype(np.int64)
+        y0 = np.clip(lo[order, 1], 0, height - 1).astype(np.int64)
+        box_w = np.clip(hi[order, 0], 0, width - 1).astype(np.int64) - x0 + 1
+        box_h = np.clip(hi[order, 1], 0, height - 1).astype(np.int64) - y0 + 1
+
+        # Group triangles by power-of-two bounding box size
+        size_w = 1 << np.ceil(np.log2(box_w)).astype(np.int64)
+        size_h = 1 << np.ceil(np.log2(box_h)).astype(np.int64)
+
+        top_rank = np.full(width * height, -1, dtype=np.int64)
+        for sw, sh in set(zip(size_w.tolist(), size_h.tolist())):
+            members = np.flatnonzero((size_w == sw) & (size_h == sh))
+            batch = max(1, MAX_BATCH_FRAGMENTS // (sw * sh))
+            for start in range(0, members.size, batch):
+                ranks = members[start:start + batch]
+                self._splat(tri_xy[ranks], ranks, x0[ranks], y0[ranks],
+                            box_w[ranks], box_h[ranks], sw, sh, top_rank)
+
+        covered = top_rank >= 0
+        out.reshape(-1, 3)[covered] = colors[top_rank[covered]]
+
+    def _splat(self, tri_xy: np.ndarray, ranks: np.ndarray,
+               x0: np.ndarray, y0: np.ndarray,
+               box_w: np.ndarray, box_h: np.ndarray,
+               size_w: int, size_h: int, top_rank: np.ndarray):
+        """Evaluate coverage for a batch of same-sized triangle boxes."""
+        width = self.resolution[0]
+        off_y, off_x = np.divmod(np.arange(size_w * size_h), size_w)
+
+        inside_box = (off_x[None, :] < box_w[:, None]) & (off_y[None, :] < box_h[:, None])
+        px = x0[:, None] + off_x[None, :]
+        py = y0[:, None] + off_y[None, :]
+
+        # Edge functions at pixel centres, either winding counts as inside
+        cx = px + 0.5
+        cy = py + 0.5
+        a, b, c = tri_xy[:, 0], tri_xy[:, 1], tri_xy[:, 2]
+
+        def edge(p, q):
+            return ((q[:, 0] - p[:, 0])[:, None] * (cy - p[:, 1][:, None]) -
+                    (q[:, 1] - p[:, 1])[:, None] * (cx - p[:, 0][:, None]))
+
+        e0, e1, e2 = edge(b, c), edge(c, a), edge(a, b)
+        inside = ((e0 >= 0) & (e1 >= 0) & (e2 >= 0)) | ((e0 <= 0) & (e1 <= 0) & (e2 <= 0))
+        inside &= inside_box
+
+        tri_idx, frag_idx = np.nonzero(inside)
+        pixels = py[tri_idx, frag_idx] * width + px[tri_idx, frag_idx]
+        np.maximum.at(top_rank, pixels, ranks[tri_idx])
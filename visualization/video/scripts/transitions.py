@@ -1,132 +1,245 @@
 """
 Transition effects for video segments.
+
+All effects operate on uint8 RGB frames with vectorized fixed-point
+arithmetic. Masks are cached per resolution and progress, and every
+effect accepts an ``out`` buffer so frames can be modified in place.
 """
 import numpy as np
+from functools import lru_cache
 from typing import List, Tuple, Optional
 from scipy.ndimage import gaussian_filter
 
+# Blend weights are fixed-point integers in [0, WEIGHT_ONE]
+WEIGHT_SHIFT = 8
+WEIGHT_ONE = 1 << WEIGHT_SHIFT
+
+
+def _to_weight(alpha) -> np.ndarray:
+    """Convert blend factors in [0, 1] to fixed-point weights."""
+    return np.rint(np.clip(alpha, 0, 1) * WEIGHT_ONE).astype(np.uint16)
+
+
+def _output_buffer(frame: np.ndarray, out: Optional[np.ndarray]) -> np.ndarray:
+    """Return the buffer an effect writes into."""
+    if out is None:
+        return np.empty(frame.shape, dtype=np.uint8)
+    if out.shape != frame.shape or out.dtype != np.uint8:
+        raise ValueError(f"Output buffer must be uint8 with shape {frame.shape}")
+    return out
+
+
+def _scale(frame: np.ndarray, weight, out: np.ndarray) -> np.ndarray:
+    """out = frame * weight, with weight a scalar or a mask broadcast over channels."""
+    scaled = np.multiply(frame, weight, dtype=np.uint16)
+    np.right_shift(scaled, WEIGHT_SHIFT, out=out, casting='unsafe')
+    return out
+
+
+def _blend(frame1: np.ndarray, frame2: np.ndarray, weight,
+           out: np.ndarray) -> np.ndarray:
+    """out = frame1 * (1 - weight) + frame2 * weight in fixed point."""
+    weight = np.asarray(weight, dtype=np.uint16)
+    blended = np.multiply(frame1, WEIGHT_ONE - weight, dtype=np.uint16)
+    blended += np.multiply(frame2, weight, dtype=np.uint16)
+    np.right_shift(blended, WEIGHT_SHIFT, out=out, casting='unsafe')
+    return out
+
+
+@lru_cache(maxsize=256)
+def _wipe_ramp(length: int, split: int, edge_region: int) -> np.ndarray:
+    """Weight of the incoming frame along the wipe axis."""
+    position = np.arange(length) + 0.5
+    ramp = _to_weight((split - position) / edge_region + 0.5)
+    ramp.flags.writeable = False
+    return ramp
+
+
+def _wipe_along_axis(frame1: np.ndarray, frame2: np.ndarray, split: int,
+                     axis: int, edge_region: int, out: np.ndarray) -> np.ndarray:
+    """Reveal frame2 before split along axis, blending only the soft edge band."""
+    length = frame1.shape[axis]
+    if split <= 0:
+        np.copyto(out, frame1)
+        return out
+    if split >= length:
+        np.copyto(out, frame2)
+        return out
+
+    ramp = _wipe_ramp(length, split, edge_region)
+    band_start = max(0, split - edge_region)
+    band_end = min(length, split + edge_region)
+
+    def span(start, stop):
+        index = [slice(None)] * frame1.ndim
+        index[axis] = slice(start, stop)
+        return tuple(index)
+
+    out[span(None, band_start)] = frame2[span(None, band_start)]
+    if out is not frame1:
+        out[span(band_end, None)] = frame1[span(band_end, None)]
+
+    shape = [1] * frame1.ndim
+    shape[axis] = band_end - band_start
+    band = span(band_start, band_end)
+    _blend(frame1[band], frame2[band], ramp[band_start:band_end].reshape(shape),
+           out[band])
+    return out
+
+
+@lru_cache(maxsize=8)
+def _diagonal_index(height: int, width: int) -> np.ndarray:
+    """Normalised x + y position of every pixel."""
+    y, x = np.ogrid[:height, :width]
+    index = ((x + y) / (width + height)).astype(np.float32)
+    index.flags.writeable = False
+    return index
+
+
+@lru_cache(maxsize=64)
+def _diagonal_mask(height: int, width: int, progress: float) -> np.ndarray:
+    """Pixels already revealed by a diagonal wipe."""
+    mask = _diagonal_index(height, width) < progress
+    mask.flags.writeable = False
+    return mask
+
+
+@lru_cache(maxsize=16)
+def _vignette_mask(height: int, width: int, strength: float) -> np.ndarray:
+    """Radial vignette weights, broadcastable over colour channels."""
+    center_x, center_y = width // 2, height // 2
+    Y, X = np.ogrid[:height, :width]
+
+    # Calculate distance from center
+    dist = np.sqrt((X - center_x)**2 + (Y - center_y)**2)
+    max_dist = np.sqrt(center_x**2 + center_y**2)
+
+    mask = _to_weight(1 - (dist / max_dist) * strength)[:, :, None]
+    mask.flags.writeable = False
+    return mask
+
+
+@lru_cache(maxsize=32)
+def _motion_offsets(angle: float, strength: int) -> np.ndarray:
+    """Distinct pixel offsets covered by a motion blur line kernel."""
+    # Same rounding as rasterising the kernel into a (2s+1)^2 grid
+    steps = np.arange(-strength, strength + 1)
+    dx = (strength + steps * np.cos(np.radians(angle))).astype(int) - strength
+    dy = (strength + steps * np.sin(np.radians(angle))).astype(int) - strength
+    offsets = np.unique(np.stack([dy, dx], axis=1), axis=0)
+    offsets.flags.writeable = False
+    return offsets
+
 
 class TransitionEffects:
     """Create smooth transitions between video segments."""
-    
+
     def cross_fade(self,
                    frame1: np.ndarray,
                    frame2: np.ndarray,
-                   progress: float) -> np.ndarray:
+                   progress: float,
+                   out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Smooth cross-fade between scenes.
-        
+
         Args:
             frame1: First frame
             frame2: Second frame
             progress: Transition progress (0-1)
-            
+            out: Optional uint8 buffer for the result (may be frame1)
+
         Returns:
             Blended frame
         """
         # Ensure frames have same shape
         assert frame1.shape == frame2.shape, "Frames must have same dimensions"
-        
-        # Linear interpolation
-        alpha = progress
-        blended = (1 - alpha) * frame1 + alpha * frame2
-        
-        return blended.astype(np.uint8)
-    
+
+        out = _output_buffer(frame1, out)
+        return _blend(frame1, frame2, _to_weight(progress), out)
+
     def split_screen_wipe(self,
                          frame1: np.ndarray,
                          frame2: np.ndarray,
                          progress: float,
-                         direction: str = 'horizontal') -> np.ndarray:
+                         direction: str = 'horizontal',
+                         edge_region: int = 5,
+                         out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Wipe transition for split-screen reveal.
-        
+
         Args:
             frame1: First frame
             frame2: Second frame
             progress: Transition progress (0-1)
             direction: 'horizontal', 'vertical', 'diagonal'
-            
+            edge_region: Width in pixels of the soft wipe edge
+            out: Optional uint8 buffer for the result (may be frame1)
+
         Returns:
             Transition frame
         """
         height, width = frame1.shape[:2]
-        result = frame1.copy()
-        
+        out = _output_buffer(frame1, out)
+
         if direction == 'horizontal':
             # Wipe from left to right
-            split_x = int(width * progress)
-            result[:, :split_x] = frame2[:, :split_x]
-            
-            # Add edge blur for smoother transition
-            if 0 < split_x < width - 5:
-                edge_region = 5
-                for i in range(edge_region):
-                    alpha = i / edge_region
-                    x = split_x - edge_region // 2 + i
-                    if 0 <= x < width:
-                        result[:, x] = (1 - alpha) * frame1[:, x] + alpha * frame2[:, x]
-        
+            _wipe_along_axis(frame1, frame2, int(width * progress), 1,
+                             edge_region, out)
+
         elif direction == 'vertical':
             # Wipe from top to bottom
-            split_y = int(height * progress)
-            result[:split_y, :] = frame2[:split_y, :]
-            
-            # Add edge blur
-            if 0 < split_y < height - 5:
-                edge_region = 5
-                for i in range(edge_region):
-                    alpha = i / edge_region
-                    y = split_y - edge_region // 2 + i
-                    if 0 <= y < height:
-                        result[y, :] = (1 - alpha) * frame1[y, :] + alpha * frame2[y, :]
-        
+            _wipe_along_axis(frame1, frame2, int(height * progress), 0,
+                             edge_region, out)
+
         elif direction == 'diagonal':
             # Diagonal wipe from top-left to bottom-right
-            for y in range(height):
-                for x in range(width):
-                    if (x + y) / (width + height) < progress:
-                        result[y, x] = frame2[y, x]
-        
-        return result.astype(np.uint8)
-    
+            mask = _diagonal_mask(height, width, round(float(progress), 4))
+            if out is not frame1:
+                np.copyto(out, frame1)
+            np.copyto(out, frame2, where=mask[:, :, None])
+
+        else:
+            np.copyto(out, frame1)
+
+        return out
+
     def zoom_transition(self,
                        frames: List[np.ndarray],
                        zoom_center: Tuple[int, int],
                        zoom_factor: float = 2.0) -> List[np.ndarray]:
         """
         Zoom in/out transition centered on specific point.
-        
+
         Args:
             frames: List of frames to apply zoom
             zoom_center: (x, y) center point for zoom
             zoom_factor: Maximum zoom level
-            
+
         Returns:
             List of zoomed frames
         """
         zoomed_frames = []
         n_frames = len(frames)
-        
+
         for i, frame in enumerate(frames):
             # Calculate zoom level for this frame
             progress = i / (n_frames - 1) if n_frames > 1 else 0
-            
+
             # Smooth zoom curve (ease in-out)
             t = progress
             if t < 0.5:
                 zoom_progress = 2 * t * t
             else:
                 zoom_progress = 1 - 2 * (1 - t) * (1 - t)
-            
+
             current_zoom = 1 + (zoom_factor - 1) * zoom_progress
-            
+
             # Apply zoom
             zoomed = self._apply_zoom(frame, zoom_center, current_zoom)
             zoomed_frames.append(zoomed)
-        
+
         return zoomed_frames
-    
+
     def _apply_zoom(self,
                    frame: np.ndarray,
                    center: Tuple[int, int],
@@ -134,149 +247,148 @@ class TransitionEffects:
         """Apply zoom transformation to frame."""
         height, width = frame.shape[:2]
         cx, cy = center
-        
+
         # Calculate crop region
         crop_width = int(width / zoom)
         crop_height = int(height / zoom)
-        
+
         x1 = max(0, cx - crop_width // 2)
         y1 = max(0, cy - crop_height // 2)
         x2 = min(width, x1 + crop_width)
         y2 = min(height, y1 + crop_height)
-        
+
         # Crop and resize
         cropped = frame[y1:y2, x1:x2]
-        
+
         # Resize back to original dimensions
         from scipy.ndimage import zoom as scipy_zoom
         zoom_y = height / cropped.shape[0]
         zoom_x = width / cropped.shape[1]
-        
+
         zoomed = scipy_zoom(cropped, (zoom_y, zoom_x, 1), order=1)
-        
+
         # Ensure correct shape
         if zoomed.shape[0] > height:
             zoomed = zoomed[:height]
         if zoomed.shape[1] > width:
             zoomed = zoomed[:, :width]
-        
+
         return zoomed.astype(np.uint8)
-    
+
     def fade_to_black(self,
                      frame: np.ndarray,
-                     progress: float) -> np.ndarray:
+                     progress: float,
+                     out: Optional[np.ndarray] = None) -> np.ndarray:
         """Fade frame to black."""
-        faded = frame * (1 - progress)
-        return faded.astype(np.uint8)
-    
+        out = _output_buffer(frame, out)
+        return _scale(frame, _to_weight(1 - progress), out)
+
     def fade_from_black(self,
                        frame: np.ndarray,
-                       progress: float) -> np.ndarray:
+                       progress: float,
+                       out: Optional[np.ndarray] = None) -> np.ndarray:
         """Fade in from black."""
-        faded = frame * progress
-        return faded.astype(np.uint8)
-    
+        out = _output_buffer(frame, out)
+        return _scale(frame, _to_weight(progress), out)
+
     def apply_vignette(self,
                       frame: np.ndarray,
-                      strength: float = 0.5) -> np.ndarray:
+                      strength: float = 0.5,
+                      out: Optional[np.ndarray] = None) -> np.ndarray:
         """Apply vignette effect to frame."""
         height, width = frame.shape[:2]
-        
-        # Create radial gradient
-        center_x, center_y = width // 2, height // 2
-        Y, X = np.ogrid[:height, :width]
-        
-        # Calculate distance from center
-        dist = np.sqrt((X - center_x)**2 + (Y - center_y)**2)
-        max_dist = np.sqrt(center_x**2 + center_y**2)
-        
-        # Create vignette mask
-        vignette = 1 - (dist / max_dist) * strength
-        vignette = np.clip(vignette, 0, 1)
-        
-        # Apply vignette
-        result = frame.copy()
-        for i in range(3):  # Apply to each color channel
-            result[:, :, i] = (frame[:, :, i] * vignette).astype(np.uint8)
-        
-        return result
-    
+        out = _output_buffer(frame, out)
+
+        mask = _vignette_mask(height, width, round(float(strength), 4))
+        return _scale(frame, mask, out)
+
     def create_split_screen(self,
                            frame1: np.ndarray,
                            frame2: np.ndarray,
                            split_type: str = 'vertical',
-                           divider_width: int = 4) -> np.ndarray:
+                           divider_width: int = 4,
+                           out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Create split screen composition.
-        
+
         Args:
             frame1: Left/top frame
             frame2: Right/bottom frame
             split_type: 'vertical' or 'horizontal'
             divider_width: Width of divider line
-            
+            out: Optional uint8 buffer for the result (may be frame1)
+
         Returns:
             Split screen frame
         """
         height, width = frame1.shape[:2]
-        
+        out = _output_buffer(frame1, out)
+        half = divider_width // 2
+
         if split_type == 'vertical':
             # Vertical split
             split_x = width // 2
-            result = np.zeros_like(frame1)
-            
+
             # Left side
-            result[:, :split_x - divider_width//2] = frame1[:, :split_x - divider_width//2]
-            
+            if out is not frame1:
+                out[:, :split_x - half] = frame1[:, :split_x - half]
+
             # Right side
-            result[:, split_x + divider_width//2:] = frame2[:, split_x + divider_width//2:]
-            
+            out[:, split_x + half:] = frame2[:, split_x + half:]
+
             # Divider
-            result[:, split_x - divider_width//2:split_x + divider_width//2] = 255
-        
+            out[:, split_x - half:split_x + half] = 255
+
         elif split_type == 'horizontal':
             # Horizontal split
             split_y = height // 2
-            result = np.zeros_like(frame1)
-            
+
             # Top
-            result[:split_y - divider_width//2, :] = frame1[:split_y - divider_width//2, :]
-            
+            if out is not frame1:
+                out[:split_y - half, :] = frame1[:split_y - half, :]
+
             # Bottom
-            result[split_y + divider_width//2:, :] = frame2[split_y + divider_width//2:, :]
-            
+            out[split_y + half:, :] = frame2[split_y + half:, :]
+
             # Divider
-            result[split_y - divider_width//2:split_y + divider_width//2, :] = 255
-        
-        return result.astype(np.uint8)
-    
+            out[split_y - half:split_y + half, :] = 255
+
+        else:
+            out[:] = 0
+
+        return out
+
     def apply_motion_blur(self,
                          frame: np.ndarray,
                          angle: float = 0,
-                         strength: int = 10) -> np.ndarray:
-        """Apply directional motion blur."""
-        # Create motion blur kernel
-        kernel_size = strength * 2 + 1
-        kernel = np.zeros((kernel_size, kernel_size))
-        
-        # Calculate kernel values based on angle
-        center = kernel_size // 2
-        cos_angle = np.cos(np.radians(angle))
-        sin_angle = np.sin(np.radians(angle))
-        
-        for i in range(kernel_size):
-            x = int(center + (i - center) * cos_angle)
-            y = int(center + (i - center) * sin_angle)
-            if 0 <= x < kernel_size and 0 <= y < kernel_size:
-                kernel[y, x] = 1
-        
-        kernel /= kernel.sum()
-        
-        # Apply blur
-        from scipy.ndimage import convolve
-        blurred = np.zeros_like(frame)
-        
-        for i in range(3):  # Apply to each channel
-            blurred[:, :, i] = convolve(frame[:, :, i], kernel)
-        
-        return blurred.astype(np.uint8)
\ No newline at end of file
+                         strength: int = 10,
+                         out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Apply directional motion blur.
+
+        The blur averages the frame along a line kernel, accumulating one
+        shifted view per distinct kernel offset.
+        """
+        out = _output_buffer(frame, out)
+        if strength <= 0:
+            np.copyto(out, frame)
+            return out
+
+        height, width = frame.shape[:2]
+        offsets = _motion_offsets(float(angle), int(strength))
+        pad = int(np.abs(offsets).max())
+
+        # Mirror edges like scipy.ndimage.convolve's default 'reflect' mode
+        padded = np.pad(frame, ((pad, pad), (pad, pad), (0, 0)), mode='symmetric')
+
+        accumulator = np.zeros(frame.shape, dtype=np.uint16)
+        for dy, dx in offsets:
+            # Convolution samples the input at p - offset
+            y0, x0 = pad - dy, pad - dx
+            accumulator += padded[y0:y0 + height, x0:x0 + width]
+
+        n_taps = len(offsets)
+        accumulator += n_taps // 2
+        np.floor_divide(accumulator, n_taps, out=out, casting='unsafe')
+
+        return out
@@ -3,13 +3,87 @@ Video assembly using FFmpeg for final video creation.
 """
 import subprocess
 import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Dict, Tuple
+from typing import Callable, Hashable, List, Optional, Dict, Tuple, Iterable
 import numpy as np
 from PIL import Image
 import json
 
 
+def split_concat_entries(entries: List[Tuple[Hashable, int]],
+                         boundaries: Iterable[int] = (),
+                         chunk_frames: Optional[int] = None,
+                         gop_size: Optional[int] = None) -> List[List[Tuple[Hashable, int]]]:
+    """
+    Split (frame, frame count) entries into independently encodable chunks.
+    
+    Args:
+        entries: (frame or frame number, number of frames) in playback order
+        boundaries: Entry indices that must start a new chunk (segment starts)
+        chunk_frames: Maximum frames per chunk (default: no limit)
+        gop_size: Keyframe interval; chunk_frames is rounded up to a multiple
+            (with a warning) so chunk cuts fall on GOP boundaries
+        
+    Returns:
+        Chunks of entries; held frames are split where a cut falls inside them
+    """
+    if chunk_frames and gop_size and chunk_frames % gop_size:
+        rounded = -(-chunk_frames // gop_size) * gop_size
+        print(f"Warning: chunk_frames={chunk_frames} is not a multiple of the "
+              f"GOP size {gop_size}; using {rounded} frames per chunk")
+        chunk_frames = rounded
+    
+    boundaries = set(boundaries)
+    chunks = []
+    current = []
+    current_frames = 0
+    for i, (path, count) in enumerate(entries):
+        if i in boundaries and current:
+            chunks.append(current)
+            current, current_frames = [], 0
+        
+        while count > 0:
+            take = count
+            if chunk_frames:
+                take = min(count, chunk_frames - current_frames)
+            current.append((path, take))
+            current_frames += take
+            count -= take
+            
+            if chunk_frames and current_frames == chunk_frames:
+                chunks.append(current)
+                current, current_frames = [], 0
+    
+    if current:
+        chunks.append(current)
+    
+    return chunks
+
+
+def sequence_numbers(frame_directory: str, frame_pattern: str) -> List[int]:
+    """
+    Frame numbers of the images matching a printf-style pattern, sorted.
+    
+    Args:
+        frame_directory: Directory containing frame images
+        frame_pattern: Pattern such as frame_%06d.png
+    """
+    match = re.search(r'%0?(\d*)d', frame_pattern)
+    prefix, suffix = frame_pattern[:match.start()], frame_pattern[match.end():]
+    digits = rf'\d{{{match.group(1)}}}' if match.group(1) else r'\d+'
+    name_pattern = re.compile(re.escape(prefix) + f'({digits})' + re.escape(suffix))
+    
+    numbers = []
+    for path in Path(frame_directory).iterdir():
+        name_match = name_pattern.fullmatch(path.name)
+        if name_match:
+            numbers.append(int(name_match.group(1)))
+    return sorted(numbers)
+
+
 class VideoConfig:
     """Video configuration settings."""
     
@@ -28,6 +102,112 @@ class VideoConfig:
         self.pixel_format = pixel_format
 
 
+class FrameStreamEncoder:
+    """Pipe raw RGB frames straight into an FFmpeg process."""
+    
+    def __init__(self, output_path: str, video_config: Optional[VideoConfig] = None,
+                 extra_args: Optional[List[str]] = None):
+        """
+        Args:
+            output_path: Output video file path
+            video_config: Video configuration
+            extra_args: Additional FFmpeg output options (GOP size, threads, ...)
+        """
+        self.output_path = str(output_path)
+        self.video_config = video_config or VideoConfig()
+        self.extra_args = extra_args or []
+        self.frames_written = 0
+        self._process = None
+        self._frame_shape = None
+    
+    def _build_command(self, width: int, height: int) -> List[str]:
+        """Build FFmpeg command reading rgb24 frames from stdin."""
+        config = self.video_config
+        return [
+            'ffmpeg',
+            '-y',  # Overwrite output
+            '-loglevel', 'error',  # Keep the stderr pipe from filling up
+            '-f', 'rawvideo',
+            '-pix_fmt', 'rgb24',
+            '-s', f'{width}x{height}',
+            '-framerate', str(config.fps),
+            '-i', '-',
+            '-c:v', config.codec,
+            '-preset', config.preset,
+            '-crf', str(config.crf),
+            '-pix_fmt', config.pixel_format,
+            '-movflags', '+faststart',  # Web optimization
+            *self.extra_args,
+            self.output_path
+        ]
+    
+    def _start(self, frame: np.ndarray):
+        """Start FFmpeg sized to the first frame."""
+        height, width = frame.shape[:2]
+        self._frame_shape = frame.shape
+        self._process = subprocess.Popen(
+            self._build_command(width, height),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+    
+    def write_frame(self, frame: np.ndarray, count: int = 1):
+        """
+        Append a frame to the video.
+        
+        Args:
+            frame: RGB frame, uint8 or float in [0, 1]
+            count: Number of consecutive frames to hold it for
+        """
+        if frame.dtype != np.uint8:
+            frame = (frame * 255).astype(np.uint8)
+        frame = frame[:, :, :3]
+        
+        if self._process is None:
+            self._start(frame)
+        elif frame.shape != self._frame_shape:
+            raise ValueError(f"Frame shape {frame.shape} != {self._frame_shape}")
+        
+        data = np.ascontiguousarray(frame).data
+        for _ in range(count):
+            self._process.stdin.write(data)
+        self.frames_written += count
+    
+    def close(self) -> bool:
+        """
+        Finish encoding.
+        
+        Returns:
+            Success status
+        """
+        if self._process is None:
+            return False
+        
+        self._process.stdin.close()
+        stderr = self._process.stderr.read().decode(errors='replace')
+        returncode = self._process.wait()
+        self._process = None
+        
+        if returncode != 0:
+            print(f"FFmpeg error: {stderr}")
+            return False
+        
+        return True
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if self._process is not None:
+            if exc_type is None:
+                self.close()
+            else:
+                self._process.kill()
+                self._process.wait()
+                self._process = None
+
+
 class VideoAssembler:
     """Assemble frames into final video using FFmpeg."""
     
@@ -74,7 +254,9 @@ class VideoAssembler:
                             frame_directory: str,
                             output_path: str,
                             video_config: VideoConfig,
-                            frame_pattern: str = "frame_%06d.png") -> bool:
+                            frame_pattern: str = "frame_%06d.png",
+                            workers: int = 1,
+                            chunk_frames: int = 300) -> bool:
         """
         Use FFmpeg to create final video from frames.
         
@@ -83,13 +265,35 @@ class VideoAssembler:
             output_path: Output video file path
             video_config: Video configuration
             frame_pattern: Pattern for frame filenames
+            workers: Concurrent encoders; above 1 the frames are encoded in
+                chunks and joined without re-encoding
+            chunk_frames: Frames per chunk when workers > 1
             
         Returns:
             Success status
         """
-        # Construct FFmpeg command
         input_pattern = str(Path(frame_directory) / frame_pattern)
         
+        if workers > 1:
+            numbers = sequence_numbers(frame_directory, frame_pattern)
+            if not numbers:
+                print(f"No frames matching {frame_pattern} in {frame_directory}")
+                return False
+            if numbers != list(range(numbers[0], numbers[0] + len(numbers))):
+                print(f"Frame numbers in {frame_directory} are not contiguous")
+                return False
+            
+            chunks = split_concat_entries([(n, 1) for n in numbers],
+                                          chunk_frames=chunk_frames,
+                                          gop_size=video_config.fps)
+            report = self.encode_chunks_parallel(
+                input_pattern, [(chunk[0][0], len(chunk)) for chunk in chunks],
+                output_path, video_config, workers
+            )
+            return report is not None
+        
+        # Construct FFmpeg command
+        
         ffmpeg_cmd = [
             'ffmpeg',
             '-y',  # Overwrite output
@@ -157,6 +361,286 @@ class VideoAssembler:
         else:
             return None
     
+    def stream_video(self,
+                     frames: Iterable[np.ndarray],
+                     output_name: str,
+                     video_config: Optional[VideoConfig] = None) -> Optional[str]:
+        """
+        Encode frames as they are produced, without intermediate images.
+        
+        Args:
+            frames: Iterable of frames, or of (frame, hold count) pairs
+            output_name: Output video filename (without extension)
+            video_config: Video configuration
+            
+        Returns:
+            Path to created video
+        """
+        output_path = self.output_dir / f"{output_name}.mp4"
+        
+        try:
+            with FrameStreamEncoder(str(output_path), video_config) as encoder:
+                reported = 0
+                for item in frames:
+                    # Items are frames or (frame, hold count) pairs
+                    frame, count = item if isinstance(item, tuple) else (item, 1)
+                    encoder.write_frame(frame, count)
+                    
+                    if encoder.frames_written - reported >= 100:
+                        reported = encoder.frames_written
+                        print(f"Encoded frame {encoder.frames_written}")
+                
+                success = encoder.close()
+        except FileNotFoundError:
+            print("FFmpeg not found. Please install FFmpeg.")
+            return None
+        except BrokenPipeError:
+            print("FFmpeg terminated unexpectedly")
+            return None
+        
+        if success:
+            print(f"Video created successfully: {output_path}")
+            return str(output_path)
+        
+        return None
+    
+    def create_video_from_runs(self,
+                               runs: Iterable[Tuple[np.ndarray, int]],
+                               output_name: str,
+                               video_config: Optional[VideoConfig] = None) -> Optional[str]:
+        """
+        Create video from distinct frames and their hold counts.
+        
+        Each distinct frame is piped to the encoder once with its repeat
+        count, so holds are exact to the frame and no images are written.
+        
+        Args:
+            runs: Iterable of (frame, number of frames to hold it for)
+            output_name: Output video filename (without extension)
+            video_config: Video configuration
+            
+        Returns:
+            Path to created video
+        """
+        return self.stream_video(((frame, count) for frame, count in runs),
+                                 output_name, video_config)
+    
+    def encode_chunks_parallel(self,
+                               input_pattern: str,
+                               chunks: List[Tuple[int, int]],
+                               output_path: str,
+                               video_config: VideoConfig,
+                               workers: Optional[int] = None,
+                               work_dir: Optional[str] = None) -> Optional[Dict]:
+        """
+        Encode chunks of an image sequence with concurrent FFmpeg processes and join them.
+        
+        Every chunk starts with a keyframe and is encoded with identical
+        settings, so the results are joined by stream copy.
+        
+        Args:
+            input_pattern: Numbered image path pattern, e.g. frame_%06d.png
+            chunks: (first frame number, number of frames) per chunk
+            output_path: Output video file path
+            video_config: Video configuration
+            workers: Concurrent FFmpeg processes (default: CPU count)
+            work_dir: Directory for chunk files (default: next to the output)
+            
+        Returns:
+            Timing report with 'chunks', 'workers', 'frames', 'wall_time'
+            and 'encode_time' (summed per-chunk time), or None on failure
+        """
+        workers = workers or os.cpu_count() or 1
+        work_dir = Path(work_dir) if work_dir else Path(output_path).parent
+        work_dir.mkdir(parents=True, exist_ok=True)
+        stem = Path(output_path).stem
+        
+        # One-second GOPs line up with cuts from split_concat_entries(gop_size=fps);
+        # the cores are shared between encoders instead of oversubscribed
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        
+        jobs = [(start_number, work_dir / f"{stem}_chunk_{i:04d}.mp4", n_frames)
+                for i, (start_number, n_frames) in enumerate(chunks)]
+        
+        def encode(job):
+            start_number, chunk_path, n_frames = job
+            start = time.perf_counter()
+            result = subprocess.run([
+                'ffmpeg',
+                '-y',  # Overwrite output
+                '-framerate', str(video_config.fps),
+                '-start_number', str(start_number),
+                '-i', str(input_pattern),
+                '-frames:v', str(n_frames),
+                '-c:v', video_config.codec,
+                '-preset', video_config.preset,
+                '-crf', str(video_config.crf),
+                '-pix_fmt', video_config.pixel_format,
+                '-g', str(video_config.fps),
+                '-threads', str(threads),
+                '-movflags', '+faststart',  # Web optimization
+                str(chunk_path)
+            ], capture_output=True, text=True)
+            error = result.stderr if result.returncode != 0 else None
+            return error, time.perf_counter() - start
+        
+        results = self._run_chunk_jobs(jobs, encode, workers)
+        return self._join_chunks(jobs, results, output_path, workers)
+    
+    def encode_frame_chunks_parallel(self,
+                                     chunks: List[List[Tuple[Hashable, int]]],
+                                     render: Callable[[Hashable], np.ndarray],
+                                     output_path: str,
+                                     video_config: VideoConfig,
+                                     workers: Optional[int] = None,
+                                     work_dir: Optional[str] = None) -> Optional[Dict]:
+        """
+        Encode chunks of rendered frames with concurrent FFmpeg processes and join them.
+        
+        Like encode_chunks_parallel, but frames are produced in memory and
+        piped to each encoder with their repeat counts, so no images are
+        written.
+        
+        Args:
+            chunks: Chunks of (frame description, frame count) entries, e.g.
+                from split_concat_entries
+            render: Thread-safe function returning the RGB frame of a
+                description
+            output_path: Output video file path
+            video_config: Video configuration
+            workers: Concurrent FFmpeg processes (default: CPU count)
+            work_dir: Directory for chunk files (default: next to the output)
+            
+        Returns:
+            Timing report as from encode_chunks_parallel, or None on failure
+        """
+        workers = workers or os.cpu_count() or 1
+        work_dir = Path(work_dir) if work_dir else Path(output_path).parent
+        work_dir.mkdir(parents=True, exist_ok=True)
+        stem = Path(output_path).stem
+        
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        extra_args = ['-g', str(video_config.fps), '-threads', str(threads)]
+        
+        jobs = [(chunk, work_dir / f"{stem}_chunk_{i:04d}.mp4",
+                 sum(count for _, count in chunk))
+                for i, chunk in enumerate(chunks)]
+        
+        def encode(job):
+            chunk, chunk_path, _ = job
+            start = time.perf_counter()
+            error = None
+            try:
+                with FrameStreamEncoder(chunk_path, video_config, extra_args) as encoder:
+                    for description, count in chunk:
+                        encoder.write_frame(render(description), count)
+                    if not encoder.close():
+                        error = "encoder failed"
+            except BrokenPipeError:
+                error = "FFmpeg terminated unexpectedly"
+            return error, time.perf_counter() - start
+        
+        results = self._run_chunk_jobs(jobs, encode, workers)
+        return self._join_chunks(jobs, results, output_path, workers)
+    
+    def _run_chunk_jobs(self, jobs: List[Tuple], encode: Callable,
+                        workers: int) -> Optional[Tuple[List, float]]:
+        """
+        Run chunk encodes on a thread pool.
+        
+        Returns:
+            ((error or None, elapsed) per job, start time), or None when
+            FFmpeg is missing
+        """
+        print(f"Encoding {len(jobs)} chunks with {workers} concurrent encoders...")
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(encode, jobs)), start
+        except FileNotFoundError:
+            print("FFmpeg not found. Please install FFmpeg.")
+            return None
+    
+    def _join_chunks(self, jobs: List[Tuple], run: Optional[Tuple[List, float]],
+                     output_path: str, workers: int) -> Optional[Dict]:
+        """Join encoded chunks by stream copy and report timings."""
+        if run is None:
+            return None
+        results, start = run
+        
+        success = True
+        for (_, chunk_path, _), (error, _) in zip(jobs, results):
+            if error is not None:
+                print(f"FFmpeg error in {chunk_path.name}: {error}")
+                success = False
+        
+        chunk_paths = [str(chunk_path) for _, chunk_path, _ in jobs]
+        if success:
+            success = self.concat_chunks(chunk_paths, str(output_path))
+        wall_time = time.perf_counter() - start
+        
+        for path in chunk_paths:
+            Path(path).unlink(missing_ok=True)
+        
+        if not success:
+            return None
+        
+        report = {
+            'chunks': len(jobs),
+            'workers': workers,
+            'frames': sum(n_frames for _, _, n_frames in jobs),
+            'wall_time': wall_time,
+            'encode_time': sum(elapsed for _, elapsed in results)
+        }
+        print(f"Encoded {report['frames']} frames in {wall_time:.1f}s wall time "
+              f"({report['encode_time']:.1f}s summed over chunks)")
+        return report
+    
+    def concat_chunks(self, chunk_paths: List[str], output_path: str) -> bool:
+        """
+        Join encoded chunks into one video without re-encoding.
+        
+        Args:
+            chunk_paths: Chunk files in playback order, all encoded with the
+                same settings
+            output_path: Output video file path
+        
+        Returns:
+            Success status
+        """
+        concat_list = Path(output_path).with_suffix('.chunks.txt')
+        lines = []
+        for path in chunk_paths:
+            escaped = str(Path(path).resolve()).replace("'", "'\\''")
+            lines.append(f"file '{escaped}'")
+        concat_list.write_text('\n'.join(lines) + '\n')
+        
+        ffmpeg_cmd = [
+            'ffmpeg',
+            '-y',  # Overwrite output
+            '-f', 'concat',
+            '-safe', '0',
+            '-i', str(concat_list),
+            '-c', 'copy',  # Stream copy, no re-encoding
+            '-movflags', '+faststart',  # Web optimization
+            output_path
+        ]
+        
+        try:
+            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+        except FileNotFoundError:
+            print("FFmpeg not found. Please install FFmpeg.")
+            return False
+        finally:
+            concat_list.unlink(missing_ok=True)
+        
+        if result.returncode != 0:
+            print(f"FFmpeg error: {result.stderr}")
+            return False
+        
+        print(f"Joined {len(chunk_paths)} chunks into {output_path}")
+        return True
+    
     def add_post_processing(self,
                            video_path: str,
                            output_path: Optional[str] = None) -> bool:
@@ -205,14 +689,21 @@ class VideoAssembler:
     def create_video_variants(self,
                              video_path: str,
                              create_webm: bool = True,
-                             create_gif: bool = True) -> Dict[str, str]:
+                             create_gif: bool = True,
+                             create_thumbnails: bool = False,
+                             thumbnail_interval: float = 5.0) -> Dict[str, str]:
         """
         Create different format variants of the video.
         
+        The source is decoded once; a split filter graph fans the frames
+        out to every requested output in the same FFmpeg run.
+        
         Args:
             video_path: Source video path
             create_webm: Create WebM version
             create_gif: Create GIF preview
+            create_thumbnails: Create JPEG thumbnails
+            thumbnail_interval: Seconds between thumbnails
             
         Returns:
             Dictionary of format -> path
@@ -220,37 +711,67 @@ class VideoAssembler:
         variants = {'mp4': video_path}
         base_path = video_path.replace('.mp4', '')
         
+        # (filter chain from the split source, output label, output arguments)
+        branches = []
+        
         if create_webm:
             webm_path = f"{base_path}.webm"
-            webm_cmd = [
-                'ffmpeg', '-y', '-i', video_path,
+            branches.append(('null', 'webm', [
                 '-c:v', 'libvpx-vp9',
                 '-crf', '30',
                 '-b:v', '0',
                 webm_path
-            ]
-            
-            try:
-                subprocess.run(webm_cmd, capture_output=True)
-                variants['webm'] = webm_path
-            except:
-                print("Failed to create WebM variant")
+            ]))
         
         if create_gif:
             gif_path = f"{base_path}_preview.gif"
-            # Create smaller GIF preview (480p, 10fps)
-            gif_cmd = [
-                'ffmpeg', '-y', '-i', video_path,
-                '-vf', 'fps=10,scale=480:-1:flags=lanczos',
-                '-c:v', 'gif',
-                gif_path
-            ]
-            
-            try:
-                subprocess.run(gif_cmd, capture_output=True)
-                variants['gif'] = gif_path
-            except:
-                print("Failed to create GIF variant")
+            # Smaller GIF preview (480p, 10fps) with a palette fitted to the video
+            branches.append((
+                'fps=10,scale=480:-1:flags=lanczos,split[gif_a][gif_b];'
+                '[gif_a]palettegen=stats_mode=diff[gif_palette];'
+                '[gif_b][gif_palette]paletteuse=dither=bayer:bayer_scale=3',
+                'gif', [gif_path]
+            ))
+        
+        if create_thumbnails:
+            thumbnail_pattern = f"{base_path}_thumb_%03d.jpg"
+            branches.append((
+                f'fps=1/{thumbnail_interval},scale=320:-1:flags=lanczos',
+                'thumbnails', ['-q:v', '3', thumbnail_pattern]
+            ))
+        
+        if not branches:
+            return variants
+        
+        # One decode, split into a labelled stream per output
+        labels = ''.join(f'[src_{label}]' for _, label, _ in branches)
+        graph = [f'[0:v]split={len(branches)}{labels}']
+        for chain, label, _ in branches:
+            graph.append(f'[src_{label}]{chain}[{label}]')
+        
+        ffmpeg_cmd = ['ffmpeg', '-y', '-i', video_path,
+                      '-filter_complex', ';'.join(graph)]
+        for _, label, output_args in branches:
+            ffmpeg_cmd += ['-map', f'[{label}]'] + output_args
+        
+        try:
+            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+        except FileNotFoundError:
+            print("FFmpeg not found. Please install FFmpeg.")
+            return variants
+        
+        if result.returncode != 0:
+            print(f"Failed to create video variants: {result.stderr}")
+            return variants
+        
+        if create_webm:
+            variants['webm'] = webm_path
+        if create_gif:
+            variants['gif'] = gif_path
+        if create_thumbnails:
+            thumbnails = sorted(Path(base_path).parent.glob(f"{Path(base_path).name}_thumb_*.jpg"))
+            for i, thumbnail in enumerate(thumbnails):
+                variants[f'thumbnail_{i:03d}'] = str(thumbnail)
         
         return variants
     
@@ -6,20 +6,78 @@ Generates realistic 3D views with clear fire state visualization
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
-from matplotlib.colors import LinearSegmentedColormap, ListedColormap
+from matplotlib.colors import LinearSegmentedColormap, ListedColormap, LightSource
 from matplotlib import cm
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from pathlib import Path
 import matplotlib.patches as mpatches
 from scipy.ndimage import gaussian_filter
+from typing import NamedTuple
 import warnings
 warnings.filterwarnings('ignore')
 
+# Decoded cell state codes; OTHER covers states without a colour
+EMPTY, TREE, BURNING, BURNT, OTHER = range(5)
+STATE_CODES = {'empty': EMPTY, 'tree': TREE, 'burnt': BURNT}
+
+# RGBA colour per state code (burning cells are coloured by intensity)
+STATE_COLOR_LUT = np.array([
+    [0.95, 0.95, 0.95, 0.3],   # Empty: very light gray, mostly transparent
+    [0.1, 0.5, 0.1, 0.9],      # Tree: forest green
+    [1.0, 0.6, 0.0, 0.95],     # Burning: orange fire
+    [0.3, 0.2, 0.15, 0.9],     # Burnt: dark brown
+    [1.0, 1.0, 1.0, 1.0]       # Other: white
+])
+
+# Intensity the exporter writes for every burning cell ('burning_0.5'),
+# which keeps the plain orange above instead of the intensity gradient
+DEFAULT_BURNING_INTENSITY = 0.5
+
+# Light source mplot3d shades surfaces with by default
+SURFACE_LIGHT = LightSource(azdeg=225, altdeg=19.4712)
+
+class FrameStates(NamedTuple):
+    """Decoded cell states of a frame, indexed [y, x]"""
+    states: np.ndarray      # uint8 state codes
+    intensity: np.ndarray   # float32 fire intensity, 0 for non-burning cells
+
+def surface_shading(X, Y, Z):
+    """Brightness factor mplot3d's shade=True gives each quad of a stride-1 surface"""
+    # Quad normal from its first three perimeter corners, as mplot3d does
+    v1 = np.stack([X[:-1, :-1] - X[:-1, 1:], Y[:-1, :-1] - Y[:-1, 1:],
+                   Z[:-1, :-1] - Z[:-1, 1:]], axis=-1)
+    v2 = np.stack([X[:-1, 1:] - X[1:, 1:], Y[:-1, 1:] - Y[1:, 1:],
+                   Z[:-1, 1:] - Z[1:, 1:]], axis=-1)
+    normals = np.cross(v1, v2).reshape(-1, 3)
+    shade = (normals / np.linalg.norm(normals, axis=1, keepdims=True)) @ SURFACE_LIGHT.direction
+    
+    # Map [-1, 1] onto brightness [0.3, 1]
+    return 0.3 + 0.7 * (shade + 1) / 2
+
+def decode_states(state_names):
+    """Decode state strings ('tree', 'burning_0.7', ...) into codes and intensities"""
+    # Parse each distinct name once, then map every cell through the result
+    inverse, uniques = pd.factorize(np.asarray(state_names, dtype=object))
+    codes = np.empty(len(uniques), dtype=np.uint8)
+    intensities = np.zeros(len(uniques), dtype=np.float32)
+    
+    for i, name in enumerate(uniques):
+        name = str(name)
+        if name.startswith('burning_'):
+            codes[i] = BURNING
+            intensities[i] = float(name.split('_')[1])
+        else:
+            codes[i] = STATE_CODES.get(name, OTHER)
+    
+    return codes[inverse], intensities[inverse]
+
 class EnhancedTerrain3DRenderer:
-    def __init__(self, elevation_data_path):
+    def __init__(self, elevation_data_path, particle_seed=0):
         """Initialize with elevation data"""
         self.elevation_df = pd.read_csv(elevation_data_path)
+        self.particle_seed = particle_seed
         self.setup_terrain_mesh()
         self.setup_camera_path()
         
@@ -31,8 +89,8 @@ class EnhancedTerrain3DRenderer:
         
         # Create elevation grid
         self.elevation_grid = np.zeros((self.height, self.width))
-        for _, row in self.elevation_df.iterrows():
-            self.elevation_grid[int(row['y']), int(row['x'])] = row['elevation']
+        self.elevation_grid[self.elevation_df['y'].to_numpy(dtype=int),
+                            self.elevation_df['x'].to_numpy(dtype=int)] = self.elevation_df['elevation'].to_numpy()
         
         # Normalize elevation for better visualization
         self.elev_min = self.elevation_grid.min()
@@ -48,6 +106,13 @@ class EnhancedTerrain3DRenderer:
         # Scale elevation for better aspect ratio
         self.Z_scaled = (self.elevation_smooth - self.elev_min) * 0.3
         
+        # Hillshade depends only on the terrain, so shade it once
+        self.hillshade_colors = cm.gray(self.compute_hillshade())
+        self.surface_shade = surface_shading(self.X, self.Y, self.Z_scaled)[:, None]
+        
+        # Figure with the static scene, built on first draw
+        self.scene = None
+        
     def setup_camera_path(self):
         """Define camera positions for animation"""
         self.camera_positions = []
@@ -95,50 +160,32 @@ class EnhancedTerrain3DRenderer:
     def load_frame_data(self, frame_path):
         """Load cell states for a frame"""
         df = pd.read_csv(frame_path)
+        codes, intensity = decode_states(df['state'])
+        x = df['x'].to_numpy(dtype=int)
+        y = df['y'].to_numpy(dtype=int)
         
-        # Create state grid
-        state_grid = np.empty((self.height, self.width), dtype=object)
-        state_grid.fill('empty')
+        # Cells missing from the file stay empty
+        states = np.full((self.height, self.width), EMPTY, dtype=np.uint8)
+        intensity_grid = np.zeros((self.height, self.width), dtype=np.float32)
+        states[y, x] = codes
+        intensity_grid[y, x] = intensity
         
-        for _, cell in df.iterrows():
-            x, y = int(cell['x']), int(cell['y'])
-            state_grid[y, x] = cell['state']
-            
-        return state_grid
+        return FrameStates(states, intensity_grid)
     
-    def create_state_colors(self, state_grid):
+    def create_state_colors(self, frame_data):
         """Create color array based on cell states"""
-        # Create RGBA color array
-        colors = np.ones((self.height, self.width, 4))
-        
-        # Define state colors with proper contrast
-        state_colors = {
-            'empty': [0.95, 0.95, 0.95, 0.3],      # Very light gray, mostly transparent
-            'tree': [0.1, 0.5, 0.1, 0.9],          # Forest green
-            'burning_0.5': [1.0, 0.6, 0.0, 0.95],  # Orange fire
-            'burnt': [0.3, 0.2, 0.15, 0.9]         # Dark brown
-        }
+        colors = STATE_COLOR_LUT[frame_data.states]
+        
+        # Gradient from yellow to red based on intensity
+        burning = (frame_data.states == BURNING) & (frame_data.intensity != DEFAULT_BURNING_INTENSITY)
+        intensity = frame_data.intensity[burning]
+        colors[burning, 1] = 0.8 - 0.6 * intensity
+        colors[burning, 3] = 0.9 + 0.1 * intensity
         
-        # Apply colors based on state
-        for y in range(self.height):
-            for x in range(self.width):
-                state = state_grid[y, x]
-                if state in state_colors:
-                    colors[y, x] = state_colors[state]
-                elif state.startswith('burning_'):
-                    # Handle burning states with intensity
-                    intensity = float(state.split('_')[1])
-                    # Gradient from yellow to red based on intensity
-                    r = 1.0
-                    g = 0.8 - 0.6 * intensity
-                    b = 0.0
-                    a = 0.9 + 0.1 * intensity
-                    colors[y, x] = [r, g, b, a]
-                    
         return colors
     
-    def add_terrain_shading(self, ax, alpha=0.3):
-        """Add hillshade effect to terrain"""
+    def compute_hillshade(self):
+        """Normalized hillshade of the smoothed terrain"""
         # Calculate gradient for shading
         dy, dx = np.gradient(self.elevation_smooth)
         slope = np.sqrt(dx*dx + dy*dy)
@@ -148,10 +195,13 @@ class EnhancedTerrain3DRenderer:
         aspect = np.arctan2(dy, dx)
         shading = np.cos(aspect - light_angle) * slope
         shading = (shading - shading.min()) / (shading.max() - shading.min())
-        
+        return shading
+    
+    def add_terrain_shading(self, ax, alpha=0.3):
+        """Add hillshade effect to terrain"""
         # Apply as grayscale underlay
         ax.plot_surface(self.X, self.Y, self.Z_scaled - 0.1,
-                       facecolors=cm.gray(shading),
+                       facecolors=self.hillshade_colors,
                        alpha=alpha,
                        rstride=1, cstride=1,
                        antialiased=True,
@@ -159,41 +209,31 @@ class EnhancedTerrain3DRenderer:
     
     def create_3d_frame(self, frame_data, frame_number, output_path, camera_progress=0.0):
         """Generate a single 3D visualization frame with realistic terrain"""
+        fig = self.draw_3d_frame(frame_data, frame_number, camera_progress)
         
+        # Save with tight layout
+        fig.savefig(str(output_path), facecolor='#0a0a1e', dpi=100, bbox_inches='tight')
+        
+    def build_scene(self):
+        """Create the figure and every artist that does not change between frames"""
         # Create figure with dark background
-        fig = plt.figure(figsize=(19.2, 10.8), dpi=100)
+        fig = Figure(figsize=(19.2, 10.8), dpi=100)
+        FigureCanvasAgg(fig)
         fig.patch.set_facecolor('#0a0a1e')  # Dark blue background
         
         ax = fig.add_subplot(111, projection='3d')
         ax.set_facecolor('#0a0a1e')
         
-        # Get camera position based on progress
-        cam_idx = int(camera_progress * (len(self.camera_positions) - 1))
-        cam_t = (camera_progress * (len(self.camera_positions) - 1)) % 1.0
-        
-        if cam_idx < len(self.camera_positions) - 1:
-            camera = self.interpolate_camera(
-                self.camera_positions[cam_idx],
-                self.camera_positions[cam_idx + 1],
-                cam_t
-            )
-        else:
-            camera = self.camera_positions[-1]
-        
         # Add terrain with hillshading
         self.add_terrain_shading(ax, alpha=0.2)
         
-        # Get state colors
-        colors = self.create_state_colors(frame_data)
-        
-        # Plot main surface with cell states
-        surf = ax.plot_surface(
+        # Main surface; its cell state colours are set per frame
+        surface = ax.plot_surface(
             self.X, self.Y, self.Z_scaled,
-            facecolors=colors,
+            color='white',
             rstride=1, cstride=1,
             antialiased=True,
-            shade=True,
-            alpha=0.95
+            shade=False
         )
         
         # Add contour lines for elevation
@@ -205,13 +245,6 @@ class EnhancedTerrain3DRenderer:
                    linewidths=0.5,
                    offset=self.Z_scaled.min() - 1)
         
-        # Add fire glow effect for burning cells
-        self.add_fire_glow(ax, frame_data)
-        
-        # Set viewing angle
-        ax.view_init(elev=camera['elev'], azim=camera['azim'])
-        ax.dist = 10 * camera['distance']
-        
         # Set axis properties
         ax.set_xlim(0, self.width)
         ax.set_ylim(0, self.height)
@@ -236,56 +269,118 @@ class EnhancedTerrain3DRenderer:
         ax.set_ylabel('Y (cells)', color='white', fontsize=10)
         ax.set_zlabel('Elevation (m)', color='white', fontsize=10)
         
-        # Add title
-        title = f"Forest Fire Simulation - 3D Terrain View\nFrame: {frame_number}"
-        ax.text2D(0.5, 0.95, title, transform=ax.transAxes,
-                 fontsize=24, weight='bold', ha='center', color='white',
-                 bbox=dict(boxstyle='round,pad=0.5', facecolor='black', alpha=0.7))
+        # Title and frame info texts, filled in per frame
+        title = ax.text2D(0.5, 0.95, '', transform=ax.transAxes,
+                         fontsize=24, weight='bold', ha='center', color='white',
+                         bbox=dict(boxstyle='round,pad=0.5', facecolor='black', alpha=0.7))
+        info = ax.text2D(0.98, 0.02, '', transform=ax.transAxes,
+                        fontsize=14, ha='right', va='bottom', color='white',
+                        bbox=dict(boxstyle='round,pad=0.5', facecolor='black', alpha=0.7))
         
         # Add legend
         self.add_legend(ax)
         
+        margins = {side: getattr(fig.subplotpars, side)
+                   for side in ('left', 'bottom', 'right', 'top', 'wspace', 'hspace')}
+        self.scene = {'fig': fig, 'ax': ax, 'surface': surface, 'margins': margins,
+                      'title': title, 'info': info, 'glow': None}
+        
+    def draw_3d_frame(self, frame_data, frame_number, camera_progress=0.0):
+        """
+        Draw a 3D visualization frame onto the renderer's 1920x1080 figure
+        
+        The terrain surfaces, contours, axes and legend are built once; each
+        frame only recolours the surface, redraws the fire particles and
+        moves the camera. The returned figure is reused by the next call.
+        """
+        if self.scene is None:
+            self.build_scene()
+        scene = self.scene
+        ax = scene['ax']
+        
+        # Get camera position based on progress
+        cam_idx = int(camera_progress * (len(self.camera_positions) - 1))
+        cam_t = (camera_progress * (len(self.camera_positions) - 1)) % 1.0
+        
+        if cam_idx < len(self.camera_positions) - 1:
+            camera = self.interpolate_camera(
+                self.camera_positions[cam_idx],
+                self.camera_positions[cam_idx + 1],
+                cam_t
+            )
+        else:
+            camera = self.camera_positions[-1]
+        
+        # Colour each surface quad by its cell state, shaded like plot_surface;
+        # its alpha=0.95 applied to the faces only, edges keep the state alpha
+        edges = self.create_state_colors(frame_data)[:-1, :-1].reshape(-1, 4).copy()
+        edges[:, :3] *= self.surface_shade
+        faces = edges.copy()
+        faces[:, 3] = 0.95
+        scene['surface'].set_facecolor(faces)
+        scene['surface'].set_edgecolor(edges)
+        
+        # Add fire glow effect for burning cells
+        if scene['glow'] is not None:
+            scene['glow'].remove()
+        rng = np.random.default_rng([self.particle_seed, frame_number])
+        scene['glow'] = self.add_fire_glow(ax, frame_data, rng)
+        
+        # Set viewing angle
+        ax.view_init(elev=camera['elev'], azim=camera['azim'])
+        ax.dist = 10 * camera['distance']
+        
+        scene['title'].set_text(f"Forest Fire Simulation - 3D Terrain View\nFrame: {frame_number}")
+        
         # Add frame info
-        self.add_frame_info(ax, frame_data, frame_number)
+        self.add_frame_info(scene['info'], frame_data)
         
-        # Save with tight layout
-        plt.tight_layout()
-        plt.savefig(str(output_path), facecolor='#0a0a1e', dpi=100, bbox_inches='tight')
-        plt.close()
-        
-    def add_fire_glow(self, ax, frame_data):
-        """Add glowing particles for burning cells"""
-        burn_x, burn_y, burn_z, burn_intensity = [], [], [], []
-        
-        for y in range(self.height):
-            for x in range(self.width):
-                state = frame_data[y, x]
-                if state.startswith('burning_'):
-                    intensity = float(state.split('_')[1])
-                    # Add multiple particles for each burning cell
-                    for _ in range(int(5 * intensity)):
-                        burn_x.append(x + np.random.normal(0, 0.3))
-                        burn_y.append(y + np.random.normal(0, 0.3))
-                        burn_z.append(self.Z_scaled[y, x] + np.random.uniform(0.5, 2.0))
-                        burn_intensity.append(intensity)
-        
-        if burn_x:
+        # Lay the frame out from the default margins, as on a new figure
+        scene['fig'].subplots_adjust(**scene['margins'])
+        scene['fig'].tight_layout()
+        
+        return scene['fig']
+        
+    def generate_fire_particles(self, frame_data, rng):
+        """Scatter glow particles above burning cells, more for hotter cells"""
+        y, x = np.nonzero(frame_data.states == BURNING)
+        intensity = frame_data.intensity[y, x]
+        
+        # Add multiple particles for each burning cell
+        counts = (5 * intensity).astype(int)
+        x, y, intensity = np.repeat(x, counts), np.repeat(y, counts), np.repeat(intensity, counts)
+        
+        n = len(x)
+        burn_x = x + rng.normal(0, 0.3, n)
+        burn_y = y + rng.normal(0, 0.3, n)
+        burn_z = self.Z_scaled[y, x] + rng.uniform(0.5, 2.0, n)
+        
+        return burn_x, burn_y, burn_z, intensity
+    
+    def add_fire_glow(self, ax, frame_data, rng=None):
+        """Add glowing particles for burning cells, returning their artist (None if no fire)"""
+        if rng is None:
+            rng = np.random.default_rng(self.particle_seed)
+        burn_x, burn_y, burn_z, burn_intensity = self.generate_fire_particles(frame_data, rng)
+        
+        if len(burn_x):
             # Plot fire particles
-            scatter = ax.scatter(burn_x, burn_y, burn_z,
-                               c=burn_intensity,
-                               cmap='hot',
-                               s=30,
-                               alpha=0.6,
-                               marker='o',
-                               edgecolors='none')
+            return ax.scatter(burn_x, burn_y, burn_z,
+                              c=burn_intensity,
+                              cmap='hot',
+                              s=30,
+                              alpha=0.6,
+                              marker='o',
+                              edgecolors='none')
+        return None
     
     def add_legend(self, ax):
         """Add legend for cell states"""
         legend_elements = [
-            mpatches.Rectangle((0, 0), 1, 1, facecolor=[0.1, 0.5, 0.1, 0.9], label='Tree'),
-            mpatches.Rectangle((0, 0), 1, 1, facecolor=[1.0, 0.6, 0.0, 0.95], label='Burning'),
-            mpatches.Rectangle((0, 0), 1, 1, facecolor=[0.3, 0.2, 0.15, 0.9], label='Burnt'),
-            mpatches.Rectangle((0, 0), 1, 1, facecolor=[0.95, 0.95, 0.95, 0.3], label='Empty')
+            mpatches.Rectangle((0, 0), 1, 1, facecolor=STATE_COLOR_LUT[TREE], label='Tree'),
+            mpatches.Rectangle((0, 0), 1, 1, facecolor=STATE_COLOR_LUT[BURNING], label='Burning'),
+            mpatches.Rectangle((0, 0), 1, 1, facecolor=STATE_COLOR_LUT[BURNT], label='Burnt'),
+            mpatches.Rectangle((0, 0), 1, 1, facecolor=STATE_COLOR_LUT[EMPTY], label='Empty')
         ]
         
         legend = ax.legend(handles=legend_elements, loc='upper left',
@@ -296,21 +391,13 @@ class EnhancedTerrain3DRenderer:
         for text in legend.get_texts():
             text.set_color('white')
     
-    def add_frame_info(self, ax, frame_data, frame_number):
-        """Add frame statistics"""
+    def add_frame_info(self, info, frame_data):
+        """Show frame statistics in the scene's info text"""
         # Count states
-        unique, counts = np.unique(frame_data, return_counts=True)
-        state_counts = dict(zip(unique, counts))
-        
-        trees = sum(v for k, v in state_counts.items() if k == 'tree')
-        burning = sum(v for k, v in state_counts.items() if k.startswith('burning'))
-        burnt = sum(v for k, v in state_counts.items() if k == 'burnt')
-        
-        info_text = f"Trees: {trees} | Burning: {burning} | Burnt: {burnt}"
+        counts = np.bincount(frame_data.states.ravel(), minlength=OTHER + 1)
+        trees, burning, burnt = counts[TREE], counts[BURNING], counts[BURNT]
         
-        ax.text2D(0.98, 0.02, info_text, transform=ax.transAxes,
-                 fontsize=14, ha='right', va='bottom', color='white',
-                 bbox=dict(boxstyle='round,pad=0.5', facecolor='black', alpha=0.7))
+        info.set_text(f"Trees: {trees} | Burning: {burning} | Burnt: {burnt}")
     
     def render_frame(self, frame_num, input_dir, output_dir, total_frames):
         """Render a single frame with appropriate camera position"""
@@ -4,17 +4,68 @@ Parallel 3D frame generation for faster processing
 """
 
 import multiprocessing as mp
+import os
 from pathlib import Path
 from terrain_3d import EnhancedTerrain3DRenderer
+from scripts.shared_frames import copy_figure_into, stream_frames
+from scripts.video_assembler import FrameStreamEncoder, VideoConfig
 import argparse
 
+# Rough memory use of one worker: Matplotlib and a 1080p canvas, plus the
+# two per-cell surface polygons and their colours
+WORKER_BASE_MEMORY = 200 * 1024**2
+WORKER_MEMORY_PER_CELL = 4 * 1024
+
+# Renderer of this worker process, built once by init_worker
+_renderer = None
+
+def init_worker(elevation_path):
+    """Build the worker's renderer (terrain mesh and hillshade) once"""
+    global _renderer
+    _renderer = EnhancedTerrain3DRenderer(elevation_path)
+
 def render_frame_wrapper(args):
     """Wrapper for multiprocessing"""
-    frame_num, input_dir, output_dir, total_frames, elevation_path = args
+    frame_num, input_dir, output_dir, total_frames = args
+    _renderer.render_frame(frame_num, input_dir, output_dir, total_frames)
+    return frame_num
+
+def render_frame_into(task, out):
+    """Render one 3D frame into a shared frame slot (for stream_frames)"""
+    frame_num, input_dir, total_frames = task
     
-    # Create renderer for this process
-    renderer = EnhancedTerrain3DRenderer(elevation_path)
-    renderer.render_frame(frame_num, input_dir, output_dir, total_frames)
+    frame_data = _renderer.load_frame_data(input_dir / f"frames/frame_{frame_num:06d}.csv")
+    camera_progress = frame_num / max(total_frames - 1, 1)
+    
+    # The renderer reuses its figure, so it is copied but not closed
+    copy_figure_into(_renderer.draw_3d_frame(frame_data, frame_num, camera_progress), out)
+
+def available_memory():
+    """Memory available to new processes in bytes, or None if unknown"""
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+def default_worker_count(elevation_path):
+    """Number of workers that fit into the available CPUs and memory"""
+    with open(elevation_path) as f:
+        n_cells = max(sum(1 for _ in f) - 1, 1)
+    
+    per_worker = WORKER_BASE_MEMORY + n_cells * WORKER_MEMORY_PER_CELL
+    memory = available_memory()
+    if memory is None:
+        return min(mp.cpu_count(), 4)  # Unknown memory: stay conservative
+    
+    return max(1, min(mp.cpu_count(), memory // per_worker))
 
 def generate_3d_frames_parallel(input_dir, output_dir, num_frames=None, num_processes=None):
     """Generate all 3D frames in parallel"""
@@ -38,27 +89,70 @@ def generate_3d_frames_parallel(input_dir, output_dir, num_frames=None, num_proc
     print(f"Rendering {len(frame_numbers)} 3D frames")
     
     # Prepare arguments for parallel processing
-    args_list = [(num, input_path, output_path, len(frame_numbers), elevation_path) 
+    args_list = [(num, input_path, output_path, len(frame_numbers)) 
                  for num in frame_numbers]
     
     # Process frames in parallel
     if num_processes is None:
-        num_processes = min(mp.cpu_count(), 4)  # Limit to 4 processes for memory
+        num_processes = default_worker_count(elevation_path)
     
-    with mp.Pool(processes=num_processes) as pool:
-        pool.map(render_frame_wrapper, args_list)
+    # Several frames per task amortize dispatch while keeping the load balanced
+    chunksize = max(1, len(args_list) // (num_processes * 4))
+    
+    with mp.Pool(processes=num_processes,
+                 initializer=init_worker,
+                 initargs=(elevation_path,)) as pool:
+        for _ in pool.imap_unordered(render_frame_wrapper, args_list, chunksize=chunksize):
+            pass
     
     print(f"Completed {len(frame_numbers)} 3D frames")
 
+def stream_3d_frames_parallel(input_dir, output_video, num_frames=None, num_processes=None, fps=60):
+    """Render 3D frames in parallel straight into a video, without PNG files"""
+    input_path = Path(input_dir)
+    Path(output_video).parent.mkdir(parents=True, exist_ok=True)
+    
+    elevation_path = input_path / "metadata/elevation.csv"
+    if not elevation_path.exists():
+        print("Error: Elevation data not found")
+        return
+    
+    frame_files = sorted(input_path.glob("frames/frame_*.csv"))
+    frame_numbers = [int(f.stem.split('_')[1]) for f in frame_files]
+    
+    if num_frames:
+        frame_numbers = frame_numbers[:num_frames]
+    
+    print(f"Streaming {len(frame_numbers)} 3D frames to {output_video}")
+    
+    tasks = [(num, input_path, len(frame_numbers)) for num in frame_numbers]
+    
+    if num_processes is None:
+        num_processes = default_worker_count(elevation_path)
+    
+    encoder = FrameStreamEncoder(output_video, VideoConfig(fps=fps))
+    stream_frames(tasks, render_frame_into, encoder, workers=num_processes,
+                  initializer=init_worker, initargs=(elevation_path,))
+    
+    if encoder.close():
+        print(f"Encoded {len(frame_numbers)} 3D frames")
+    else:
+        print("Encoding failed")
+
 def main():
     parser = argparse.ArgumentParser(description='Generate 3D frames in parallel')
     parser.add_argument('input_dir', help='Input directory with CSV exports')
     parser.add_argument('output_dir', help='Output directory for 3D frames')
     parser.add_argument('--frames', type=int, help='Number of frames to render')
-    parser.add_argument('--processes', type=int, help='Number of parallel processes')
+    parser.add_argument('--processes', type=int, help='Number of parallel processes (default: fit to CPUs and memory)')
+    parser.add_argument('--video', help='Stream frames straight into this video file instead of writing PNGs')
+    parser.add_argument('--fps', type=int, default=60, help='Frame rate for --video')
     
     args = parser.parse_args()
-    generate_3d_frames_parallel(args.input_dir, args.output_dir, args.frames, args.processes)
+    if args.video:
+        stream_3d_frames_parallel(args.input_dir, args.video, args.frames, args.processes, args.fps)
+    else:
+        generate_3d_frames_parallel(args.input_dir, args.output_dir, args.frames, args.processes)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Frame-accuracy tests for the video encoders.
+
+Every test frame carries its index as a row of black/white blocks, so the
+decoded video can be checked frame by frame despite lossy encoding.
+"""
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from scripts.video_assembler import VideoAssembler, VideoConfig, split_concat_entries
+
+WIDTH, HEIGHT = 64, 32
+BITS = 8
+
+requires_ffmpeg = pytest.mark.skipif(shutil.which('ffmpeg') is None,
+                                     reason="FFmpeg not installed")
+
+
+def index_frame(index: int) -> np.ndarray:
+    """RGB frame showing index as BITS blocks, most significant first."""
+    frame = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+    block = WIDTH // BITS
+    for bit in range(BITS):
+        if index >> (BITS - 1 - bit) & 1:
+            frame[:, bit * block:(bit + 1) * block] = 255
+    return frame
+
+
+def decode_indices(video_path: Path) -> list:
+    """Index shown by every decoded frame of a video."""
+    result = subprocess.run(
+        ['ffmpeg', '-loglevel', 'error', '-i', str(video_path),
+         '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-'],
+        capture_output=True, check=True
+    )
+    frames = np.frombuffer(result.stdout, dtype=np.uint8).reshape(-1, HEIGHT, WIDTH, 3)
+    block = WIDTH // BITS
+    means = frames.reshape(len(frames), HEIGHT, BITS, block, 3).mean(axis=(1, 3, 4))
+    weights = 1 << np.arange(BITS - 1, -1, -1)
+    return [int(value) for value in (means > 127).astype(int) @ weights]
+
+
+def small_video_config(fps: int = 60) -> VideoConfig:
+    return VideoConfig(resolution=(WIDTH, HEIGHT), fps=fps, preset='ultrafast')
+
+
+def test_split_warns_when_chunks_are_not_whole_gops(capsys):
+    chunks = split_concat_entries([(n, 1) for n in range(120)],
+                                  chunk_frames=30, gop_size=60)
+
+    assert [len(chunk) for chunk in chunks] == [60, 60]
+    assert "not a multiple of the GOP size" in capsys.readouterr().out
+
+
+@requires_ffmpeg
+def test_parallel_chunks_keep_every_frame(tmp_path):
+    assembler = VideoAssembler(str(tmp_path))
+    frame_dir = tmp_path / 'frames'
+    assembler.save_frames_as_images([index_frame(i) for i in range(120)], str(frame_dir))
+
+    parallel = tmp_path / 'parallel.mp4'
+    serial = tmp_path / 'serial.mp4'
+    assert assembler.assemble_final_video(str(frame_dir), str(parallel), small_video_config(),
+                                          workers=2, chunk_frames=60)
+    assert assembler.assemble_final_video(str(frame_dir), str(serial), small_video_config())
+
+    assert decode_indices(parallel) == list(range(120))
+    assert decode_indices(serial) == list(range(120))
+
+
+@requires_ffmpeg
+def test_runs_hold_each_frame_for_its_count(tmp_path):
+    # Alternating 3- and 1-frame holds, the case duration rounding breaks
+    counts = [3, 1] * 10 + [5, 1, 1, 7]
+    runs = [(index_frame(i), count) for i, count in enumerate(counts)]
+
+    video = VideoAssembler(str(tmp_path)).create_video_from_runs(
+        iter(runs), 'runs', small_video_config())
+
+    expected = [i for i, count in enumerate(counts) for _ in range(count)]
+    decoded = decode_indices(Path(video))
+    assert len(decoded) == sum(counts)
+    assert decoded == expected
+    assert sorted(set(decoded)) == list(range(len(counts)))